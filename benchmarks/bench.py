@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+#
+# bench.py
+#
+# Benchmark van de keten op synthetische gebouwen en catalogi
+# (benchmarks/synthetisch.py). Per grootte worden gemeten:
+#
+#   generatie   catalogus + gebouw maken en wegschrijven
+#   ruimte      scenarioruimte opbouwen
+#   costing     prijs + CO2 (gen_results-pad) naar kolommen
+#   ranking     rank_kolommen over de kolommen
+#   pareto      Pareto-front over de kolommen
+#   dashboard   zelfde koude start als streamlit/utils/data.py (index bouwen + openen)
+#
+# met duur, throughput (scenario's/s) en piek-RSS. Elke grootte draait in een
+# eigen proces, zodat de piek-RSS niet van de vorige grootte komt.
+# Output is JSON (default data/output/benchmark.json); met --vergelijk wordt
+# een eerdere run ernaast gezet.
+#
+# Gebruik:
+#   python benchmarks/bench.py
+#   python benchmarks/bench.py --groottes 1e4 1e6 1e8
+#   python benchmarks/bench.py --out data/output/benchmark_nieuw.json --vergelijk data/output/benchmark.json
+#
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetisch import synthetisch
+from engine.loader          import read_gebouw, read_jsonl, read_kolommen
+from engine.materiaaltabel  import read_materiaal_tabel
+from engine.metrics         import piek_rss_mb
+from engine.pareto          import pareto_front_punten
+from engine.ranking         import rank_kolommen
+from engine.resultaatindex  import read_resultaat_index
+from engine.scenarios       import ScenarioRuimte, load_onderdeel_map
+from engine.writer          import KolomWriter, write_summary
+from scripts.gen_results    import bereken_uit_ruimte, schrijf_alles
+
+STAPPEN = ["generatie", "ruimte", "costing", "ranking", "pareto", "dashboard"]
+
+
+def laad_dashboard(kol_pad: Path):
+    """Zelfde werk als een koude start van het dashboard: index bouwen/openen, samenvatting en top 20."""
+    index = read_resultaat_index(kol_pad)
+    index.samenvatting()
+    return index.rijen(index.top("optimaal_score", False, float("inf"), float("inf"), 20))
+
+
+def bench_grootte(doel: int, seed: int, werkmap: str) -> dict:
+    """Draait alle stappen voor één grootte (in een eigen proces)."""
+    werk    = Path(werkmap)
+    stappen = {}
+
+    def meet(stap, functie, aantal=None):
+        t0     = time.perf_counter()
+        result = functie()
+        duur   = time.perf_counter() - t0
+        stappen[stap] = {
+            "duur_s":       round(duur, 4),
+            "scenarios_s":  round(aantal / duur) if aantal and duur > 0 else None,
+            "piek_rss_mb":  piek_rss_mb(),
+        }
+        return result
+
+    def genereer():
+        materials, gebouw, aantal = synthetisch(doel, seed)
+        with (werk / "materials.jsonl").open("w", encoding="utf-8") as f:
+            for m in materials:
+                f.write(json.dumps(m, ensure_ascii=False) + "\n")
+        write_summary(werk / "gebouwgegevens.json", gebouw)
+        return aantal
+
+    aantal = meet("generatie", genereer)
+    gebouw = read_gebouw(werk / "gebouwgegevens.json")
+
+    def bouw_ruimte():
+        return ScenarioRuimte.van_gebouw(
+            gebouw,
+            read_jsonl(werk / "materials.jsonl"),
+            load_onderdeel_map(read_jsonl(ROOT / "data/brondata/onderdelen.jsonl")),
+        )
+
+    ruimte  = meet("ruimte", bouw_ruimte)
+    kol_pad = werk / "results.kolommen"
+
+    def costing():
+        materiaal_index, prijzen, co2s = read_materiaal_tabel(werk / "materials.jsonl").arrays()
+        blokken = bereken_uit_ruimte(ruimte, gebouw, materiaal_index, prijzen, co2s)
+        kolommen = {"scenario_id": "int64", "cost_total": "float64", "co2_total": "float64"}
+        with KolomWriter(kol_pad, kolommen, {"gebouw_id": gebouw["gebouw_id"], "assen": ruimte.assen}) as w:
+            return schrijf_alles(blokken, gebouw["gebouw_id"], None, w, False, toon=False)
+
+    meet("costing", costing, aantal)
+    kol, _ = read_kolommen(kol_pad)
+    meet("ranking", lambda: rank_kolommen(kol, gebouw["gebouw_id"], top_n=10), aantal)
+    meet("pareto",  lambda: pareto_front_punten(kol["cost_total"], kol["co2_total"], kol["scenario_id"]), aantal)
+    meet("dashboard", lambda: laad_dashboard(kol_pad), aantal)
+
+    return {
+        "doel":        doel,
+        "scenarios":   aantal,
+        "assen":       ruimte.radices,
+        "stappen":     stappen,
+        "piek_rss_mb": piek_rss_mb(),
+    }
+
+
+def omgeving() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit":   commit,
+        "python":   platform.python_version(),
+        "numpy":    np.__version__,
+        "platform": platform.platform(),
+        "cpus":     os.cpu_count(),
+        "tijd":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def vergelijk(oud: dict, nieuw: dict):
+    """Print per grootte en stap de verhouding nieuw/oud in duur."""
+    oud_per = {r["doel"]: r for r in oud["resultaten"]}
+    print(f"\nVergelijking met {oud['omgeving'].get('commit')} (nieuw/oud, <1 = sneller):")
+    for r in nieuw["resultaten"]:
+        o = oud_per.get(r["doel"])
+        if not o:
+            continue
+        regels = []
+        for stap in STAPPEN:
+            a, b = o["stappen"].get(stap, {}), r["stappen"].get(stap, {})
+            if a.get("duur_s") and b.get("duur_s"):
+                regels.append(f"{stap} {b['duur_s'] / a['duur_s']:.2f}x")
+        print(f"  {r['scenarios']:>14,}  " + "  |  ".join(regels))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groottes",  nargs="+", default=["1e4", "1e5", "1e6", "1e7"], help="Doelaantallen scenario's (bijv. 1e4 1e8)")
+    parser.add_argument("--seed",      type=int, default=0,                              help="Seed voor de synthetische data")
+    parser.add_argument("--out",       default="data/output/benchmark.json",             help="Output pad")
+    parser.add_argument("--vergelijk", default=None,                                     help="Eerdere benchmark.json om mee te vergelijken")
+    parser.add_argument("--werkmap",   default=None,                                     help="Map voor tijdelijke bestanden (default: systeem-tmp)")
+    args = parser.parse_args()
+
+    root       = ROOT
+    resultaten = []
+    for grootte in args.groottes:
+        doel    = int(float(grootte))
+        werkmap = tempfile.mkdtemp(prefix="bench_", dir=args.werkmap)
+        try:
+            # Eigen proces per grootte: schone piek-RSS en geen caches van een vorige run
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                r = pool.submit(bench_grootte, doel, args.seed, werkmap).result()
+        finally:
+            shutil.rmtree(werkmap, ignore_errors=True)
+        resultaten.append(r)
+
+        print(f"{r['scenarios']:>14,} scenario's  (assen {r['assen']})  piek {r['piek_rss_mb']:,.1f} MB")
+        for stap in STAPPEN:
+            s = r["stappen"].get(stap, {})
+            if "overgeslagen" in s:
+                print(f"    {stap:10s} overgeslagen ({s['overgeslagen']})")
+            elif s:
+                tp = f"{s['scenarios_s']:>14,}/s" if s["scenarios_s"] else ""
+                print(f"    {stap:10s} {s['duur_s']:>9.3f}s {tp}")
+
+    rapport  = {"omgeving": omgeving(), "resultaten": resultaten}
+    out_path = root / args.out
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    write_summary(out_path, rapport)
+    print(f"\nOK -> {out_path}")
+
+    if args.vergelijk:
+        vergelijk(json.loads((root / args.vergelijk).read_text(encoding="utf-8")), rapport)
+
+
+if __name__ == "__main__":
+    main()
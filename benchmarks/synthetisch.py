@@ -0,0 +1,105 @@
+# benchmarks/synthetisch.py
+#
+# Synthetische materials-catalogi en gebouwen voor benchmarks. Het aantal
+# scenario's is het product van het aantal materialen per actieve categorie,
+# dus voor een doelgrootte worden categorieën en aantallen zo gekozen dat het
+# product er dicht bij ligt (10^4 .. 10^8 en verder).
+#
+from __future__ import annotations
+import math
+import random
+from typing import Any, Dict, List, Tuple
+
+# Categorieën in volgorde van activering, met onderdeel_id en enh.
+# De eerste zes zijn altijd actief (daktype schuin); de rest via gebouwopties.
+CATEGORIEEN: List[Tuple[str, str, str]] = [
+    ("Beglazing",               "01", "m2"),
+    ("Gevelisolatie",           "04", "m2"),
+    ("Deuren",                  "03", "stuks"),
+    ("Hellend dakisolatie",     "05", "m2"),
+    ("Vloerisolatie",           "13", "m2"),
+    ("Kozijnen",                "06", "m1"),
+    ("Panelen",                 "07", "stuks"),
+    ("Zonne-energie",           "14", "stuks"),
+    ("Ventilatie",              "10", "stuks"),
+]
+BASIS_CATEGORIEEN = 6
+OPTIE_VELDEN      = {"Panelen": "panelen", "Zonne-energie": "zonnepanelen", "Ventilatie": "ventilatie"}
+
+
+def verdeel_grootte(doel: int, max_per_as: int = 40) -> Dict[str, int]:
+    """
+    Aantal materialen per categorie zodat het product ~doel is. Er worden
+    zoveel categorieën gebruikt als nodig om onder max_per_as te blijven.
+    """
+    k = BASIS_CATEGORIEEN
+    while k < len(CATEGORIEEN) and doel ** (1 / k) > max_per_as:
+        k += 1
+
+    aantallen = []
+    rest = float(doel)
+    for i in range(k):
+        n = max(1, round(rest ** (1 / (k - i))))
+        aantallen.append(n)
+        rest /= n
+    return {cat: n for (cat, _, _), n in zip(CATEGORIEEN, aantallen)}
+
+
+def maak_catalogus(aantallen: Dict[str, int], seed: int = 0) -> List[Dict[str, Any]]:
+    """materials.jsonl-records (zelfde velden als gen_csv.py) met willekeurige prijs/CO2."""
+    rng  = random.Random(seed)
+    info = {cat: (oid, enh) for cat, oid, enh in CATEGORIEEN}
+    materials = []
+    for cat, n in aantallen.items():
+        oid, enh = info[cat]
+        for i in range(n):
+            materials.append({
+                "material_id":  f"syn_{oid}_{i:04d}",
+                "onderdeel_id": oid,
+                "categorie":    cat,
+                "naam":         f"{cat} {i + 1}",
+                "materiaal":    None,
+                "dikte_mm":     None,
+                "rd_m2k":       None,
+                "enh":          "stuks" if enh == "stuks" else "m2",
+                "co2_value":    round(rng.uniform(0.5, 60.0), 3),
+                "prijs":        round(rng.uniform(5.0, 400.0), 2),
+                "omschrijving": None,
+                "duurzaam":     rng.randint(0, 1),
+                "toepassing":   None,
+                "opmerking":    None,
+            })
+    return materials
+
+
+def maak_gebouw(gebouw_id: str, aantallen: Dict[str, int], seed: int = 0) -> Dict[str, Any]:
+    """gebouwgegevens.json-record waarin precies de categorieën uit aantallen actief zijn."""
+    rng = random.Random(seed)
+    return {
+        "gebouw_id": gebouw_id,
+        "meta": {"aantal_woningen": 1},
+        "afmetingen": {
+            "beglazing_m2": round(rng.uniform(40, 300), 2),
+            "gevel_m2":     round(rng.uniform(200, 1500), 2),
+            "deuren_stuks": rng.randint(2, 60),
+            "dak_m2":       round(rng.uniform(50, 400), 2),
+            "daktype":      "schuin",
+            "vloer_m2":     round(rng.uniform(40, 300), 2),
+            "kozijnen_m1":  rng.randint(50, 1500),
+        },
+        "opties": {
+            **{veld: cat in aantallen for cat, veld in OPTIE_VELDEN.items()},
+            "verwarming":          False,
+            "verwarming_voorkeur": None,
+        },
+    }
+
+
+def synthetisch(doel: int, seed: int = 0) -> Tuple[List[Dict[str, Any]], Dict[str, Any], int]:
+    """(materials, gebouw, werkelijk aantal scenario's) voor een doelgrootte."""
+    aantallen = verdeel_grootte(doel)
+    return (
+        maak_catalogus(aantallen, seed),
+        maak_gebouw(f"bench_{doel:.0e}".replace("+", ""), aantallen, seed),
+        math.prod(aantallen.values()),
+    )
@@ -1,9 +1,16 @@
 # engine/calculator.py
 from __future__ import annotations
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from engine.metrics import stap, tel
 
 PANEEL_M2_PER_STUK = 1.7
 
+# Index 0 in de materiaal-arrays is gereserveerd voor NONE / onbekend materiaal
+NONE_INDEX = 0
+
 # Mapping onderdeel_id -> (veld in afmetingen, enh)
 ONDERDEEL_FACTOR_MAP: Dict[str, tuple] = {
     "01": ("beglazing_m2",  "m2"),
@@ -78,4 +85,115 @@ def bereken_totaal_co2(
             continue
         factor = bepaal_factor(onderdeel_id, gebouw)
         totaal += m["co2_value"] * factor
-    return round(totaal, 2)
\ No newline at end of file
+    return round(totaal, 2)
+
+
+# ── Batch (vectorized) ───────────────────────────────────────────────────────
+
+def bouw_materiaal_arrays(
+    material_lookup: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Zet de material_lookup om naar integer-indices met prijs- en co2-arrays.
+    Index 0 (NONE_INDEX) heeft prijs en co2 0.0, zodat NONE en onbekende
+    materialen niets bijdragen (zelfde gedrag als bereken_totaal_prijs).
+    Een engine.materiaaltabel.MateriaalTabel levert zijn arrays direct.
+    """
+    if hasattr(material_lookup, "arrays"):
+        return material_lookup.arrays()
+    index: Dict[str, int] = {}
+    prijzen = [0.0]
+    co2s    = [0.0]
+    for mid, m in material_lookup.items():
+        index[mid] = len(prijzen)
+        prijzen.append(m["prijs"])
+        co2s.append(m["co2_value"])
+    return index, np.array(prijzen, dtype=np.float64), np.array(co2s, dtype=np.float64)
+
+
+def bepaal_factor_vector(onderdeel_ids: Sequence[str], gebouw: Dict[str, Any]) -> np.ndarray:
+    """Factor per onderdeel (kolom in de scenario-matrix), eenmalig per gebouw."""
+    return np.array([bepaal_factor(oid, gebouw) for oid in onderdeel_ids], dtype=np.float64)
+
+
+def codeer_keuzes(
+    keuzes_lijst: Iterable[Dict[str, str]],
+    onderdeel_ids: Sequence[str],
+    materiaal_index: Dict[str, int],
+) -> np.ndarray:
+    """Zet keuzes-dicts om naar een (n_scenarios, n_onderdelen) matrix van materiaal-indices."""
+    rijen: List[List[int]] = [
+        [materiaal_index.get(keuzes.get(oid), NONE_INDEX) for oid in onderdeel_ids]
+        for keuzes in keuzes_lijst
+    ]
+    return np.array(rijen, dtype=np.int32).reshape(len(rijen), len(onderdeel_ids))
+
+
+def rond_af(waarden: np.ndarray, decimalen: int = 2) -> np.ndarray:
+    """
+    Rondt af gelijk aan Python round(x, decimalen).
+    np.round wijkt af bij ...5-grensgevallen; alleen die worden exact nagerekend.
+    """
+    afgerond  = np.round(waarden, decimalen)
+    geschaald = waarden * 10 ** decimalen
+    grens     = np.abs(geschaald - np.floor(geschaald) - 0.5) < 1e-6
+    if grens.any():
+        afgerond[grens] = [round(x, decimalen) for x in waarden[grens].tolist()]
+    return afgerond
+
+
+def bereken_batch(
+    matrix: np.ndarray,
+    factoren: np.ndarray,
+    prijzen: np.ndarray,
+    co2s: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Berekent totaal prijs en CO2 voor alle scenario's (rijen) in één array-pass.
+    Kolommen worden in keuzes-volgorde opgeteld, zodat de uitkomst overeenkomt
+    met bereken_totaal_prijs / bereken_totaal_co2.
+    """
+    n = matrix.shape[0]
+    with stap("calculator.bereken_batch"):
+        prijs = np.zeros(n, dtype=np.float64)
+        co2   = np.zeros(n, dtype=np.float64)
+        for j in range(matrix.shape[1]):
+            kolom = matrix[:, j]
+            prijs += (prijzen * factoren[j])[kolom]
+            co2   += (co2s    * factoren[j])[kolom]
+        prijs, co2 = rond_af(prijs), rond_af(co2)
+    tel("calculator.bereken_batch", n)
+    return prijs, co2
+
+
+def bepaal_factor_matrix(onderdeel_ids: Sequence[str], gebouwen: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """(n_gebouwen, n_onderdelen) factoren; één rij per gebouw."""
+    return np.array(
+        [[bepaal_factor(oid, g) for oid in onderdeel_ids] for g in gebouwen],
+        dtype=np.float64,
+    ).reshape(len(gebouwen), len(onderdeel_ids))
+
+
+def bereken_batch_gebouwen(
+    matrix: np.ndarray,
+    factor_matrix: np.ndarray,
+    prijzen: np.ndarray,
+    co2s: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    bereken_batch voor meerdere gebouwen met dezelfde onderdelen tegelijk:
+    één materiaal-matrix, een (n_gebouwen, n_onderdelen) factor-matrix.
+    Geeft (n_gebouwen, n_scenarios) arrays; elke rij is gelijk aan
+    bereken_batch met de factoren van dat gebouw.
+    """
+    g, n = factor_matrix.shape[0], matrix.shape[0]
+    with stap("calculator.bereken_batch_gebouwen"):
+        prijs = np.zeros((g, n), dtype=np.float64)
+        co2   = np.zeros((g, n), dtype=np.float64)
+        for j in range(matrix.shape[1]):
+            kolom = matrix[:, j]
+            prijs += (prijzen[None, :] * factor_matrix[:, j, None])[:, kolom]
+            co2   += (co2s[None, :]    * factor_matrix[:, j, None])[:, kolom]
+        prijs, co2 = rond_af(prijs), rond_af(co2)
+    tel("calculator.bereken_batch_gebouwen", g * n)
+    return prijs, co2
@@ -1,7 +1,36 @@
 # engine/constraints.py
-
+#
+# - load_requirements / vertaal_requirements: grenzen op resultaten (requirements.json)
+# - voldoet_aan_constraints: één record toetsen aan grenzen of aan een RegelSet
+# - load_constraints / RegelSet: combinatieregels uit constraints.jsonl, gecompileerd
+#   tegen een ScenarioRuimte tot maskers per as. Omdat scenario_ids in
+#   itertools.product-volgorde liggen, is elke deelboom onder een vast prefix van
+#   assen een aaneengesloten id-bereik; ongeldige deelbomen worden in zijn geheel
+#   overgeslagen.
+#
 import json
 from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+import numpy as np
+
+from engine.scenarios import ScenarioRuimte
+
+# Waarde van een onderdeel dat niet in de scenarioruimte zit
+NONE = "NONE"
+
+# Velden in requirements.json -> resultaatkolommen
+REQUIREMENT_KOLOMMEN = {
+    "totaal_prijs":  "cost_total",
+    "totaal_mg_co2": "co2_total",
+}
+
+OPERATOREN = {
+    "==":     lambda waarde, ref: waarde == ref,
+    "!=":     lambda waarde, ref: waarde != ref,
+    "in":     lambda waarde, ref: waarde in ref,
+    "not_in": lambda waarde, ref: waarde not in ref,
+}
 
 
 def load_requirements(path: Path):
@@ -12,7 +41,71 @@ def load_requirements(path: Path):
         return json.load(f)
 
 
-def voldoet_aan_constraints(record: dict, constraints: dict) -> bool:
+def vertaal_requirements(requirements: dict) -> Tuple[Dict[str, Tuple[Any, Any]], str, bool, int]:
+    """
+    requirements.json -> (grenzen {kolom: (min, max)}, doel-kolom, reverse, top_n)
+    voor engine.ranking.zoek_binnen_grenzen.
+    """
+    grenzen = {}
+    for veld, regels in requirements.get("constraints", {}).items():
+        if veld not in REQUIREMENT_KOLOMMEN:
+            raise ValueError(f"Onbekend requirement-veld: {veld}")
+        grenzen[REQUIREMENT_KOLOMMEN[veld]] = (regels.get("min"), regels.get("max"))
+
+    objective = requirements.get("objective", {})
+    primary   = objective.get("primary", "totaal_mg_co2")
+    if primary not in REQUIREMENT_KOLOMMEN:
+        raise ValueError(f"Onbekend objective: {primary}")
+    reverse = objective.get("direction", "min") == "max"
+    return grenzen, REQUIREMENT_KOLOMMEN[primary], reverse, int(requirements.get("top_n", 10))
+
+
+def summary_document(
+    gebouw_id: Any,
+    requirements: dict,
+    records: List[dict],
+    stat: Dict[str, int],
+    key: str,
+    reverse: bool,
+    top_n: int,
+    keuzes,
+    duur: float,
+) -> dict:
+    """
+    Output-vorm van gen_summary.py (results_summary_<gebouw>.json). stat zoals
+    engine.ranking.zoek_binnen_grenzen; keuzes(scenario_id) geeft de keuzes-dict.
+    """
+    veld = {kolom: v for v, kolom in REQUIREMENT_KOLOMMEN.items()}
+    return {
+        "meta": {
+            "gebouw_id":           gebouw_id,
+            "scenarios_total":     stat["totaal"],
+            "scenarios_evaluated": stat["doorgerekend"],
+            "scenarios_valid":     stat["binnen_grenzen"],
+            "gesnoeid": {
+                "grenzen": stat["gesnoeid_grenzen"],
+                "doel":    stat["gesnoeid_doel"],
+                "regels":  stat["gesnoeid_regels"],
+            },
+            "constraints": requirements.get("constraints", {}),
+            "objective":   veld[key],
+            "direction":   "max" if reverse else "min",
+            "top_n":       top_n,
+            "duur_s":      round(duur, 3),
+        },
+        "beste_scenarios": [
+            {
+                "scenario_id":     r["scenario_id"],
+                veld["cost_total"]: r["cost_total"],
+                veld["co2_total"]:  r["co2_total"],
+                "keuzes":          keuzes(r["scenario_id"]),
+            }
+            for r in records
+        ],
+    }
+
+
+def voldoet_aan_constraints(record: dict, constraints) -> bool:
     """
     record bevat:
         {
@@ -20,7 +113,12 @@ def voldoet_aan_constraints(record: dict, constraints: dict) -> bool:
             "totaal_prijs": ...,
             "totaal_mg_co2": ...   <- let op: was 'totaal_co2', nu consistent met compute.py
         }
+
+    constraints is {veld: {"min": .., "max": ..}}, of een RegelSet: dan worden
+    de keuzes van het record (zoals in scenarios.jsonl) aan de regels getoetst.
     """
+    if isinstance(constraints, RegelSet):
+        return constraints.voldoet(record["keuzes"])
 
     for veld, regels in constraints.items():
         waarde = record.get(veld)
@@ -37,4 +135,219 @@ def voldoet_aan_constraints(record: dict, constraints: dict) -> bool:
         if max_val is not None and waarde > max_val:
             return False
 
-    return True
\ No newline at end of file
+    return True
+
+
+def load_constraints(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        raise FileNotFoundError(f"Constraints bestand niet gevonden: {path}")
+
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Regel:
+    """
+    Eén constraint, gecompileerd tegen een scenarioruimte.
+
+    Een scenario schendt de regel als alle `if`-atomen gelden en niet alle
+    `then`-atomen. `requires` vraagt then-voorwaarden; `default` legt het
+    then-onderdeel vast op `set`, dus andere opties onder de voorwaarde vallen af.
+
+    status:
+        toegepast        regel snoeit (mogelijk) scenario's
+        niet_actief      voorwaarde kan in deze ruimte nooit (on)waar worden
+        niet_toepasbaar  then-onderdeel ontbreekt of de default-waarde is geen optie
+    """
+
+    def __init__(self, constraint: Dict[str, Any], ruimte: ScenarioRuimte):
+        self.constraint_id = constraint.get("constraint_id")
+        self.type          = constraint.get("type")
+        self.msg           = constraint.get("msg", "")
+        self.reden         = ""
+        self._as           = {oid: a for a, oid in enumerate(ruimte.onderdeel_ids)}
+        self._opties       = dict(ruimte.assen)
+
+        self.als = [self._atoom(c["onderdeel_id"], c["op"], c["value"]) for c in constraint.get("if", [])]
+        if self.type == "default":
+            self.dan = [self._atoom(c["onderdeel_id"], "==", c["set"]) for c in constraint.get("then", [])]
+        else:
+            self.dan = [self._atoom(c["onderdeel_id"], c["op"], c["value"]) for c in constraint.get("then", [])]
+
+        self.status = self._bepaal_status(constraint)
+        self.als    = [(a, m) for a, m in self.als if a is not None]
+        self.dan    = [(a, m) for a, m in self.dan if a is not None]
+        self.diepte = max((a + 1 for a, _ in self.als + self.dan), default=0)
+
+    def _atoom(self, oid: str, op: str, ref: Any) -> Tuple[Optional[int], Any]:
+        """(as, masker over de opties) of (None, constante) als het onderdeel ontbreekt."""
+        if op not in OPERATOREN:
+            raise ValueError(f"Onbekende operator '{op}' in constraint {self.constraint_id}")
+        if oid not in self._as:
+            return None, OPERATOREN[op](NONE, ref)
+        return self._as[oid], np.array([OPERATOREN[op](mid, ref) for mid in self._opties[oid]], dtype=bool)
+
+    def _bepaal_status(self, constraint: Dict[str, Any]) -> str:
+        for c in constraint.get("then", []):
+            oid = c["onderdeel_id"]
+            if oid not in self._as:
+                self.reden = f"onderdeel {oid} zit niet in de scenarioruimte"
+                return "niet_toepasbaar"
+            if self.type == "default" and c["set"] not in self._opties[oid]:
+                self.reden = f"{c['set']} is geen optie voor onderdeel {oid}"
+                return "niet_toepasbaar"
+
+        if any(a is None and not m for a, m in self.als):
+            self.reden = "voorwaarde geldt nooit"
+            return "niet_actief"
+        if all(m.all() for _, m in self.dan):
+            self.reden = "then-voorwaarden gelden altijd"
+            return "niet_actief"
+        return "toegepast"
+
+    def schendt(self, opties: np.ndarray) -> np.ndarray:
+        """Per rij (optie-indices per as) of de regel geschonden wordt."""
+        als = np.ones(len(opties), dtype=bool)
+        for a, masker in self.als:
+            als &= masker[opties[:, a]]
+        dan = np.ones(len(opties), dtype=bool)
+        for a, masker in self.dan:
+            dan &= masker[opties[:, a]]
+        return als & ~dan
+
+
+class RegelSet:
+    """
+    Alle constraints voor één scenarioruimte. Regels worden beslist op het
+    prefix van assen tot en met de diepste as die ze gebruiken; daaronder is
+    elke deelboom (een aaneengesloten id-bereik) geheel geldig of ongeldig.
+
+        regels = RegelSet(load_constraints(path), ruimte)
+        for ids in regels.id_blokken(250_000):
+            ...
+    """
+
+    def __init__(self, constraints: List[Dict[str, Any]], ruimte: ScenarioRuimte):
+        self.ruimte  = ruimte
+        self.regels  = [Regel(c, ruimte) for c in constraints]
+        self.actief  = [r for r in self.regels if r.status == "toegepast"]
+        self.diepte  = max((r.diepte for r in self.actief), default=0)
+        self.prefix  = ScenarioRuimte(ruimte.assen[:self.diepte])
+        self.deelboom = 1
+        for r in ruimte.radices[self.diepte:]:
+            self.deelboom *= r
+
+    def eerste_schending(self, opties: np.ndarray) -> np.ndarray:
+        """Index (in self.actief) van de eerste geschonden regel per rij, -1 = geldig."""
+        eerste = np.full(len(opties), -1, dtype=np.int64)
+        for i, regel in enumerate(self.actief):
+            eerste[(eerste < 0) & regel.schendt(opties)] = i
+        return eerste
+
+    def voldoet(self, keuzes: Dict[str, str]) -> bool:
+        """True als één scenario (keuzes {onderdeel_id: material_id}) geen actieve regel schendt."""
+        opties = np.zeros((1, len(self.ruimte.radices)), dtype=np.int32)
+        for a, (oid, ids) in enumerate(self.ruimte.assen):
+            if keuzes.get(oid) not in ids:
+                raise ValueError(f"Keuze {keuzes.get(oid)!r} voor onderdeel {oid} zit niet in de scenarioruimte")
+            opties[0, a] = ids.index(keuzes[oid])
+        return bool(self.eerste_schending(opties)[0] < 0)
+
+    def einde(self, max_scenarios: Optional[int] = None) -> int:
+        """
+        Laatste scenario_id (inclusief) zodat er hooguit max_scenarios geldige
+        scenario's tot en met dat id vallen; max_scenarios telt dus geldige
+        scenario's, net als zonder constraints.
+        """
+        if max_scenarios is None:
+            return self.ruimte.totaal
+        aantal = 0
+        for start, stop in self.geldige_bereiken():
+            if aantal + stop - start >= max_scenarios:
+                return start + max_scenarios - aantal - 1
+            aantal += stop - start
+        return self.ruimte.totaal
+
+    def shards(self, aantal: int, max_scenarios: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Als ScenarioRuimte.shards, met max_scenarios als aantal geldige scenario's."""
+        return self.ruimte.shards(aantal, self.einde(max_scenarios))
+
+    def geldige_bereiken(self, max_scenarios: Optional[int] = None, bereik: Optional[Tuple[int, int]] = None,
+                         blok_grootte: int = 65_536) -> Generator[Tuple[int, int], None, None]:
+        """(start, stop) bereiken van geldige scenario_ids; aangrenzende deelbomen samengevoegd."""
+        begin, stop = bereik or (1, self.einde(max_scenarios) + 1)
+        if begin >= stop:
+            return
+        if not self.actief:
+            yield begin, stop
+            return
+
+        # Prefixen (0-based) waarvan de deelboom het venster raakt
+        eerste_p = (begin - 1) // self.deelboom
+        laatste_p = (stop - 2) // self.deelboom + 1
+        open_start = open_stop = None
+        for p0 in range(eerste_p, laatste_p, blok_grootte):
+            p1     = min(p0 + blok_grootte, laatste_p)
+            geldig = self.eerste_schending(self.prefix.index_blok(p0 + 1, p1 + 1)) < 0
+
+            # Runs van geldige prefixen -> id-bereiken
+            rand   = np.flatnonzero(np.diff(np.concatenate(([False], geldig, [False])).astype(np.int8)))
+            for r0, r1 in zip(rand[::2].tolist(), rand[1::2].tolist()):
+                s0 = max((p0 + r0) * self.deelboom + 1, begin)
+                s1 = min((p0 + r1) * self.deelboom + 1, stop)
+                if open_start is not None and s0 == open_stop:
+                    open_stop = s1
+                    continue
+                if open_start is not None:
+                    yield open_start, open_stop
+                open_start, open_stop = s0, s1
+        if open_start is not None:
+            yield open_start, open_stop
+
+    def id_blokken(self, blok_grootte: int, max_scenarios: Optional[int] = None,
+                   bereik: Optional[Tuple[int, int]] = None) -> Generator[np.ndarray, None, None]:
+        """Geldige scenario_ids in arrays van hooguit blok_grootte (zelfde interface als ScenarioRuimte)."""
+        delen, aantal = [], 0
+        for start, stop in self.geldige_bereiken(max_scenarios, bereik):
+            while start < stop:
+                tot = min(stop, start + blok_grootte - aantal)
+                delen.append(np.arange(start, tot, dtype=np.int64))
+                aantal += tot - start
+                start   = tot
+                if aantal == blok_grootte:
+                    yield np.concatenate(delen)
+                    delen, aantal = [], 0
+        if delen:
+            yield np.concatenate(delen)
+
+    def aantal_geldig(self) -> int:
+        return self.ruimte.totaal - sum(r["gesnoeid"] for r in self.rapport())
+
+    def rapport(self) -> List[Dict[str, Any]]:
+        """
+        Per regel het aantal gesnoeide scenario's. Een scenario telt bij de
+        eerste regel die het schendt, zodat de aantallen optellen tot het totaal.
+        Exact berekend over alleen de assen die in regels voorkomen.
+        """
+        gesnoeid = {id(r): 0 for r in self.regels}
+        assen    = sorted({a for r in self.actief for a, _ in r.als + r.dan})
+        if assen:
+            rooster = ScenarioRuimte([self.ruimte.assen[a] for a in assen])
+            rest    = self.ruimte.totaal // rooster.totaal
+            opties  = np.zeros((rooster.totaal, len(self.ruimte.radices)), dtype=np.int32)
+            opties[:, assen] = rooster.index_blok(1, rooster.totaal + 1)
+            eerste  = self.eerste_schending(opties)
+            for i, regel in enumerate(self.actief):
+                gesnoeid[id(regel)] = int((eerste == i).sum()) * rest
+
+        return [
+            {
+                "constraint_id": r.constraint_id,
+                "type":          r.type,
+                "status":        r.status,
+                "gesnoeid":      gesnoeid[id(r)],
+                "reden":         r.reden,
+                "msg":           r.msg,
+            }
+            for r in self.regels
+        ]
@@ -0,0 +1,134 @@
+# engine/incrementeel.py
+#
+# Incrementeel herberekenen van results-kolommen. Totalen zijn sommen van
+# bijdragen per onderdeel (as), dus als één prijs of één afmeting wijzigt,
+# veranderen alleen de scenario's die op een geraakte as een gewijzigde optie
+# kiezen. Bij het wegschrijven van kolommen wordt een vingerafdruk in meta.json
+# bewaard (hashes + bijdragetabellen); bij een volgende run wordt daarmee
+# bepaald welke opties zijn gewijzigd en worden alleen die rijen herberekend.
+#
+# Rijen worden opnieuw opgeteld in asvolgorde (zoals de calculator) in plaats
+# van een delta op het afgeronde totaal, zodat de uitkomst gelijk blijft aan
+# een volledige herberekening.
+#
+from __future__ import annotations
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from engine.calculator import rond_af
+from engine.scenarios  import ScenarioRuimte
+
+VINGERAFDRUK_VERSIE = 1
+
+
+def inhoud_hash(waarde: Any) -> str:
+    """Korte, stabiele hash van een JSON-serialiseerbare waarde."""
+    tekst = json.dumps(waarde, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(tekst.encode("utf-8")).hexdigest()[:16]
+
+
+def materiaal_hashes(materials: Iterable[Dict[str, Any]], ruimte: ScenarioRuimte) -> Dict[str, str]:
+    """Hash per materials.jsonl-regel, alleen voor materialen die in de ruimte voorkomen."""
+    in_ruimte = {mid for _, ids in ruimte.assen for mid in ids}
+    return {m["material_id"]: inhoud_hash(m) for m in materials if m.get("material_id") in in_ruimte}
+
+
+def gebouw_hashes(gebouw: Dict[str, Any]) -> Dict[str, str]:
+    """Hash per afmetingen- en opties-veld."""
+    return {
+        f"{groep}.{veld}": inhoud_hash(waarde)
+        for groep in ("afmetingen", "opties")
+        for veld, waarde in gebouw.get(groep, {}).items()
+    }
+
+
+def vingerafdruk(
+    ruimte: ScenarioRuimte,
+    gebouw: Dict[str, Any],
+    materials: Iterable[Dict[str, Any]],
+    bijdragen: Dict[str, List[np.ndarray]],
+) -> Dict[str, Any]:
+    """Meta-blok voor KolomWriter: genoeg om later wijzigingen te bepalen."""
+    return {
+        "versie":    VINGERAFDRUK_VERSIE,
+        "materials": materiaal_hashes(materials, ruimte),
+        "gebouw":    gebouw_hashes(gebouw),
+        "bijdragen": {naam: [b.tolist() for b in per_as] for naam, per_as in bijdragen.items()},
+    }
+
+
+def bepaal_wijzigingen(
+    meta: Dict[str, Any],
+    ruimte: ScenarioRuimte,
+    nieuw: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """
+    Vergelijkt de opgeslagen vingerafdruk met de nieuwe. Geeft None als
+    incrementeel niet kan (andere assen of geen/oude vingerafdruk), anders
+    {"materials", "gebouw": gewijzigde sleutels, "opties": {as: bool-masker}}.
+    """
+    oud = meta.get("vingerafdruk")
+    if not oud or oud.get("versie") != VINGERAFDRUK_VERSIE:
+        return None
+    if [list(a) for a in meta.get("assen", [])] != [[oid, ids] for oid, ids in ruimte.assen]:
+        return None
+
+    opties = {}
+    for a, radix in enumerate(ruimte.radices):
+        masker = np.zeros(radix, dtype=bool)
+        for naam, per_as in nieuw["bijdragen"].items():
+            masker |= np.asarray(oud["bijdragen"][naam][a]) != np.asarray(per_as[a])
+        if masker.any():
+            opties[a] = masker
+
+    def verschil(a: Dict[str, str], b: Dict[str, str]) -> List[str]:
+        return sorted(k for k in set(a) | set(b) if a.get(k) != b.get(k))
+
+    return {
+        "materials": verschil(oud["materials"], nieuw["materials"]),
+        "gebouw":    verschil(oud["gebouw"], nieuw["gebouw"]),
+        "opties":    opties,
+    }
+
+
+def werk_kolommen_bij(
+    kolommen: Dict[str, np.ndarray],
+    ruimte: ScenarioRuimte,
+    bijdragen: Dict[str, List[np.ndarray]],
+    opties: Dict[int, np.ndarray],
+    blok_grootte: int = 1_000_000,
+) -> int:
+    """
+    Herberekent in-place (memmap "r+") de rijen die op een gewijzigde optie
+    vallen. Geeft het aantal bijgewerkte rijen.
+    """
+    if not opties:
+        return 0
+
+    ids_kolom = kolommen["scenario_id"]
+    bijgewerkt = 0
+    for start in range(0, len(ids_kolom), blok_grootte):
+        ids   = np.asarray(ids_kolom[start:start + blok_grootte])
+        index = ruimte.index_ids(ids)
+
+        geraakt = np.zeros(len(ids), dtype=bool)
+        for a, masker in opties.items():
+            geraakt |= masker[index[:, a]]
+        rijen = np.flatnonzero(geraakt)
+        if not len(rijen):
+            continue
+
+        for naam, per_as in bijdragen.items():
+            totaal = np.zeros(len(rijen), dtype=np.float64)
+            for a, b in enumerate(per_as):
+                totaal += b[index[rijen, a]]
+            kolommen[naam][start + rijen] = rond_af(totaal)
+        bijgewerkt += len(rijen)
+
+    for kolom in kolommen.values():
+        if isinstance(kolom, np.memmap):
+            kolom.flush()
+    return bijgewerkt
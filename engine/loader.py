@@ -1,18 +1,308 @@
 # engine/loader.py
 from __future__ import annotations
+import gzip
+import hashlib
+import io
 import json
+import re
+from array import array
 from pathlib import Path
-from typing import Any, Dict, Generator, Optional
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from engine.metrics   import tel
+from engine.scenarios import ScenarioRuimte
+from engine.writer    import SCENARIO_MAGIC, KolomWriter
+
+SCENARIO_ID_RE = re.compile(rb'"scenario_id"\s*:\s*(\d+)')
+
+
+def open_binair(path: Path):
+    """
+    Opent een (eventueel gzip/zstd gecomprimeerd) bestand als ongecomprimeerde
+    bytes. Meerdere members/frames achter elkaar (voeg_jsonl_samen) worden als
+    één stroom gelezen; zstd stopt anders na het eerste frame.
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        import zstandard
+        lezer = zstandard.ZstdDecompressor().stream_reader(path.open("rb"), read_across_frames=True)
+        return io.BufferedReader(lezer)
+    return path.open("rb")
 
 
 def read_jsonl(path: Path) -> Generator[Dict[str, Any], None, None]:
+    """Records uit een JSONL-bestand; bytes_gelezen telt ongecomprimeerde bytes."""
     if not path.exists():
         raise FileNotFoundError(f"Bestand niet gevonden: {path}")
-    with path.open("r", encoding="utf-8") as f:
+    aantal = gelezen = 0
+    try:
+        with open_binair(path) as f:
+            for line in f:
+                gelezen += len(line)
+                line = line.strip()
+                if line:
+                    aantal += 1
+                    yield json.loads(line)
+    finally:
+        tel("loader.read_jsonl", aantal, gelezen)
+
+
+def byte_bereiken(path: Path, aantal: int) -> List[Tuple[int, int]]:
+    """Verdeelt een (ongecomprimeerd) bestand in `aantal` aaneengesloten byte-bereiken."""
+    grootte = path.stat().st_size
+    grenzen = [grootte * i // aantal for i in range(aantal + 1)]
+    return [(a, b) for a, b in zip(grenzen, grenzen[1:]) if b > a]
+
+
+def read_jsonl_bereik(path: Path, start: int, stop: int) -> Generator[Dict[str, Any], None, None]:
+    """
+    Records waarvan de regel begint in [start, stop). Bereiken uit
+    byte_bereiken dekken samen elk record precies één keer.
+    """
+    aantal = 0
+    with path.open("rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # rest van de regel hoort bij het vorige bereik
+        begin = f.tell()
+        try:
+            while f.tell() < stop:
+                line = f.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if line:
+                    aantal += 1
+                    yield json.loads(line)
+        finally:
+            tel("loader.read_jsonl", aantal, f.tell() - begin)
+
+
+# ── Scenariobestanden (scenarios.jsonl of compact .scen) ────────────────────
+
+def is_compact(path: Path) -> bool:
+    """True voor een compact scenariobestand (engine.writer.ScenarioWriter)."""
+    with path.open("rb") as f:
+        return f.read(len(SCENARIO_MAGIC)) == SCENARIO_MAGIC
+
+
+def read_scenarios_header(path: Path) -> Tuple[Dict[str, Any], int]:
+    """(header, byte-offset van het eerste scenario_id) van een compact scenariobestand."""
+    with path.open("rb") as f:
+        if f.read(len(SCENARIO_MAGIC)) != SCENARIO_MAGIC:
+            raise ValueError(f"Geen compact scenariobestand: {path}")
+        lengte = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(lengte))
+    return header, len(SCENARIO_MAGIC) + 8 + lengte
+
+
+def scenario_aantal(path: Path) -> int:
+    """Aantal scenario's in een compact scenariobestand (uit de bestandsgrootte)."""
+    _, start = read_scenarios_header(path)
+    return (path.stat().st_size - start) // 8
+
+
+def scenario_bereiken(path: Path, aantal: int) -> List[Tuple[int, int]]:
+    """Verdeelt de rijen van een compact scenariobestand in `aantal` aaneengesloten (start, stop) bereiken."""
+    n       = scenario_aantal(path)
+    grenzen = [n * i // aantal for i in range(aantal + 1)]
+    return [(a, b) for a, b in zip(grenzen, grenzen[1:]) if b > a]
+
+
+def read_scenario_ids(path: Path, blok_grootte: int = 65_536,
+                      bereik: Optional[Tuple[int, int]] = None) -> Generator[np.ndarray, None, None]:
+    """Streamt de scenario_ids van een compact bestand in blokken (optioneel alleen rijen [start, stop))."""
+    _, begin = read_scenarios_header(path)
+    start, stop = bereik or (0, scenario_aantal(path))
+    aantal = 0
+    with path.open("rb") as f:
+        f.seek(begin + start * 8)
+        try:
+            for a in range(start, stop, blok_grootte):
+                n   = min(blok_grootte, stop - a)
+                ids = np.frombuffer(f.read(n * 8), dtype="<i8")
+                if not len(ids):
+                    break
+                aantal += len(ids)
+                yield ids
+        finally:
+            tel("loader.read_scenarios", aantal, aantal * 8)
+
+
+def read_scenarios(path: Path, bereik: Optional[Tuple[int, int]] = None) -> Generator[Dict[str, Any], None, None]:
+    """
+    Scenario-records {scenario_id, gebouw_id, keuzes} uit scenarios.jsonl of
+    een compact .scen-bestand; compact wordt per blok gedecodeerd via de assen
+    in de header, er wordt nooit het hele bestand in het geheugen gehouden.
+    """
+    if not is_compact(path):
+        yield from read_jsonl(path)
+        return
+    header, _ = read_scenarios_header(path)
+    ruimte    = ScenarioRuimte(header["assen"], header.get("gebouw_id"))
+    for ids in read_scenario_ids(path, bereik=bereik):
+        yield from ruimte.records(ids)
+
+
+def _nieuwste(kandidaten: List[Path]) -> Optional[Path]:
+    """
+    Meest recent geschreven kandidaat (mtime; bij een kolommenmap die van
+    meta.json, dat als laatste wordt geschreven). Bij gelijke mtime wint de
+    eerste in de lijst.
+    """
+    def kenmerk(pad: Path):
+        bron = pad / "meta.json" if pad.is_dir() else pad
+        return bron.stat().st_mtime_ns if bron.exists() else -1
+    return max(kandidaten, key=kenmerk, default=None)
+
+
+def find_scenarios(output_dir: Path) -> Optional[Path]:
+    """
+    scenarios.scen (compact) of scenarios.jsonl(.gz/.zst) in output_dir; staan
+    er meerdere, dan het laatst geschreven (bij gelijke mtime compact eerst).
+    """
+    namen = ("scenarios.scen", "scenarios.jsonl", "scenarios.jsonl.gz", "scenarios.jsonl.zst")
+    return _nieuwste([output_dir / naam for naam in namen if (output_dir / naam).exists()])
+
+
+def scenarios_gebouw_id(path: Path) -> Optional[str]:
+    """gebouw_id van een scenariobestand (header van .scen, anders de eerste regel), of None."""
+    if is_compact(path):
+        gebouw_id = read_scenarios_header(path)[0].get("gebouw_id")
+    else:
+        eerste    = next(read_jsonl(path), None)
+        gebouw_id = eerste.get("gebouw_id") if eerste else None
+    return None if gebouw_id is None else str(gebouw_id)
+
+
+def bron_kenmerk(path: Path, inhoud: bool = False) -> Dict[str, Any]:
+    """
+    Grootte + mtime van een bronbestand, om afgeleide bestanden (index, tabel)
+    te valideren. Met inhoud=True ook een sha1 van de bytes, voor kleine
+    bronnen waar een wijziging met gelijke grootte en mtime niet gemist mag worden.
+    """
+    st      = path.stat()
+    kenmerk = {"grootte": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if inhoud:
+        h = hashlib.sha1()
+        with path.open("rb") as f:
+            for blok in iter(lambda: f.read(1 << 20), b""):
+                h.update(blok)
+        kenmerk["sha1"] = h.hexdigest()
+    return kenmerk
+
+
+def scenario_index_pad(path: Path) -> Path:
+    """scenarios.jsonl -> scenarios.jsonl.index (kolommen scenario_id + offset)"""
+    return path.with_name(path.name + ".index")
+
+
+def scenario_index_kolommen(path: Path) -> Dict[str, np.ndarray]:
+    """
+    Offset-index (scenario_id -> byte-offset van de regel) van een
+    ongecomprimeerde scenarios.jsonl in het geheugen, gesorteerd op
+    scenario_id. Alleen het scenario_id wordt uit elke regel gehaald; de rest
+    wordt niet geparsed.
+    """
+    ids: List[int]     = []
+    offsets: List[int] = []
+    offset = 0
+    with path.open("rb") as f:
         for line in f:
-            line = line.strip()
-            if line:
-                yield json.loads(line)
+            m = SCENARIO_ID_RE.search(line)
+            if m:
+                ids.append(int(m.group(1)))
+                offsets.append(offset)
+            elif line.strip():
+                ids.append(int(json.loads(line)["scenario_id"]))
+                offsets.append(offset)
+            offset += len(line)
+
+    ids_arr  = np.array(ids, dtype=np.int64)
+    volgorde = np.argsort(ids_arr, kind="stable")
+    return {"scenario_id": ids_arr[volgorde], "offset": np.array(offsets, dtype=np.int64)[volgorde]}
+
+
+def bouw_scenario_index(path: Path) -> Path:
+    """Schrijft de offset-index (scenario_index_kolommen) naast scenarios.jsonl."""
+    pad = scenario_index_pad(path)
+    with KolomWriter(pad, {"scenario_id": "int64", "offset": "int64"}, {"bron": bron_kenmerk(path)}) as w:
+        w.schrijf(**scenario_index_kolommen(path))
+    return pad
+
+
+def read_scenario_index(path: Path) -> Dict[str, np.ndarray]:
+    """
+    Offset-index van scenarios.jsonl (memmap); wordt (opnieuw) gebouwd als die
+    ontbreekt of verouderd is. Kan de index niet geschreven worden (read-only
+    map, schijf vol), dan wordt hij alleen in het geheugen opgebouwd.
+    """
+    pad = scenario_index_pad(path)
+    if pad.exists():
+        try:
+            kolommen, meta = read_kolommen(pad)
+            if meta.get("bron") == bron_kenmerk(path):
+                return kolommen
+        except (OSError, ValueError, KeyError):
+            pass  # onleesbare/kapotte index: opnieuw opbouwen
+    try:
+        return read_kolommen(bouw_scenario_index(path))[0]
+    except OSError:
+        return scenario_index_kolommen(path)
+
+
+def _zoek_gesorteerd(ids: np.ndarray, gevraagd: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(posities, gevonden ids) van gevraagd in de oplopende array ids (binair zoeken)."""
+    if not len(ids):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pos  = np.searchsorted(ids, gevraagd)
+    raak = (pos < len(ids)) & (ids[np.minimum(pos, len(ids) - 1)] == gevraagd)
+    return pos[raak], gevraagd[raak]
+
+
+def zoek_scenarios(path: Path, scenario_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Random access: {scenario_id: record} voor een handvol scenario_ids,
+    zonder het scenariobestand te scannen. Onbekende ids ontbreken.
+
+      .scen    binair zoeken in de (oplopende) ids, keuzes uit de assen
+      .jsonl   offset-index (read_scenario_index) + seek per regel
+      .gz/.zst niet seekbaar: lineaire scan
+    """
+    gevraagd = np.unique(np.fromiter((int(s) for s in scenario_ids), dtype=np.int64))
+    if not len(gevraagd):
+        return {}
+
+    if is_compact(path):
+        header, start = read_scenarios_header(path)
+        n   = (path.stat().st_size - start) // 8
+        ids = np.memmap(path, dtype="<i8", mode="r", offset=start, shape=(n,)) if n else np.empty(0, dtype=np.int64)
+        _, gevonden = _zoek_gesorteerd(ids, gevraagd)
+        ruimte   = ScenarioRuimte(header["assen"], header.get("gebouw_id"))
+        resultaat = {s["scenario_id"]: s for s in ruimte.records(gevonden)}
+    elif path.suffix in (".gz", ".zst"):
+        set_ids   = set(gevraagd.tolist())
+        resultaat = {s["scenario_id"]: s for s in read_jsonl(path) if s["scenario_id"] in set_ids}
+    else:
+        index = read_scenario_index(path)
+        pos, _ = _zoek_gesorteerd(index["scenario_id"], gevraagd)
+        resultaat = {}
+        with path.open("rb") as f:
+            for offset in index["offset"][pos].tolist():
+                f.seek(offset)
+                s = json.loads(f.readline())
+                resultaat[s["scenario_id"]] = s
+
+    tel("loader.zoek_scenarios", len(resultaat))
+    return resultaat
+
+
+def zoek_scenario(path: Path, scenario_id: int) -> Optional[Dict[str, Any]]:
+    """Eén scenario-record via zoek_scenarios, of None."""
+    return zoek_scenarios(path, [scenario_id]).get(int(scenario_id))
 
 
 def read_materials_lookup(path: Path) -> Dict[str, Dict[str, Any]]:
@@ -20,8 +310,13 @@ def read_materials_lookup(path: Path) -> Dict[str, Dict[str, Any]]:
     Lookup: { material_id -> { prijs, co2_value, enh, naam, duurzaam } }
     Veldnamen conform nieuwe materials.jsonl (gen_csv.py output).
     """
+    return materials_lookup(read_jsonl(path))
+
+
+def materials_lookup(materials: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Zelfde lookup als read_materials_lookup, uit materials-records in het geheugen."""
     lookup: Dict[str, Dict[str, Any]] = {}
-    for m in read_jsonl(path):
+    for m in materials:
         mid = m.get("material_id")
         if not mid:
             continue
@@ -47,4 +342,74 @@ def read_gebouw(path: Path, gebouw_id: Optional[str] = None) -> Optional[Dict[st
                 if str(g.get("gebouw_id")) == str(gebouw_id):
                     return g
         return data[0] if data else None
-    return data
\ No newline at end of file
+    return data
+
+
+def read_gebouwen(path: Path) -> List[Dict[str, Any]]:
+    """Alle gebouwen uit gebouwgegevens.json (lijst of één object)."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data if isinstance(data, list) else [data]
+
+
+def read_kolommen(path: Path, modus: str = "r") -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Leest een kolommenmap (engine.writer.KolomWriter) als memmaps; standaard
+    read-only, met modus="r+" schrijfbaar (incrementeel bijwerken).
+    Er wordt niets gekopieerd; alleen de pagina's die gebruikt worden, worden gelezen.
+    """
+    meta_path = path / "meta.json"
+    if not meta_path.exists():
+        raise FileNotFoundError(f"Kolommenmap niet gevonden: {path}")
+    meta  = json.loads(meta_path.read_text(encoding="utf-8"))
+    rijen = meta["rijen"]
+
+    kolommen: Dict[str, np.ndarray] = {}
+    for naam, info in meta["kolommen"].items():
+        dtype = np.dtype(info["dtype"])
+        shape = (rijen, info["breedte"]) if info["breedte"] > 1 else (rijen,)
+        if rijen == 0:
+            kolommen[naam] = np.empty(shape, dtype=dtype)
+        else:
+            kolommen[naam] = np.memmap(path / f"{naam}.bin", dtype=dtype, mode=modus, shape=shape)
+    tel("loader.read_kolommen", rijen)
+    return kolommen, meta
+
+
+def read_results_kolommen(path: Path) -> Dict[str, np.ndarray]:
+    """
+    scenario_id/cost_total/co2_total van een results-bestand als arrays:
+    een kolommenmap als memmaps, JSONL gestreamd naar getypeerde kolommen
+    (geen lijst dicts, dus een lage geheugenpiek).
+    """
+    if path.is_dir():
+        return read_kolommen(path)[0]
+    ids, prijs, co2 = array("q"), array("d"), array("d")
+    for r in read_jsonl(path):
+        ids.append(r["scenario_id"])
+        prijs.append(r["cost_total"])
+        co2.append(r["co2_total"])
+    return {
+        "scenario_id": np.frombuffer(ids,   dtype=np.int64),
+        "cost_total":  np.frombuffer(prijs, dtype=np.float64),
+        "co2_total":   np.frombuffer(co2,   dtype=np.float64),
+    }
+
+
+def kolommen_pad(results_path: Path) -> Path:
+    """results_gebouw_001.jsonl(.gz) -> results_gebouw_001.kolommen (zelfde map)."""
+    return results_path.with_name(results_path.name.split(".")[0] + ".kolommen")
+
+
+def find_results(output_dir: Path, gebouw_id: Optional[str] = None) -> Optional[Path]:
+    """
+    Zoekt het results-bestand van een gebouw (of het eerste gebouw). Staan er
+    meerdere formaten naast elkaar, dan wint het laatst geschreven bestand,
+    zodat een oudere export nooit een nieuwere run overschaduwt.
+    """
+    naam    = f"results_{gebouw_id}" if gebouw_id else "results_gebouw_*"
+    matches = [p for suffix in (".kolommen", ".jsonl", ".jsonl.gz", ".jsonl.zst")
+               for p in sorted(output_dir.glob(naam + suffix))]
+    if not matches:
+        return None
+    eerste = min(p.name.split(".")[0] for p in matches)
+    return _nieuwste([p for p in matches if p.name.split(".")[0] == eerste])
@@ -0,0 +1,211 @@
+# engine/materiaaltabel.py
+#
+# Gecompileerde materialentabel: in plaats van een dict van dicts per
+# material_id (read_materials_lookup) staan de materialen als kolommen
+#
+#   ids          geïnterneerde material_ids; index 0 is NONE (NONE_INDEX)
+#   prijs        float64
+#   co2_value    float64
+#   duurzaam     int8 (-1 = onbekend)
+#   naam / enh / onderdeel_id   voor weergave
+#
+# gesorteerd op (onderdeel_id, material_id), zodat elk onderdeel een
+# aaneengesloten indexbereik heeft. Die integer-index wijkt dus af van
+# bouw_materiaal_arrays over een dict (invoervolgorde); bouw_materiaal_arrays
+# geeft voor een tabel de arrays van de tabel zelf terug, zodat matrix en
+# arrays binnen één run altijd uit dezelfde bron komen.
+#
+# De tabel is ook een Mapping material_id -> record (zelfde velden als
+# read_materials_lookup), zodat bestaande functies hem ongewijzigd accepteren.
+#
+# Op schijf staat de tabel als één binair bestand naast materials.jsonl
+# (materials.tabel): magic, lengte + JSON-header, daarna de arrays. Laden is
+# één read; de header bevat grootte, mtime en een inhoudshash van de bron,
+# zodat een gewijzigde materials.jsonl automatisch opnieuw gecompileerd wordt,
+# ook als grootte en mtime toevallig gelijk blijven.
+#
+from __future__ import annotations
+import json
+import os
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.calculator  import NONE_INDEX
+from engine.incrementeel import inhoud_hash
+from engine.loader      import bron_kenmerk, materials_lookup, read_jsonl
+from engine.metrics     import tel
+
+MAGIC   = b"MTABEL1\n"
+ARRAYS  = {"prijs": "<f8", "co2_value": "<f8", "duurzaam": "i1"}
+UITLIJN = 8
+
+
+def tabel_pad(materials_path: Path) -> Path:
+    """data/brondata/materials.jsonl -> data/brondata/materials.tabel"""
+    return materials_path.with_name(materials_path.name.split(".")[0] + ".tabel")
+
+
+class MateriaalTabel(Mapping):
+    """Materialen als kolommen met integer-index; ook te gebruiken als material_lookup."""
+
+    def __init__(self, ids: Sequence[str], kolommen: Dict[str, np.ndarray],
+                 naam: Sequence[Optional[str]], enh: Sequence[str], onderdeel_id: Sequence[Optional[str]],
+                 versie: Optional[str] = None):
+        self.ids          = [sys.intern(mid) for mid in ids]
+        self.index        = {mid: i for i, mid in enumerate(self.ids) if i != NONE_INDEX}
+        self.prijs        = kolommen["prijs"]
+        self.co2_value    = kolommen["co2_value"]
+        self.duurzaam     = kolommen["duurzaam"]
+        self.naam         = list(naam)
+        self.enh          = list(enh)
+        self.onderdeel_id = list(onderdeel_id)
+
+        self.bereiken: Dict[str, Tuple[int, int]] = {}
+        for i in range(1, len(self.ids)):
+            oid   = self.onderdeel_id[i] or ""
+            start = self.bereiken.get(oid, (i, i))[0]
+            self.bereiken[oid] = (start, i + 1)
+        self.versie = versie or inhoud_hash([self.ids, self.prijs.tolist(), self.co2_value.tolist(),
+                                             self.duurzaam.tolist(), self.naam, self.enh, self.onderdeel_id])
+
+    @classmethod
+    def van_records(cls, materials: Iterable[Dict[str, Any]]) -> "MateriaalTabel":
+        """Compileert materials-records; dubbele material_ids zoals in materials_lookup (laatste wint)."""
+        lookup = materials_lookup(materials)
+        volgorde = sorted(lookup, key=lambda mid: (lookup[mid]["onderdeel_id"] or "", mid))
+        rijen = [lookup[mid] for mid in volgorde]
+        kolommen = {
+            "prijs":     np.array([0.0] + [m["prijs"] for m in rijen], dtype=np.float64),
+            "co2_value": np.array([0.0] + [m["co2_value"] for m in rijen], dtype=np.float64),
+            "duurzaam":  np.array([-1] + [-1 if m["duurzaam"] is None else int(m["duurzaam"]) for m in rijen], dtype=np.int8),
+        }
+        return cls(
+            ["NONE"] + volgorde,
+            kolommen,
+            [None] + [m["naam"] for m in rijen],
+            [""] + [m["enh"] for m in rijen],
+            [None] + [m["onderdeel_id"] for m in rijen],
+        )
+
+    # ── Mapping (compatibel met read_materials_lookup) ───────────────────────
+
+    def record(self, i: int) -> Dict[str, Any]:
+        d = int(self.duurzaam[i])
+        return {
+            "prijs":        float(self.prijs[i]),
+            "co2_value":    float(self.co2_value[i]),
+            "enh":          self.enh[i],
+            "naam":         self.naam[i],
+            "duurzaam":     None if d < 0 else d,
+            "onderdeel_id": self.onderdeel_id[i],
+        }
+
+    def __getitem__(self, material_id: str) -> Dict[str, Any]:
+        return self.record(self.index[material_id])
+
+    def __contains__(self, material_id: object) -> bool:
+        return material_id in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids[1:])
+
+    def __len__(self) -> int:
+        return len(self.ids) - 1
+
+    # ── Integer-paden ────────────────────────────────────────────────────────
+
+    def arrays(self) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+        """(materiaal_index, prijzen, co2s) in de vorm van bouw_materiaal_arrays, met de index van de tabel."""
+        return self.index, self.prijs, self.co2_value
+
+    def indices(self, material_ids: Iterable[str]) -> np.ndarray:
+        """material_ids -> integer-indices; NONE en onbekend -> NONE_INDEX."""
+        return np.array([self.index.get(mid, NONE_INDEX) for mid in material_ids], dtype=np.int32)
+
+    def bereik(self, onderdeel_id: str) -> range:
+        """Indices van alle materialen van één onderdeel."""
+        return range(*self.bereiken.get(onderdeel_id, (0, 0)))
+
+    # ── Binair formaat ───────────────────────────────────────────────────────
+
+    def schrijf(self, path: Path, bron: Optional[Dict[str, Any]] = None):
+        """Schrijft de tabel atomair (tmp + os.replace)."""
+        offset, plaats = 0, {}
+        for naam, dtype in ARRAYS.items():
+            n = len(getattr(self, naam))
+            plaats[naam] = [dtype, offset, n]
+            offset += -(-n * np.dtype(dtype).itemsize // UITLIJN) * UITLIJN
+        header = json.dumps({
+            "versie":       self.versie,
+            "bron":         bron,
+            "ids":          self.ids,
+            "naam":         self.naam,
+            "enh":          self.enh,
+            "onderdeel_id": self.onderdeel_id,
+            "arrays":       plaats,
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % UITLIJN)
+
+        data = bytearray(offset)
+        for naam, (dtype, start, n) in plaats.items():
+            ruw = getattr(self, naam).astype(dtype).tobytes()
+            data[start:start + len(ruw)] = ruw
+
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(MAGIC + len(header).to_bytes(8, "little") + header + data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def laad(cls, path: Path) -> Tuple["MateriaalTabel", Optional[Dict[str, Any]]]:
+        """Leest een .tabel-bestand in één read; geeft (tabel, bron uit de header)."""
+        buf = path.read_bytes()
+        if not buf.startswith(MAGIC):
+            raise ValueError(f"Geen materialentabel: {path}")
+        lengte = int.from_bytes(buf[len(MAGIC):len(MAGIC) + 8], "little")
+        begin  = len(MAGIC) + 8
+        header = json.loads(buf[begin:begin + lengte])
+        data   = begin + lengte
+        kolommen = {
+            naam: np.frombuffer(buf, dtype=dtype, count=n, offset=data + start)
+            for naam, (dtype, start, n) in header["arrays"].items()
+        }
+        tel("materiaaltabel.laad", len(header["ids"]) - 1, len(buf))
+        tabel = cls(header["ids"], kolommen, header["naam"], header["enh"], header["onderdeel_id"], header["versie"])
+        return tabel, header.get("bron")
+
+
+def read_materiaal_tabel(materials_path: Path, cache: bool = True) -> MateriaalTabel:
+    """
+    Materialentabel voor materials.jsonl. Gebruikt materials.tabel als die bij
+    de huidige bron hoort; anders wordt opnieuw gecompileerd en (met cache)
+    weggeschreven.
+    """
+    pad  = tabel_pad(materials_path)
+    bron = bron_kenmerk(materials_path, inhoud=True)
+    if cache and pad.exists():
+        try:
+            tabel, opgeslagen = MateriaalTabel.laad(pad)
+            if opgeslagen == bron:
+                return tabel
+        except (ValueError, KeyError):
+            pass  # oud/kapot formaat: opnieuw compileren
+
+    tabel = MateriaalTabel.van_records(read_jsonl(materials_path))
+    if cache:
+        try:
+            tabel.schrijf(pad, bron)
+        except OSError:
+            pass  # read-only map: dan alleen in het geheugen
+    return tabel
+
+
+def schrijf_materiaal_tabel(tabel: MateriaalTabel, materials_path: Path) -> Path:
+    """Schrijft de tabel naast een (net geschreven) materials.jsonl, gekoppeld aan die bron."""
+    pad = tabel_pad(materials_path)
+    tabel.schrijf(pad, bron_kenmerk(materials_path, inhoud=True))
+    return pad
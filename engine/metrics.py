@@ -0,0 +1,204 @@
+# engine/metrics.py
+#
+# Lichte instrumentatie voor de hot paths. Modules tellen per stap:
+#
+#   duur_s            wandkloktijd (met stap(...) als context manager)
+#   aantal            verwerkte records/scenario's
+#   bytes_gelezen     / bytes_geschreven
+#
+# in één registry per proces (METRICS). Tellen gebeurt per blok of per
+# bestand, niet per record, dus de overhead is verwaarloosbaar. Met --metrics
+# (of --profiel) schrijven de gen-scripts via draai_met_metrics aan het eind
+# een rapport naast hun output (results_<gebouw>.metrics.json) met records/s
+# en piek-RSS; zonder die vlag blijft de outputmap schoon.
+#
+# Profileren is opt-in (profiel(...)): "cprofile" schrijft een .prof-bestand
+# en de duurste functies in het rapport; "sample" is een sampling-profiler op
+# SIGPROF (alleen Unix) met weinig overhead, geschikt voor lange runs.
+#
+from __future__ import annotations
+import collections
+import cProfile
+import io
+import json
+import pstats
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+PROFIELEN = ("cprofile", "sample")
+
+
+def piek_rss_mb(kinderen: bool = False) -> float:
+    """Piek-RSS van dit proces of van (afgesloten) kindprocessen; ru_maxrss is KB op Linux, bytes op macOS."""
+    piek = resource.getrusage(resource.RUSAGE_CHILDREN if kinderen else resource.RUSAGE_SELF).ru_maxrss
+    return round(piek / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def metrics_pad(output_path: Path) -> Path:
+    """results_gebouw_001.jsonl(.gz) / .kolommen -> results_gebouw_001.metrics.json"""
+    return output_path.with_name(output_path.name.split(".")[0] + ".metrics.json")
+
+
+class Metrics:
+    """Registry van stappen: {naam: {duur_s, aantal, bytes_gelezen, bytes_geschreven, aanroepen}}."""
+
+    def __init__(self):
+        self.start   = time.perf_counter()
+        self.stappen: Dict[str, Dict[str, float]] = {}
+        self.extra:   Dict[str, Any] = {}
+        self.profiler: Optional[cProfile.Profile] = None
+
+    def _stap(self, naam: str) -> Dict[str, float]:
+        if naam not in self.stappen:
+            self.stappen[naam] = {"duur_s": 0.0, "aantal": 0, "bytes_gelezen": 0, "bytes_geschreven": 0, "aanroepen": 0}
+        return self.stappen[naam]
+
+    @contextmanager
+    def stap(self, naam: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            s = self._stap(naam)
+            s["duur_s"]    += time.perf_counter() - t0
+            s["aanroepen"] += 1
+
+    def tel(self, naam: str, aantal: int = 0, gelezen: int = 0, geschreven: int = 0):
+        s = self._stap(naam)
+        s["aantal"]           += aantal
+        s["bytes_gelezen"]    += gelezen
+        s["bytes_geschreven"] += geschreven
+
+    def export(self) -> Dict[str, Dict[str, float]]:
+        return {naam: dict(s) for naam, s in self.stappen.items()}
+
+    def voeg_samen(self, stappen: Dict[str, Dict[str, float]]):
+        """Telt stappen uit een ander proces (export()) op; duur is dan CPU-tijd over alle workers."""
+        for naam, s in stappen.items():
+            doel = self._stap(naam)
+            for k, v in s.items():
+                doel[k] += v
+
+    def reset(self):
+        self.__init__()
+
+    def rapport(self, **extra: Any) -> Dict[str, Any]:
+        stappen = {}
+        for naam, s in self.stappen.items():
+            stappen[naam] = {
+                **{k: round(v, 4) if k == "duur_s" else int(v) for k, v in s.items()},
+                "records_s": round(s["aantal"] / s["duur_s"]) if s["aantal"] and s["duur_s"] > 0 else None,
+            }
+        return {
+            **self.extra,
+            **extra,
+            "totaal_s":            round(time.perf_counter() - self.start, 4),
+            "piek_rss_mb":         piek_rss_mb(),
+            "piek_rss_workers_mb": piek_rss_mb(kinderen=True) or None,
+            "stappen":             stappen,
+        }
+
+    def schrijf(self, output_path: Path, **extra: Any) -> Path:
+        """Schrijft het rapport naast output_path; geeft het pad van het rapport."""
+        pad = metrics_pad(Path(output_path))
+        pad.parent.mkdir(parents=True, exist_ok=True)
+        if self.profiler is not None:
+            prof_pad = pad.with_name(pad.name.replace(".metrics.json", ".prof"))
+            self.profiler.dump_stats(prof_pad)
+            self.extra["profiel"]["bestand"] = prof_pad.name
+        pad.write_text(json.dumps(self.rapport(**extra), indent=2, ensure_ascii=False), encoding="utf-8")
+        return pad
+
+
+METRICS = Metrics()
+stap    = METRICS.stap
+tel     = METRICS.tel
+
+
+def draai_met_metrics(genereer: Callable[[Any], Optional[Tuple[Path, Dict[str, Any]]]], args: Any, script: str):
+    """
+    Draait genereer(args) binnen profiel(args.profiel). genereer geeft
+    (outputpad, extra velden) of None; alleen met args.metrics of een profiel
+    wordt het rapport geschreven.
+    """
+    with profiel(args.profiel):
+        resultaat = genereer(args)
+    if resultaat and (args.metrics or args.profiel):
+        pad, extra = resultaat
+        print(f"Metrics -> {METRICS.schrijf(pad, script=script, **extra)}")
+    return resultaat
+
+
+@contextmanager
+def profiel(soort: Optional[str], top: int = 25) -> Iterator[None]:
+    """
+    Opt-in profiler rond een blok. Resultaat komt in METRICS.extra["profiel"]
+    (duurste functies); bij cprofile schrijft METRICS.schrijf ook <output>.prof
+    voor snakeviz/pstats.
+    """
+    if soort is None:
+        yield
+        return
+    if soort not in PROFIELEN:
+        raise ValueError(f"Onbekend profiel: {soort} (kies uit {', '.join(PROFIELEN)})")
+
+    if soort == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            tekst = io.StringIO()
+            pstats.Stats(profiler, stream=tekst).sort_stats("cumulative").print_stats(top)
+            METRICS.profiler       = profiler
+            METRICS.extra["profiel"] = {"soort": soort, "top": tekst.getvalue().splitlines()}
+        return
+
+    with _sampler(top):
+        yield
+
+
+@contextmanager
+def _sampler(top: int, interval: float = 0.005) -> Iterator[None]:
+    """Telt elke `interval` s CPU-tijd welke functies op de stack staan (zelf + cumulatief)."""
+    import signal
+
+    zelf   = collections.Counter()
+    cumul  = collections.Counter()
+    totaal = [0]
+
+    def functie(frame) -> str:
+        code = frame.f_code
+        return f"{Path(code.co_filename).name}:{code.co_firstlineno}({code.co_name})"
+
+    def handler(signum, frame):
+        totaal[0] += 1
+        zelf[functie(frame)] += 1
+        gezien = set()
+        while frame is not None:
+            naam = functie(frame)
+            if naam not in gezien:
+                cumul[naam] += 1
+                gezien.add(naam)
+            frame = frame.f_back
+
+    vorige = signal.signal(signal.SIGPROF, handler)
+    signal.setitimer(signal.ITIMER_PROF, interval, interval)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, vorige)
+        n = totaal[0] or 1
+        METRICS.extra["profiel"] = {
+            "soort":       "sample",
+            "samples":     totaal[0],
+            "interval_s":  interval,
+            "zelf":        [{"functie": f, "aandeel": round(c / n, 4)} for f, c in zelf.most_common(top)],
+            "cumulatief":  [{"functie": f, "aandeel": round(c / n, 4)} for f, c in cumul.most_common(top)],
+        }
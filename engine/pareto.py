@@ -0,0 +1,124 @@
+# engine/pareto.py
+#
+# Exacte Pareto-front (prijs vs CO2, beide minimaliseren).
+#
+#   - pareto_front_ruimte : verdeel-en-heers over de assen van een ScenarioRuimte.
+#                           Fronts per onderdeel worden as voor as samengevoegd en
+#                           gedomineerde deelsommen weggesnoeid; het product wordt
+#                           nooit geënumereerd.
+#   - pareto_front_punten : O(n log n) sorteer-en-veeg over bestaande kolommen.
+#   - ParetoFront         : streaming variant voor een results-bestand; geheugen
+#                           O(grootte van de front).
+#
+from __future__ import annotations
+import bisect
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from engine.calculator import rond_af
+
+
+def _niet_gedomineerd(cost: np.ndarray, co2: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Indices van de niet-gedomineerde punten, gesorteerd op prijs oplopend."""
+    if len(cost) == 0:
+        return np.empty(0, dtype=np.int64)
+    volgorde = np.lexsort((ids, co2, cost))
+    co2_s    = co2[volgorde]
+    # Een punt blijft als zijn CO2 strikt lager is dan alles wat goedkoper (of even duur) is
+    vorige_min = np.concatenate(([np.inf], np.minimum.accumulate(co2_s)[:-1]))
+    return volgorde[co2_s < vorige_min]
+
+
+def pareto_front_punten(cost: Sequence[float], co2: Sequence[float], scenario_ids: Sequence[int]) -> List[Dict[str, Any]]:
+    """Exacte front over bestaande resultaten (sorteer-en-veeg, O(n log n))."""
+    cost = np.asarray(cost, dtype=np.float64)
+    co2  = np.asarray(co2,  dtype=np.float64)
+    ids  = np.asarray(scenario_ids, dtype=np.int64)
+    keep = _niet_gedomineerd(cost, co2, ids)
+    return [
+        {"scenario_id": sid, "cost_total": c, "co2_total": e}
+        for sid, c, e in zip(ids[keep].tolist(), cost[keep].tolist(), co2[keep].tolist())
+    ]
+
+
+def pareto_front_ruimte(ruimte, kolommen: Dict[str, Sequence[Sequence[float]]]) -> List[Dict[str, Any]]:
+    """
+    Exacte front over een ScenarioRuimte (kolommen uit ScenarioRuimte.bijdragen).
+    Een gedomineerde deelsom blijft gedomineerd na elke uitbreiding, dus per as
+    hoeven alleen de niet-gedomineerde deelsommen verder. Deelsommen worden in
+    asvolgorde opgebouwd, zodat de totalen gelijk zijn aan die van de calculator.
+    """
+    if not ruimte.assen:
+        return []
+
+    cost    = np.zeros(1, dtype=np.float64)
+    co2     = np.zeros(1, dtype=np.float64)
+    partieel = np.zeros(1, dtype=object)  # mixed-radix prefix; object = onbegrensde ints
+
+    for a, radix in enumerate(ruimte.radices):
+        as_cost = np.asarray(kolommen["cost_total"][a], dtype=np.float64)
+        as_co2  = np.asarray(kolommen["co2_total"][a],  dtype=np.float64)
+
+        cost     = (cost[:, None] + as_cost[None, :]).ravel()
+        co2      = (co2[:, None]  + as_co2[None, :]).ravel()
+        partieel = (partieel[:, None] * radix + np.arange(radix)[None, :]).ravel()
+
+        keep     = _niet_gedomineerd(cost, co2, partieel.astype(np.float64))
+        cost, co2, partieel = cost[keep], co2[keep], partieel[keep]
+
+    # Na afronden kunnen punten samenvallen; nog één keer snoeien op de afgeronde waarden
+    cost, co2 = rond_af(cost), rond_af(co2)
+    ids  = np.array([int(p) + 1 for p in partieel], dtype=np.int64)
+    keep = _niet_gedomineerd(cost, co2, ids)
+    return [
+        {"scenario_id": sid, "cost_total": c, "co2_total": e}
+        for sid, c, e in zip(ids[keep].tolist(), cost[keep].tolist(), co2[keep].tolist())
+    ]
+
+
+class ParetoFront:
+    """
+    Streaming front: punten één voor één toevoegen, geheugen O(front).
+    De front is gesorteerd op prijs oplopend met strikt dalende CO2.
+    """
+
+    def __init__(self):
+        self._cost: List[float] = []
+        self._co2:  List[float] = []
+        self._ids:  List[int]   = []
+        self.verwerkt = 0
+
+    def voeg_toe(self, cost: float, co2: float, scenario_id: int) -> bool:
+        """Voegt een punt toe; geeft False als het gedomineerd wordt."""
+        self.verwerkt += 1
+        i = bisect.bisect_right(self._cost, cost)
+
+        # Goedkoopste-of-gelijke voorganger heeft de laagste CO2 van alle goedkopere punten
+        if i > 0 and self._co2[i - 1] <= co2:
+            return False
+
+        # Voorganger met dezelfde prijs maar hogere CO2 valt af
+        start = i - 1 if i > 0 and self._cost[i - 1] == cost else i
+        eind  = i
+        while eind < len(self._co2) and self._co2[eind] >= co2:
+            eind += 1
+
+        self._cost[start:eind] = [cost]
+        self._co2[start:eind]  = [co2]
+        self._ids[start:eind]  = [scenario_id]
+        return True
+
+    def verwerk(self, records: Iterable[Dict[str, Any]]) -> "ParetoFront":
+        for r in records:
+            self.voeg_toe(r["cost_total"], r["co2_total"], r["scenario_id"])
+        return self
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def punten(self) -> List[Dict[str, Any]]:
+        return [
+            {"scenario_id": sid, "cost_total": c, "co2_total": e}
+            for sid, c, e in zip(self._ids, self._cost, self._co2)
+        ]
@@ -0,0 +1,226 @@
+# engine/pipeline.py
+#
+# Content-addressed cache voor de gen_*-stappen. Elke stap krijgt een sleutel
+# uit de hashes van zijn inputs (bestanden, gebouwrecord, code) en parameters.
+# Het manifest (data/output/pipeline_manifest.json) houdt per sleutel de
+# artefacten bij en per outputpad welke sleutel er nu staat:
+#
+#   - sleutel staat al live       -> stap overslaan (als grootte + mtime van de
+#                                    outputs nog kloppen met het manifest)
+#   - sleutel staat in de cache   -> artefacten terugzetten, niet herberekenen
+#   - anders                      -> stap uitvoeren en artefacten in de cache bewaren
+#
+# Artefacten worden gekopieerd (geen hardlinks), zodat in-place bijwerken
+# (gen_results --incrementeel) de cache niet raakt. Daardoor staat elk live
+# artefact twee keer op schijf; ruim_op verwijdert oude cache-items op leeftijd
+# en totale grootte (minst recent gebruikt eerst) en draait na elke run met
+# standaard CACHE_MAX_MB als bovengrens.
+#
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.writer import vervang_map
+
+MANIFEST_NAAM = "pipeline_manifest.json"
+CACHE_MAP     = "cache"
+CACHE_MAX_MB  = 2048
+
+
+def bestand_hash(path: Path) -> str:
+    """sha256 van een bestand, of van alle bestanden in een map (naam + inhoud)."""
+    h = hashlib.sha256()
+    if path.is_dir():
+        for deel in sorted(p for p in path.rglob("*") if p.is_file()):
+            h.update(str(deel.relative_to(path)).encode("utf-8"))
+            h.update(bestand_hash(deel).encode("ascii"))
+        return h.hexdigest()
+    with path.open("rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def pad_grootte(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+def pad_kenmerk(path: Path) -> Dict[str, int]:
+    """Grootte + laatste mtime van een bestand of map; vangt handmatig gewijzigde outputs af."""
+    delen = [path, *(p for p in path.rglob("*") if p.is_file())] if path.is_dir() else [path]
+    return {"grootte": pad_grootte(path), "mtime_ns": max(p.stat().st_mtime_ns for p in delen)}
+
+
+def _verwijder(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def _kopieer(bron: Path, doel: Path):
+    """Kopieert via een tijdelijk pad en hernoemt, zodat het doel nooit half bestaat."""
+    tmp = doel.with_name(doel.name + ".tmp")
+    _verwijder(tmp)
+    doel.parent.mkdir(parents=True, exist_ok=True)
+    if bron.is_dir():
+        shutil.copytree(bron, tmp)
+        if doel.exists() and not doel.is_dir():
+            doel.unlink()
+        vervang_map(tmp, doel)
+    else:
+        shutil.copy2(bron, tmp)
+        if doel.is_dir():
+            shutil.rmtree(doel)
+        os.replace(tmp, doel)
+
+
+class Stap:
+    """
+    Eén pipelinestap: naam, input-hashes, parameters, outputpaden en een
+    functie die de outputs (opnieuw) maakt.
+    """
+
+    def __init__(
+        self,
+        naam: str,
+        inputs: Dict[str, str],
+        params: Dict[str, Any],
+        outputs: List[Path],
+        uitvoeren: Callable[[], None],
+    ):
+        self.naam      = naam
+        self.inputs    = inputs
+        self.params    = params
+        self.outputs   = [Path(p) for p in outputs]
+        self.uitvoeren = uitvoeren
+
+    @property
+    def sleutel(self) -> str:
+        tekst = json.dumps({"stap": self.naam, "inputs": self.inputs, "params": self.params}, sort_keys=True)
+        return hashlib.sha256(tekst.encode("utf-8")).hexdigest()[:24]
+
+
+class PipelineCache:
+    """Manifest + artefactcache onder een outputmap."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.cache_dir  = self.output_dir / CACHE_MAP
+        self.pad        = self.output_dir / MANIFEST_NAAM
+        if self.pad.exists():
+            self.manifest = json.loads(self.pad.read_text(encoding="utf-8"))
+        else:
+            self.manifest = {"items": {}, "live": {}}
+        self.manifest.setdefault("kenmerken", {})
+
+    def bewaar_manifest(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.pad.with_name(self.pad.name + ".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.pad)
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return str(path.resolve().relative_to(self.output_dir.resolve()))
+        except ValueError:
+            return str(path.resolve())
+
+    # ── Status ───────────────────────────────────────────────────────────────
+
+    def is_actueel(self, stap: Stap) -> bool:
+        """Live sleutel klopt én de outputs zijn sindsdien niet gewijzigd (grootte + mtime)."""
+        sleutel = stap.sleutel
+        return all(
+            p.exists()
+            and self.manifest["live"].get(self._rel(p)) == sleutel
+            and self.manifest["kenmerken"].get(self._rel(p)) == pad_kenmerk(p)
+            for p in stap.outputs
+        )
+
+    def in_cache(self, stap: Stap) -> bool:
+        item = self.manifest["items"].get(stap.sleutel)
+        map_ = self.cache_dir / stap.sleutel
+        return bool(item) and all((map_ / p.name).exists() for p in stap.outputs)
+
+    def status(self, stap: Stap) -> str:
+        if self.is_actueel(stap):
+            return "actueel"
+        return "cache" if self.in_cache(stap) else "uitvoeren"
+
+    # ── Uitvoeren ────────────────────────────────────────────────────────────
+
+    def voer_uit(self, stap: Stap, forceer: bool = False) -> Dict[str, Any]:
+        """Voert de stap uit als dat nodig is. Geeft {"stap", "status", "duur_s"}."""
+        t0      = time.perf_counter()
+        sleutel = stap.sleutel
+        status  = "uitvoeren" if forceer else self.status(stap)
+
+        if status == "cache":
+            for p in stap.outputs:
+                _kopieer(self.cache_dir / sleutel / p.name, p)
+        elif status == "uitvoeren":
+            stap.uitvoeren()
+            ontbrekend = [str(p) for p in stap.outputs if not p.exists()]
+            if ontbrekend:
+                raise RuntimeError(f"Stap {stap.naam} schreef niet alle outputs: {', '.join(ontbrekend)}")
+            for p in stap.outputs:
+                _kopieer(p, self.cache_dir / sleutel / p.name)
+            self.manifest["items"][sleutel] = {
+                "stap":       stap.naam,
+                "inputs":     stap.inputs,
+                "params":     stap.params,
+                "outputs":    [self._rel(p) for p in stap.outputs],
+                "grootte":    sum(pad_grootte(self.cache_dir / sleutel / p.name) for p in stap.outputs),
+                "aangemaakt": time.time(),
+                "duur_s":     round(time.perf_counter() - t0, 3),
+            }
+
+        if sleutel in self.manifest["items"]:
+            self.manifest["items"][sleutel]["gebruikt"] = time.time()
+        for p in stap.outputs:
+            self.manifest["live"][self._rel(p)]      = sleutel
+            self.manifest["kenmerken"][self._rel(p)] = pad_kenmerk(p)
+        self.bewaar_manifest()
+        return {"stap": stap.naam, "status": status, "duur_s": round(time.perf_counter() - t0, 3)}
+
+    # ── Opruimen ─────────────────────────────────────────────────────────────
+
+    def ruim_op(self, max_bytes: Optional[int] = None, max_dagen: Optional[float] = None) -> List[str]:
+        """
+        Verwijdert cache-items ouder dan max_dagen (laatst gebruikt) en daarna
+        de minst recent gebruikte tot de cache onder max_bytes blijft.
+        Live outputs blijven staan; alleen de kopie in de cache verdwijnt.
+        """
+        items = self.manifest["items"]
+        nu    = time.time()
+        weg   = []
+
+        volgorde = sorted(items, key=lambda k: items[k].get("gebruikt", items[k]["aangemaakt"]))
+        if max_dagen is not None:
+            weg += [k for k in volgorde if nu - items[k].get("gebruikt", items[k]["aangemaakt"]) > max_dagen * 86400]
+        if max_bytes is not None:
+            totaal = sum(items[k]["grootte"] for k in volgorde if k not in weg)
+            for k in volgorde:
+                if totaal <= max_bytes:
+                    break
+                if k not in weg:
+                    weg.append(k)
+                    totaal -= items[k]["grootte"]
+
+        for k in weg:
+            _verwijder(self.cache_dir / k)
+            del items[k]
+        if weg:
+            self.bewaar_manifest()
+        return weg
+
+    def grootte(self) -> int:
+        return sum(item["grootte"] for item in self.manifest["items"].values())
@@ -0,0 +1,185 @@
+# engine/portfolio.py
+#
+# Portfolio: veel gebouwen in één run. Gebouwen met dezelfde actieve
+# onderdelen (resolve_actief) hebben dezelfde scenarioruimte; per groep wordt
+# de materiaal-matrix één keer per blok opgebouwd en voor alle gebouwen
+# tegelijk doorgerekend met een (n_gebouwen, n_onderdelen) factor-matrix.
+# Constraints (engine/constraints.py) hangen alleen van de assen af en worden
+# dus per groep één keer gecompileerd; ongeldige deelbomen worden overgeslagen.
+#
+from __future__ import annotations
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from engine.calculator import bepaal_factor_matrix, bereken_batch_gebouwen
+from engine.constraints import RegelSet
+from engine.ranking    import STANDAARD_RANKINGS, extremen_ruimte, rank_kolommen, voeg_tops_samen
+from engine.scenarios  import ScenarioRuimte
+
+# Maximaal aantal elementen per (n_gebouwen, blok) array; blokgrootte schaalt mee
+BLOK_ELEMENTEN = 4_000_000
+
+
+class GebouwGroep:
+    """Gebouwen die één scenarioruimte delen, met hun factor-matrix."""
+
+    def __init__(self, ruimte: ScenarioRuimte, gebouwen: List[Dict[str, Any]],
+                 regels: Optional[RegelSet] = None):
+        self.ruimte     = ruimte
+        self.regels     = regels
+        self.gebouwen   = gebouwen
+        self.gebouw_ids = [g.get("gebouw_id", "onbekend") for g in gebouwen]
+        self.factoren   = bepaal_factor_matrix(ruimte.onderdeel_ids, gebouwen)
+        self.ontbrekend: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.gebouwen)
+
+    @property
+    def signatuur(self) -> List[str]:
+        return self.ruimte.onderdeel_ids
+
+    def blok_grootte(self) -> int:
+        return max(1, BLOK_ELEMENTEN // max(1, len(self.gebouwen)))
+
+    @property
+    def aantal(self) -> int:
+        """Aantal (geldige) scenario's per gebouw."""
+        return self.regels.aantal_geldig() if self.regels is not None else self.ruimte.totaal
+
+    def blokken(self) -> Generator[Tuple[int, int], None, None]:
+        """(start, stop) bereiken van hooguit blok_grootte, alleen geldige scenario's."""
+        if self.regels is None:
+            yield from self.ruimte.blokken(self.blok_grootte())
+            return
+        for begin, einde in self.regels.geldige_bereiken():
+            for start in range(begin, einde, self.blok_grootte()):
+                yield start, min(start + self.blok_grootte(), einde)
+
+    def bereken(
+        self,
+        materiaal_index: Dict[str, int],
+        prijzen: np.ndarray,
+        co2s: np.ndarray,
+    ) -> Generator[Tuple[np.ndarray, np.ndarray, np.ndarray], None, None]:
+        """Per blok (scenario_ids, prijs, co2); prijs/co2 zijn (n_gebouwen, blok) arrays."""
+        for start, stop in self.blokken():
+            matrix     = self.ruimte.materiaal_matrix(start, stop, materiaal_index)
+            prijs, co2 = bereken_batch_gebouwen(matrix, self.factoren, prijzen, co2s)
+            yield np.arange(start, stop, dtype=np.int64), prijs, co2
+
+
+def groepeer_gebouwen(
+    gebouwen: Iterable[Dict[str, Any]],
+    materials: Iterable[Dict[str, Any]],
+    oid_map: Dict[str, str],
+    add_none: bool = False,
+    constraints: Optional[List[Dict[str, Any]]] = None,
+) -> List[GebouwGroep]:
+    """
+    Groepeert gebouwen op hun assen (onderdelen + materiaalopties), in volgorde
+    van eerste voorkomen. Met constraints krijgt elke groep een RegelSet.
+    """
+    materials  = list(materials)
+    ruimtes:    Dict[Tuple, ScenarioRuimte] = {}
+    leden:      Dict[Tuple, List[Dict]]     = {}
+    ontbrekend: Dict[Tuple, Dict[str, List[str]]] = {}
+
+    for gebouw in gebouwen:
+        ruimte  = ScenarioRuimte.van_gebouw(gebouw, materials, oid_map, add_none=add_none)
+        sleutel = tuple((oid, tuple(ids)) for oid, ids in ruimte.assen)
+        if sleutel not in ruimtes:
+            ruimtes[sleutel]    = ScenarioRuimte(ruimte.assen)
+            leden[sleutel]      = []
+            ontbrekend[sleutel] = {}
+        leden[sleutel].append(gebouw)
+        if ruimte.ontbrekend:
+            ontbrekend[sleutel][ruimte.gebouw_id] = [o["onderdeel_id"] for o in ruimte.ontbrekend]
+
+    groepen = []
+    for sleutel, ruimte in ruimtes.items():
+        regels = RegelSet(constraints, ruimte) if constraints is not None else None
+        groep  = GebouwGroep(ruimte, leden[sleutel], regels)
+        groep.ontbrekend = ontbrekend[sleutel]
+        groepen.append(groep)
+    return groepen
+
+
+def rank_groep(
+    groep: GebouwGroep,
+    material_lookup: Dict[str, Dict[str, Any]],
+    materiaal_index: Dict[str, int],
+    prijzen: np.ndarray,
+    co2s: np.ndarray,
+    top_n: int = 10,
+    rankings: Dict[str, Tuple[str, bool]] = STANDAARD_RANKINGS,
+    bij_blok=None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Rankings per gebouw in één pass over de gedeelde ruimte. De grenzen voor
+    optimaal_score komen exact uit de per-as bijdragen (extremen_ruimte), dus
+    een tweede pass is niet nodig; met constraints over alleen de geldige
+    scenario's. bij_blok(ids, prijs, co2) wordt per blok aangeroepen,
+    bijvoorbeeld om results weg te schrijven.
+
+    Geeft {gebouw_id: {"tops", "grenzen", "aantal"}}.
+    """
+    grenzen = [
+        extremen_ruimte(groep.ruimte.bijdragen(material_lookup, gebouw), groep.ruimte, groep.regels) if groep.aantal else
+        {"cost_total": (0.0, 0.0), "co2_total": (0.0, 0.0)}
+        for gebouw in groep.gebouwen
+    ]
+    tops: List[Dict[str, List[dict]]] = [{} for _ in groep.gebouwen]
+
+    for ids, prijs, co2 in groep.bereken(materiaal_index, prijzen, co2s):
+        if bij_blok:
+            bij_blok(ids, prijs, co2)
+        for g, gebouw_id in enumerate(groep.gebouw_ids):
+            blok = {"scenario_id": ids, "cost_total": prijs[g], "co2_total": co2[g]}
+            blok_tops, _, _ = rank_kolommen(blok, gebouw_id, top_n, rankings, grenzen[g])
+            tops[g] = voeg_tops_samen([tops[g], blok_tops], top_n, rankings)
+
+    aantal = groep.aantal
+    return {
+        gebouw_id: {"tops": tops[g], "grenzen": grenzen[g], "aantal": aantal}
+        for g, gebouw_id in enumerate(groep.gebouw_ids)
+    }
+
+
+def portfolio_samenvatting(
+    groepen: List[GebouwGroep],
+    per_gebouw: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Samenvatting over alle gebouwen: groepen, bandbreedtes en portfolio-totalen."""
+    gebouwen = {}
+    for gebouw_id, r in per_gebouw.items():
+        tops = r["tops"]
+        gebouwen[gebouw_id] = {
+            "totaal_scenarios": r["aantal"],
+            "prijs_min":        r["grenzen"]["cost_total"][0],
+            "prijs_max":        r["grenzen"]["cost_total"][1],
+            "co2_min":          r["grenzen"]["co2_total"][0],
+            "co2_max":          r["grenzen"]["co2_total"][1],
+            "goedkoopste":      (tops.get("goedkoopste") or [None])[0],
+            "minste_co2":       (tops.get("minste_co2") or [None])[0],
+            "optimaal":         (tops.get("optimaal") or [None])[0],
+        }
+
+    return {
+        "aantal_gebouwen":  len(per_gebouw),
+        "aantal_groepen":   len(groepen),
+        "totaal_scenarios": sum(r["aantal"] for r in per_gebouw.values()),
+        "portfolio": {
+            "prijs_min": round(sum(g["prijs_min"] for g in gebouwen.values()), 2),
+            "prijs_max": round(sum(g["prijs_max"] for g in gebouwen.values()), 2),
+            "co2_min":   round(sum(g["co2_min"]   for g in gebouwen.values()), 2),
+            "co2_max":   round(sum(g["co2_max"]   for g in gebouwen.values()), 2),
+        },
+        "groepen": [
+            {"onderdelen": groep.signatuur, "scenarios": groep.aantal, "gebouwen": groep.gebouw_ids}
+            for groep in groepen
+        ],
+        "ontbrekend": {gid: oids for groep in groepen for gid, oids in groep.ontbrekend.items()},
+        "gebouwen":   gebouwen,
+    }
@@ -1,5 +1,540 @@
+# engine/ranking.py
+import bisect
+import heapq
+import itertools
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from engine.calculator import rond_af
+
+Key = Union[str, Callable[[dict], float]]
+
+# Rankings van gen_ranks.py / gen_ranks_v2.py: naam -> (key, reverse)
+STANDAARD_RANKINGS: Dict[str, Tuple[str, bool]] = {
+    "duurste":     ("cost_total",     True),
+    "goedkoopste": ("cost_total",     False),
+    "meeste_co2":  ("co2_total",      True),
+    "minste_co2":  ("co2_total",      False),
+    "optimaal":    ("optimaal_score", False),
+}
+
+
 def update_top_list(lst, record, key, reverse=False, top_n=10):
-    lst.append(record)
-    lst.sort(key=lambda x: x[key], reverse=reverse)
+    """Houdt lst gesorteerd (stabiel, zoals sort) met hooguit top_n records."""
+    if len(lst) >= top_n:
+        laatste = lst[-1][key]
+        if not (record[key] > laatste if reverse else record[key] < laatste):
+            return
+    teken = -1 if reverse else 1
+    # Geen insort(key=): dat vereist Python 3.10
+    sleutels = [teken * x[key] for x in lst]
+    lst.insert(bisect.bisect_right(sleutels, teken * record[key]), record)
     if len(lst) > top_n:
-        lst.pop()
\ No newline at end of file
+        lst.pop()
+
+
+# ── Streaming top-N (begrensde heaps) ────────────────────────────────────────
+
+class TopRanking:
+    """
+    Begrensde heap voor één ranking: geheugen O(top_n), O(log top_n) per record.
+    Gelijke waarden houden invoervolgorde aan, net als sorted().
+    """
+
+    def __init__(self, key: Key, reverse: bool = False, top_n: int = 10):
+        self.key     = key if callable(key) else (lambda r, k=key: r[k])
+        self.reverse = reverse
+        self.top_n   = top_n
+        # heap[0] is steeds het slechtste bewaarde record
+        self._heap: List[Tuple[float, int, dict]] = []
+
+    def voeg_toe(self, record: dict, volgnr: int):
+        waarde = self.key(record)
+        # Groter = beter; het volgnummer breekt gelijke waarden op invoervolgorde
+        entry = (waarde if self.reverse else -waarde, -volgnr, record)
+        if len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def resultaat(self) -> List[dict]:
+        return [e[2] for e in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+
+class MultiRanking:
+    """
+    Meerdere top-N rankings tegelijk in één pass over een (generator van)
+    records, bijvoorbeeld:
+
+        MultiRanking({
+            "goedkoopste": ("cost_total", False),
+            "duurste":     ("cost_total", True),
+            "eigen":       (lambda r: r["cost_total"] + 10 * r["co2_total"], False),
+        }, top_n=100).verwerk(read_jsonl(path)).resultaat()
+
+    Geheugen blijft O(top_n) per ranking, ongeacht het aantal scenario's.
+    """
+
+    def __init__(self, rankings: Dict[str, Tuple[Key, bool]], top_n: int = 10):
+        self.rankings = {
+            naam: TopRanking(key, reverse, top_n)
+            for naam, (key, reverse) in rankings.items()
+        }
+        self.aantal = 0
+
+    def voeg_toe(self, record: dict):
+        for ranking in self.rankings.values():
+            ranking.voeg_toe(record, self.aantal)
+        self.aantal += 1
+
+    def verwerk(self, records: Iterable[dict]) -> "MultiRanking":
+        for record in records:
+            self.voeg_toe(record)
+        return self
+
+    def resultaat(self) -> Dict[str, List[dict]]:
+        return {naam: ranking.resultaat() for naam, ranking in self.rankings.items()}
+
+
+# ── Optimaal score (50/50 prijs + CO2 genormaliseerd) ────────────────────────
+
+def ranks_document(gebouw_id: Any, aantal: int, tops: Dict[str, List[dict]], top_n: int = 10) -> dict:
+    """Output-vorm van gen_ranks.py: top<n>_<ranking>, zonder optimaal_score."""
+    document = {"gebouw_id": gebouw_id, "totaal_scenarios": aantal}
+    for naam, ranked in tops.items():
+        document[f"top{top_n}_{naam}"] = [{k: v for k, v in r.items() if k != "optimaal_score"} for r in ranked]
+    return document
+
+
+def bepaal_grenzen(records: Iterable[dict], kolommen: Sequence[str] = ("cost_total", "co2_total")) -> Tuple[Dict[str, Tuple[float, float]], int]:
+    """Eerste pass: (min, max) per kolom plus het aantal records, geheugen O(1)."""
+    grenzen: Dict[str, List[float]] = {}
+    aantal = 0
+    for r in records:
+        for k in kolommen:
+            w = r[k]
+            if k not in grenzen:
+                grenzen[k] = [w, w]
+            elif w < grenzen[k][0]:
+                grenzen[k][0] = w
+            elif w > grenzen[k][1]:
+                grenzen[k][1] = w
+        aantal += 1
+    return {k: (lo, hi) for k, (lo, hi) in grenzen.items()}, aantal
+
+
+def optimaal_score(record: dict, grenzen: Dict[str, Tuple[float, float]]) -> float:
+    p_min, p_max = grenzen["cost_total"]
+    c_min, c_max = grenzen["co2_total"]
+    p_norm = (record["cost_total"] - p_min) / (p_max - p_min) if p_max != p_min else 0
+    c_norm = (record["co2_total"]  - c_min) / (c_max - c_min) if c_max != c_min else 0
+    return round((p_norm + c_norm) / 2, 6)
+
+
+def rank_stroom(
+    open_records: Callable[[], Iterable[dict]],
+    top_n: int = 10,
+    rankings: Dict[str, Tuple[Key, bool]] = STANDAARD_RANKINGS,
+    grenzen: Dict[str, Tuple[float, float]] = None,
+) -> Tuple[Dict[str, List[dict]], Dict[str, Tuple[float, float]], int]:
+    """
+    Rankings inclusief optimaal_score zonder alle resultaten in geheugen.
+    Pass 1 bepaalt min/max (overgeslagen als grenzen al bekend zijn, bijv.
+    analytisch via extremen_ruimte), pass 2 scoort en rankt met begrensde heaps.
+    open_records wordt per pass opnieuw aangeroepen (bijv. lambda: read_jsonl(path)).
+    Alleen de bewaarde records krijgen een optimaal_score veld.
+    """
+    aantal = None
+    if grenzen is None:
+        grenzen, aantal = bepaal_grenzen(open_records())
+
+    rankings = {
+        naam: ((lambda r: optimaal_score(r, grenzen)) if key == "optimaal_score" else key, reverse)
+        for naam, (key, reverse) in rankings.items()
+    }
+    multi = MultiRanking(rankings, top_n).verwerk(open_records())
+
+    tops = multi.resultaat()
+    for ranked in tops.values():
+        for r in ranked:
+            r["optimaal_score"] = optimaal_score(r, grenzen)
+    return tops, grenzen, multi.aantal if aantal is None else aantal
+
+
+# ── Kolommen (numpy) ─────────────────────────────────────────────────────────
+
+def top_n_indices(waarden: np.ndarray, top_n: int, reverse: bool = False) -> np.ndarray:
+    """
+    Indices van de top_n waarden, gelijke waarden op index (zoals sorted()).
+    argpartition + sorteren van alleen de kandidaten: O(n + k log k).
+    """
+    w = -np.asarray(waarden) if reverse else np.asarray(waarden)
+    if top_n <= 0 or len(w) == 0:
+        return np.empty(0, dtype=np.int64)
+    if top_n < len(w):
+        grens      = np.partition(w, top_n - 1)[top_n - 1]
+        kandidaten = np.flatnonzero(w <= grens)
+    else:
+        kandidaten = np.arange(len(w))
+    return kandidaten[np.lexsort((kandidaten, w[kandidaten]))][:top_n]
+
+
+def optimaal_scores(cost: np.ndarray, co2: np.ndarray, grenzen: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """Gevectoriseerde optimaal_score, zelfde uitkomst als optimaal_score per record."""
+    p_min, p_max = grenzen["cost_total"]
+    c_min, c_max = grenzen["co2_total"]
+    p_norm = (cost - p_min) / (p_max - p_min) if p_max != p_min else np.zeros(len(cost))
+    c_norm = (co2  - c_min) / (c_max - c_min) if c_max != c_min else np.zeros(len(co2))
+    return rond_af((p_norm + c_norm) / 2, 6)
+
+
+def rank_kolommen(
+    kolommen: Dict[str, np.ndarray],
+    gebouw_id: Any = None,
+    top_n: int = 10,
+    rankings: Dict[str, Tuple[str, bool]] = STANDAARD_RANKINGS,
+    grenzen: Dict[str, Tuple[float, float]] = None,
+) -> Tuple[Dict[str, List[dict]], Dict[str, Tuple[float, float]], int]:
+    """
+    Zelfde uitkomst als rank_stroom, maar op kolommen (engine.loader.read_kolommen).
+    Records worden alleen voor de top_n opgebouwd.
+    """
+    cost, co2 = kolommen["cost_total"], kolommen["co2_total"]
+    aantal    = len(cost)
+    if grenzen is None:
+        grenzen = {
+            "cost_total": (float(cost.min()), float(cost.max())),
+            "co2_total":  (float(co2.min()),  float(co2.max())),
+        } if aantal else {"cost_total": (0.0, 0.0), "co2_total": (0.0, 0.0)}
+
+    scores = None
+    tops   = {}
+    for naam, (key, reverse) in rankings.items():
+        if key == "optimaal_score":
+            scores = optimaal_scores(cost, co2, grenzen) if scores is None else scores
+            waarden = scores
+        else:
+            waarden = kolommen[key]
+        tops[naam] = [
+            {
+                "gebouw_id":      gebouw_id,
+                "scenario_id":    int(kolommen["scenario_id"][i]),
+                "cost_total":     float(cost[i]),
+                "co2_total":      float(co2[i]),
+                "optimaal_score": optimaal_score({"cost_total": float(cost[i]), "co2_total": float(co2[i])}, grenzen),
+            }
+            for i in top_n_indices(waarden, top_n, reverse).tolist()
+        ]
+    return tops, grenzen, aantal
+
+
+def voeg_tops_samen(
+    tops: Sequence[Dict[str, List[dict]]],
+    top_n: int = 10,
+    rankings: Dict[str, Tuple[str, bool]] = STANDAARD_RANKINGS,
+) -> Dict[str, List[dict]]:
+    """
+    Voegt tops van opeenvolgende blokken (bijv. uit rank_kolommen met vaste
+    grenzen) samen. Gelijke waarden blijven op scenario_id, zoals sorted().
+    """
+    samen = {}
+    for naam, (key, reverse) in rankings.items():
+        kandidaten = [r for t in tops for r in t.get(naam, [])]
+        kandidaten.sort(key=lambda r: (-r[key] if reverse else r[key], r["scenario_id"]))
+        samen[naam] = kandidaten[:top_n]
+    return samen
+
+
+# ── Separabele rankings (zonder het product te enumereren) ───────────────────
+
+def iter_beste_combinaties(bijdragen: Sequence[Sequence[float]], reverse: bool = False) -> Iterator[List[int]]:
+    """
+    Combinaties van het cartesisch product in volgorde van de som van
+    onafhankelijke bijdragen per as, beste eerst, zonder het product te
+    enumereren. Best-first zoeken over de per as gesorteerde opties; elke
+    combinatie wordt via één canonieke route bereikt (alleen assen >= de
+    laatst verhoogde as worden verhoogd), dus geen duplicaten.
+    De eerste N kosten O(N * n_assen * log(N * n_assen)), onafhankelijk van de
+    productgrootte. Geeft per combinatie de optie-index per as.
+    """
+    if not bijdragen or any(len(b) == 0 for b in bijdragen):
+        return
+
+    teken     = -1.0 if reverse else 1.0
+    volgordes = [sorted(range(len(b)), key=lambda i, b=b: teken * b[i]) for b in bijdragen]
+    waarden   = [[teken * b[i] for i in v] for b, v in zip(bijdragen, volgordes)]
+    n_assen   = len(waarden)
+
+    start  = (0,) * n_assen
+    heap   = [(sum(w[0] for w in waarden), 0, start, 0)]  # (som, volgnr, rangen, laatste_as)
+    volgnr = 1
+
+    while heap:
+        _, _, rangen, laatste = heapq.heappop(heap)
+        yield [volgordes[a][r] for a, r in enumerate(rangen)]
+
+        for a in range(laatste, n_assen):
+            if rangen[a] + 1 >= len(waarden[a]):
+                continue
+            nieuw = rangen[:a] + (rangen[a] + 1,) + rangen[a + 1:]
+            som   = sum(waarden[b][r] for b, r in enumerate(nieuw))
+            heapq.heappush(heap, (som, volgnr, nieuw, a))
+            volgnr += 1
+
+
+def k_beste_combinaties(bijdragen: Sequence[Sequence[float]], top_n: int, reverse: bool = False) -> List[List[int]]:
+    """Exacte top_n van het product (zie iter_beste_combinaties)."""
+    return list(itertools.islice(iter_beste_combinaties(bijdragen, reverse), max(top_n, 0)))
+
+
+def totalen_combinatie(kolommen: Dict[str, Sequence[Sequence[float]]], indices: Sequence[int]) -> Dict[str, float]:
+    """Afgeronde totalen per kolom; zelfde optelvolgorde als de calculator."""
+    totalen = {}
+    for naam, bijdragen in kolommen.items():
+        totaal = 0.0
+        for a, i in enumerate(indices):
+            totaal += float(bijdragen[a][i])
+        totalen[naam] = round(totaal, 2)
+    return totalen
+
+
+def extremen_ruimte(kolommen: Dict[str, Sequence[Sequence[float]]], ruimte=None, regels=None) -> Dict[str, Tuple[float, float]]:
+    """
+    Exacte (min, max) per kolom over de hele ruimte: som van de per-as extremen.
+    Met regels (RegelSet, samen met ruimte) over alleen de geldige scenario's:
+    de beste en slechtste geldige combinatie via rank_ruimte.
+    """
+    if regels is not None:
+        return {
+            naam: (rank_ruimte(ruimte, kolommen, naam, False, 1, regels)[0][naam],
+                   rank_ruimte(ruimte, kolommen, naam, True,  1, regels)[0][naam])
+            for naam in kolommen
+        }
+    extremen = {}
+    for naam, bijdragen in kolommen.items():
+        laag = [min(range(len(b)), key=lambda i, b=b: b[i]) for b in bijdragen]
+        hoog = [max(range(len(b)), key=lambda i, b=b: b[i]) for b in bijdragen]
+        extremen[naam] = (
+            totalen_combinatie({naam: bijdragen}, laag)[naam],
+            totalen_combinatie({naam: bijdragen}, hoog)[naam],
+        )
+    return extremen
+
+
+def rank_ruimte(
+    ruimte,
+    kolommen: Dict[str, Sequence[Sequence[float]]],
+    key: Union[str, Dict[str, float]],
+    reverse: bool = False,
+    top_n: int = 10,
+    regels=None,
+) -> List[dict]:
+    """
+    Top_n records direct uit een ScenarioRuimte.
+    key is een kolomnaam (bijv. "cost_total") of een dict {kolom: gewicht}
+    voor een lineaire doelfunctie over meerdere kolommen. Met regels (RegelSet,
+    engine/constraints.py) worden combinaties die een regel schenden
+    overgeslagen, zodat de top gelijk is aan die over de results van
+    gen_results (dat ongeldige scenario's nooit berekent).
+    """
+    gewichten = {key: 1.0} if isinstance(key, str) else key
+    doel = [
+        [sum(w * float(kolommen[k][a][i]) for k, w in gewichten.items()) for i in range(n)]
+        for a, n in enumerate(ruimte.radices)
+    ]
+
+    # Doorzoeken tot voorbij de gelijke waarden op de grens, zodat gelijke
+    # totalen net als bij sorted() op scenario_id geordend worden
+    kandidaten = []
+    grens = None
+    for indices in iter_beste_combinaties(doel, reverse):
+        if regels is not None and regels.eerste_schending(np.array([indices]))[0] >= 0:
+            continue
+        record = {"gebouw_id": ruimte.gebouw_id, "scenario_id": ruimte.scenario_id(indices)}
+        record.update(totalen_combinatie(kolommen, indices))
+        waarde = sum(w * record[k] for k, w in gewichten.items())
+
+        if len(kandidaten) >= top_n and waarde != grens:
+            break
+        kandidaten.append((waarde, record))
+        if len(kandidaten) == top_n:
+            grens = waarde
+
+    kandidaten.sort(key=lambda x: (-x[0] if reverse else x[0], x[1]["scenario_id"]))
+    return [record for _, record in kandidaten[:top_n]]
+
+
+# ── Branch-and-bound binnen grenzen (requirements) ───────────────────────────
+
+# Marge voor afronden (2 decimalen) en optelvolgorde bij het snoeien op grenzen
+SNOEI_MARGE = 0.01
+
+
+def zoek_binnen_grenzen(
+    ruimte,
+    kolommen: Dict[str, Sequence[Sequence[float]]],
+    grenzen: Dict[str, Tuple[Any, Any]],
+    key: str = "co2_total",
+    reverse: bool = False,
+    top_n: int = 10,
+    regels=None,
+    blok_grootte: int = 4_096,
+) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Top_n scenario's op key (gelijke waarden op scenario_id) met elke kolom
+    binnen grenzen {kolom: (min, max)} (None = open), zonder het product te
+    enumereren. Deelscenario's (prefix van assen) vallen af zodra
+        - de som tot nu toe + per-as min/max van de rest het venster niet meer raakt,
+        - de beste haalbare key slechter is dan de huidige top_n,
+        - een regel uit een RegelSet (engine/constraints.py) geschonden is.
+    Deelbomen worden best-first afgewerkt in numpy-blokken. Alleen complete
+    scenario's worden afgerond en exact getoetst.
+
+    Geeft (records, statistiek) met statistiek in aantallen scenario's.
+    """
+    k      = len(ruimte.radices)
+    namen  = list(kolommen)
+    tekens = -1.0 if reverse else 1.0
+
+    # Per as en kolom: min/max bijdrage; rest_min/rest_max[a] = som over assen a..k-1
+    rest_min = {n: np.zeros(k + 1) for n in namen}
+    rest_max = {n: np.zeros(k + 1) for n in namen}
+    for n in namen:
+        for a in range(k - 1, -1, -1):
+            b = np.asarray(kolommen[n][a], dtype=np.float64)
+            rest_min[n][a] = rest_min[n][a + 1] + b.min()
+            rest_max[n][a] = rest_max[n][a + 1] + b.max()
+
+    # Onder een prefix van d assen hangen onder[d] scenario's
+    onder = [1] * (k + 1)
+    for a in range(k - 1, -1, -1):
+        onder[a] = onder[a + 1] * ruimte.radices[a]
+
+    prefix_ruimtes = {r.diepte: None for r in (regels.actief if regels else [])}
+    for d in prefix_ruimtes:
+        prefix_ruimtes[d] = type(ruimte)(ruimte.assen[:d])
+
+    stat = {"totaal": ruimte.totaal, "doorgerekend": 0, "binnen_grenzen": 0,
+            "gesnoeid_grenzen": 0, "gesnoeid_doel": 0, "gesnoeid_regels": 0, "knopen": 0}
+
+    def doel_grens(d, sommen):
+        """Beste haalbare key onder elk prefix, als te minimaliseren waarde."""
+        return tekens * (sommen[key] + (rest_max if reverse else rest_min)[key][d])
+
+    beste_w   = np.empty(0)                   # te minimaliseren key (afgerond)
+    beste_id  = np.empty(0, dtype=np.int64)
+    beste_tot = {n: np.empty(0) for n in namen}
+
+    teller = itertools.count()
+    heap   = [(-np.inf, next(teller), 0, np.zeros(1, dtype=np.int64), {n: np.zeros(1) for n in namen})] if k else []
+
+    while heap:
+        _, _, d, prefix, sommen = heapq.heappop(heap)
+
+        # Snoeien op de top_n die er inmiddels ligt
+        if len(beste_w) >= top_n:
+            houd = doel_grens(d, sommen) <= beste_w[-1] + SNOEI_MARGE
+            stat["gesnoeid_doel"] += int((~houd).sum()) * onder[d]
+            prefix, sommen = prefix[houd], {n: s[houd] for n, s in sommen.items()}
+            if not len(prefix):
+                continue
+
+        # Eén as verder
+        radix  = ruimte.radices[d]
+        prefix = (prefix[:, None] * radix + np.arange(radix)[None, :]).ravel()
+        sommen = {
+            n: (s[:, None] + np.asarray(kolommen[n][d], dtype=np.float64)[None, :]).ravel()
+            for n, s in sommen.items()
+        }
+        d += 1
+        stat["knopen"] += len(prefix)
+
+        houd = np.ones(len(prefix), dtype=bool)
+        if d in prefix_ruimtes:
+            opties = prefix_ruimtes[d].index_ids(prefix + 1)
+            for regel in regels.actief:
+                if regel.diepte == d:
+                    houd &= ~regel.schendt(opties)
+            stat["gesnoeid_regels"] += int((~houd).sum()) * onder[d]
+
+        venster = np.ones(len(prefix), dtype=bool)
+        for n, (laag, hoog) in grenzen.items():
+            if hoog is not None:
+                venster &= sommen[n] + rest_min[n][d] <= hoog + SNOEI_MARGE
+            if laag is not None:
+                venster &= sommen[n] + rest_max[n][d] >= laag - SNOEI_MARGE
+        stat["gesnoeid_grenzen"] += int((houd & ~venster).sum()) * onder[d]
+        houd &= venster
+
+        prefix, sommen = prefix[houd], {n: s[houd] for n, s in sommen.items()}
+        if not len(prefix):
+            continue
+
+        if d < k:
+            # Op grens sorteren voor het opdelen: het beste blok levert snel een
+            # scherpe top_n op, waarmee de rest gesnoeid kan worden
+            grens    = doel_grens(d, sommen)
+            volgorde = np.argsort(grens, kind="stable")
+            for i in range(0, len(prefix), blok_grootte):
+                sel  = volgorde[i:i + blok_grootte]
+                deel = {n: s[sel] for n, s in sommen.items()}
+                heapq.heappush(heap, (float(grens[sel[0]]), next(teller), d, prefix[sel], deel))
+            continue
+
+        # Complete scenario's: afronden en exact toetsen
+        totalen = {n: rond_af(s) for n, s in sommen.items()}
+        stat["doorgerekend"] += len(prefix)
+        binnen = np.ones(len(prefix), dtype=bool)
+        for n, (laag, hoog) in grenzen.items():
+            if hoog is not None:
+                binnen &= totalen[n] <= hoog
+            if laag is not None:
+                binnen &= totalen[n] >= laag
+        stat["binnen_grenzen"] += int(binnen.sum())
+
+        beste_w   = np.concatenate((beste_w, tekens * totalen[key][binnen]))
+        beste_id  = np.concatenate((beste_id, prefix[binnen] + 1))
+        beste_tot = {n: np.concatenate((beste_tot[n], totalen[n][binnen])) for n in namen}
+        volgorde  = np.lexsort((beste_id, beste_w))[:top_n]
+        beste_w, beste_id = beste_w[volgorde], beste_id[volgorde]
+        beste_tot = {n: t[volgorde] for n, t in beste_tot.items()}
+
+    records = []
+    for i, sid in enumerate(beste_id.tolist()):
+        record = {"gebouw_id": ruimte.gebouw_id, "scenario_id": sid}
+        record.update({n: float(beste_tot[n][i]) for n in namen})
+        records.append(record)
+    return records, stat
+
+
+def filter_binnen_grenzen(
+    kolommen: Dict[str, np.ndarray],
+    grenzen: Dict[str, Tuple[Any, Any]],
+    key: str = "co2_total",
+    reverse: bool = False,
+    top_n: int = 10,
+    gebouw_id: Any = None,
+) -> Tuple[List[dict], int]:
+    """
+    Zelfde uitkomst als zoek_binnen_grenzen, maar op al berekende kolommen
+    (scenario_id, cost_total, co2_total). Geeft (records, aantal binnen grenzen).
+    """
+    binnen = np.ones(len(kolommen["scenario_id"]), dtype=bool)
+    for n, (laag, hoog) in grenzen.items():
+        if hoog is not None:
+            binnen &= kolommen[n] <= hoog
+        if laag is not None:
+            binnen &= kolommen[n] >= laag
+    rijen    = np.flatnonzero(binnen)
+    waarden  = np.asarray(kolommen[key])[rijen]
+    ids      = np.asarray(kolommen["scenario_id"])[rijen]
+    volgorde = rijen[np.lexsort((ids, -waarden if reverse else waarden))[:top_n]]
+
+    namen = [n for n in ("cost_total", "co2_total") if n in kolommen]
+    records = []
+    for i in volgorde.tolist():
+        record = {"gebouw_id": gebouw_id, "scenario_id": int(kolommen["scenario_id"][i])}
+        record.update({n: float(kolommen[n][i]) for n in namen})
+        records.append(record)
+    return records, len(rijen)
@@ -0,0 +1,309 @@
+# engine/resultaatindex.py
+#
+# Query-index over results-kolommen voor "top N binnen max_prijs en max_co2"
+# (dashboard). In plaats van per query te maskeren en het hele frame te
+# sorteren:
+#
+#   volgorde[k]     voorgesorteerde permutatie per rankingkolom (stabiel)
+#   prijs-prefix    via de gesorteerde prijzen is het aantal rijen met
+#                   cost_total <= max_prijs één searchsorted
+#   co2-blokken     de rijen in prijsvolgorde in blokken, per blok de CO2
+#                   gesorteerd: het aantal rijen binnen beide grenzen is
+#                   dan O(n / blok * log blok + blok) (2D-bereiktelling)
+#
+# top() loopt de permutatie van de gevraagde kolom in oplopende brokken af
+# tot er N rijen binnen de grenzen zijn; bij een strenge filter wordt juist
+# het kleinste prefix (prijs of CO2) gefilterd en gesorteerd. Welke van de
+# twee goedkoper is, wordt per query geschat.
+#
+# Gelijke waarden volgen de rijvolgorde, ook bij aflopend (zoals sorted()).
+#
+# De index wordt één keer gebouwd en als kolommenmap naast de results gezet
+# (results_gebouw_001.kolommen.index/), gekoppeld aan grootte/mtime van de
+# bron. De naam volgt de volledige bronnaam: staan .kolommen en .jsonl van
+# hetzelfde gebouw naast elkaar, dan heeft elk zijn eigen index in plaats van
+# dat ze elkaars index steeds overschrijven.
+# Daarna is openen alleen memmaps aanmaken: samenvatting, top N en rijen per
+# pagina lezen alleen de pagina's die nodig zijn, onafhankelijk van het
+# aantal scenario's. Bij JSONL-results staan ook de basiskolommen in de map.
+#
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.loader import bron_kenmerk, read_kolommen, read_results_kolommen
+from engine.writer import KolomWriter
+
+PRIJS    = "cost_total"
+CO2      = "co2_total"
+OPTIMAAL = "optimaal_score"
+BASIS    = ("scenario_id", PRIJS, CO2)
+
+
+def optimaal_kolom(prijs: np.ndarray, co2: np.ndarray) -> np.ndarray:
+    """optimaal_score zoals het dashboard hem toont (min-max genormaliseerd, niet afgerond)."""
+    if not len(prijs):
+        return np.empty(0, dtype=np.float64)
+    p_min, c_min = prijs.min(), co2.min()
+    p_range = (prijs.max() - p_min) or 1
+    c_range = (co2.max() - c_min) or 1
+    return ((prijs - p_min) / p_range + (co2 - c_min) / c_range) / 2
+
+
+def index_pad(results_path: Path) -> Path:
+    """results_gebouw_001.kolommen / .jsonl(.gz) -> <zelfde naam>.index (zelfde map)."""
+    return results_path.with_name(results_path.name + ".index")
+
+
+def results_kenmerk(results_path: Path) -> Dict[str, Any]:
+    """bron_kenmerk van de results; bij een kolommenmap van meta + de basiskolommen."""
+    if not results_path.is_dir():
+        return bron_kenmerk(results_path)
+    return {naam: bron_kenmerk(results_path / naam) for naam in ["meta.json", *(f"{k}.bin" for k in BASIS)]}
+
+
+class ResultaatIndex:
+    """Voorgesorteerde permutaties + 2D-bereikindex over kolommen {scenario_id, cost_total, co2_total, ...}."""
+
+    def __init__(self, kolommen: Dict[str, np.ndarray], afgeleid: Dict[str, np.ndarray], blok: int):
+        self.kolommen = kolommen
+        self.n        = len(kolommen[PRIJS])
+        self.blok     = blok
+        self.volgorde = {k[len("volgorde_"):]: v for k, v in afgeleid.items() if k.startswith("volgorde_")}
+        self.gesorteerd = {k: afgeleid[f"gesorteerd_{k}"] for k in (PRIJS, CO2)}
+
+        # CO2 in prijsvolgorde, en dezelfde waarden per blok gesorteerd (laatste blok mag korter zijn)
+        self._co2_in_prijsvolgorde = afgeleid["co2_in_prijsvolgorde"]
+        self._co2_blokken          = afgeleid["co2_blokken"]
+        self._id_volgorde          = afgeleid.get("id_volgorde")
+        self._ids_gesorteerd       = afgeleid.get("ids_gesorteerd")
+
+    @classmethod
+    def bouw(cls, kolommen: Dict[str, np.ndarray],
+             sleutels: Sequence[str] = (PRIJS, CO2, OPTIMAAL), blok: int = 65_536) -> "ResultaatIndex":
+        """Bouwt de index in het geheugen (sorteren: O(n log n))."""
+        kolommen = {k: np.asarray(v) for k, v in kolommen.items()}
+        n        = len(kolommen[PRIJS])
+        dtype    = np.int32 if n < 2**31 else np.int64
+
+        afgeleid = {
+            f"volgorde_{k}": np.argsort(kolommen[k], kind="stable").astype(dtype, copy=False)
+            for k in dict.fromkeys([PRIJS, CO2, *sleutels])
+        }
+        for k in (PRIJS, CO2):
+            afgeleid[f"gesorteerd_{k}"] = kolommen[k][afgeleid[f"volgorde_{k}"]]
+
+        co2_in_prijsvolgorde = kolommen[CO2][afgeleid[f"volgorde_{PRIJS}"]]
+        co2_blokken          = co2_in_prijsvolgorde.copy()
+        for a in range(0, n, blok):
+            co2_blokken[a:a + blok].sort()
+        afgeleid["co2_in_prijsvolgorde"] = co2_in_prijsvolgorde
+        afgeleid["co2_blokken"]          = co2_blokken
+
+        ids = kolommen.get("scenario_id")
+        if ids is not None:
+            afgeleid["id_volgorde"]    = np.argsort(ids, kind="stable").astype(dtype, copy=False)
+            afgeleid["ids_gesorteerd"] = ids[afgeleid["id_volgorde"]]
+        return cls(kolommen, afgeleid, blok)
+
+    def afgeleid(self) -> Dict[str, np.ndarray]:
+        """De voorberekende arrays (alle n lang), zoals ze op schijf staan."""
+        arrays = {f"volgorde_{k}": v for k, v in self.volgorde.items()}
+        arrays.update({f"gesorteerd_{k}": v for k, v in self.gesorteerd.items()})
+        arrays["co2_in_prijsvolgorde"] = self._co2_in_prijsvolgorde
+        arrays["co2_blokken"]          = self._co2_blokken
+        if self._id_volgorde is not None:
+            arrays["id_volgorde"]    = self._id_volgorde
+            arrays["ids_gesorteerd"] = self._ids_gesorteerd
+        return arrays
+
+    # ── Op schijf ────────────────────────────────────────────────────────────
+
+    def schrijf(self, path: Path, bron: Optional[Dict[str, Any]] = None, kolommen: Sequence[str] = ()):
+        """
+        Schrijft de index als kolommenmap (atomair via KolomWriter). Naast de
+        afgeleide arrays gaan de genoemde kolommen mee (bijv. optimaal_score,
+        of de basiskolommen als de bron geen kolommenmap is).
+        """
+        arrays = {**self.afgeleid(), **{k: self.kolommen[k] for k in kolommen}}
+        with KolomWriter(path, {k: v.dtype.str for k, v in arrays.items()},
+                         {"bron": bron, "blok": self.blok, "extra": list(kolommen)}) as w:
+            for a in range(0, max(self.n, 1), 1 << 22):
+                w.schrijf(**{k: v[a:a + (1 << 22)] for k, v in arrays.items()})
+
+    @classmethod
+    def laad(cls, path: Path, basis: Optional[Dict[str, np.ndarray]] = None) -> "ResultaatIndex":
+        """Opent een geschreven index als memmaps; basis = kolommen van de bron (anders uit de map zelf)."""
+        arrays, meta = read_kolommen(path)
+        kolommen = {k: arrays.pop(k) for k in meta["extra"]}
+        if basis is not None:
+            kolommen = {**basis, **kolommen}
+        return cls(kolommen, arrays, meta["blok"])
+
+    # ── Samenvatting ─────────────────────────────────────────────────────────
+
+    def samenvatting(self) -> Dict[str, Any]:
+        """Aantal en min/max van prijs en CO2, uit de gesorteerde kolommen (O(1))."""
+        if not self.n:
+            return {"aantal": 0, "prijs_min": None, "prijs_max": None, "co2_min": None, "co2_max": None}
+        p, c = self.gesorteerd[PRIJS], self.gesorteerd[CO2]
+        return {
+            "aantal":    self.n,
+            "prijs_min": float(p[0]), "prijs_max": float(p[-1]),
+            "co2_min":   float(c[0]), "co2_max":   float(c[-1]),
+        }
+
+    # ── Bereik ───────────────────────────────────────────────────────────────
+
+    def prefix(self, kolom: str, maximum: float) -> int:
+        """Aantal rijen met kolom <= maximum (kolom is cost_total of co2_total)."""
+        return int(np.searchsorted(self.gesorteerd[kolom], maximum, side="right"))
+
+    def aantal(self, max_prijs: float, max_co2: float) -> int:
+        """Aantal rijen met cost_total <= max_prijs en co2_total <= max_co2."""
+        pc     = self.prefix(PRIJS, max_prijs)
+        volle  = pc // self.blok
+        totaal = sum(
+            int(np.searchsorted(self._co2_blokken[a:a + self.blok], max_co2, side="right"))
+            for a in range(0, volle * self.blok, self.blok)
+        )
+        rest   = self._co2_in_prijsvolgorde[volle * self.blok:pc]
+        return totaal + int(np.count_nonzero(rest <= max_co2))
+
+    def binnen(self, rijen: np.ndarray, max_prijs: float, max_co2: float) -> np.ndarray:
+        """Masker: welke rijen vallen binnen beide grenzen."""
+        return (self.kolommen[PRIJS][rijen] <= max_prijs) & (self.kolommen[CO2][rijen] <= max_co2)
+
+    # ── Top N ────────────────────────────────────────────────────────────────
+
+    def top(self, sleutel: str, aflopend: bool, max_prijs: float, max_co2: float, n: int) -> np.ndarray:
+        """Rijposities van de beste n op sleutel binnen de grenzen, in rankingvolgorde."""
+        pc, pk = self.prefix(PRIJS, max_prijs), self.prefix(CO2, max_co2)
+        if n <= 0 or not pc or not pk:
+            return np.empty(0, dtype=np.int64)
+
+        # Geschatte scanlengte (onafhankelijke prijs/CO2) vs. het kleinste prefix filteren
+        kleinste      = min(pc, pk)
+        selectiviteit = (pc / self.n) * (pk / self.n)
+        if kleinste > n / selectiviteit:
+            # Binnen de eigen grens is alleen een prefix van de permutatie relevant
+            segment = self.volgorde[sleutel]
+            if sleutel in (PRIJS, CO2):
+                segment = segment[:pc if sleutel == PRIJS else pk]
+            # De schatting kan mis zijn (sleutel correleert met de grenzen): na een
+            # kwart van de prefixlengte zonder n treffers alsnog het prefix filteren
+            rijen = self._scan(segment, sleutel, aflopend, max_prijs, max_co2, n, kleinste // 4)
+            if rijen is not None:
+                return rijen
+
+        return self._sorteer(self.rijen_binnen(max_prijs, max_co2), sleutel, aflopend, n)
+
+    def rijen_binnen(self, max_prijs: float, max_co2: float) -> np.ndarray:
+        """Alle rijposities binnen beide grenzen (niet gesorteerd), via het kleinste prefix."""
+        pc, pk = self.prefix(PRIJS, max_prijs), self.prefix(CO2, max_co2)
+        if pc <= pk:
+            # Prijsprefix: CO2 staat al in prijsvolgorde, dus filteren zonder gather
+            return self.volgorde[PRIJS][:pc][self._co2_in_prijsvolgorde[:pc] <= max_co2]
+        rijen = self.volgorde[CO2][:pk]
+        return rijen[self.kolommen[PRIJS][rijen] <= max_prijs]
+
+    def _sorteer(self, rijen: np.ndarray, sleutel: str, aflopend: bool, n: int) -> np.ndarray:
+        """De beste n rijen op sleutel; alleen de kandidaten t/m de n-de waarde worden gesorteerd."""
+        waarden = self.kolommen[sleutel][rijen]
+        if aflopend:
+            waarden = -waarden
+        if len(rijen) > n:
+            grens   = np.partition(waarden, n - 1)[n - 1]
+            houden  = waarden <= grens
+            rijen, waarden = rijen[houden], waarden[houden]
+        return rijen[np.lexsort((rijen, waarden))][:n].astype(np.int64)
+
+    def _scan(self, segment: np.ndarray, sleutel: str, aflopend: bool,
+              max_prijs: float, max_co2: float, n: int, limiet: int) -> Optional[np.ndarray]:
+        """
+        Loopt het segment in brokken af (van achteren bij aflopend) tot er n
+        treffers zijn; None als daarvoor meer dan `limiet` rijen nodig zijn.
+        """
+        gevonden = []
+        aantal   = 0
+        brok     = max(4 * n, 1024)
+        positie  = 0
+        while positie < len(segment):
+            if aflopend:
+                deel = segment[max(0, len(segment) - positie - brok):len(segment) - positie][::-1]
+            else:
+                deel = segment[positie:positie + brok]
+            positie += len(deel)
+            raak = deel[self.binnen(deel, max_prijs, max_co2)]
+            gevonden.append(raak)
+            aantal += len(raak)
+            if aantal >= n:
+                break
+            if positie >= limiet:
+                return None
+            brok *= 2
+
+        rijen = np.concatenate(gevonden) if gevonden else np.empty(0, dtype=np.int64)
+        if aflopend and aantal >= n:
+            # Gelijke waarden rond de grens: van achteren gescand, dus de hele groep meenemen
+            grens = self.kolommen[sleutel][rijen[n - 1]]
+            rest  = segment[:len(segment) - positie]
+            rest  = rest[int(np.searchsorted(self.kolommen[sleutel][rest], grens, side="left")):]
+            rijen = np.concatenate([rijen, rest[self.binnen(rest, max_prijs, max_co2)]])
+        return self._sorteer(rijen, sleutel, aflopend, n)
+
+    # ── Opzoeken ─────────────────────────────────────────────────────────────
+
+    def positie(self, scenario_id: int) -> Optional[int]:
+        """Rijpositie van een scenario_id, of None."""
+        if self._id_volgorde is None or not self.n:
+            return None
+        i = int(np.searchsorted(self._ids_gesorteerd, scenario_id))
+        if i < self.n and self._ids_gesorteerd[i] == scenario_id:
+            return int(self._id_volgorde[i])
+        return None
+
+    def punten_binnen(self, max_prijs: float, max_co2: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(prijs, co2) van alle rijen binnen beide grenzen, aaneengesloten gelezen in prijsvolgorde."""
+        pc   = self.prefix(PRIJS, max_prijs)
+        co2  = self._co2_in_prijsvolgorde[:pc]
+        raak = co2 <= max_co2
+        return np.asarray(self.gesorteerd[PRIJS][:pc][raak]), np.asarray(co2[raak])
+
+    def rijen(self, posities: np.ndarray, kolommen: Sequence[str] = (*BASIS, OPTIMAAL)) -> Dict[str, np.ndarray]:
+        """De gevraagde kolommen voor een handvol rijposities (één pagina)."""
+        posities = np.asarray(posities, dtype=np.int64)
+        return {k: np.asarray(self.kolommen[k][posities]) for k in kolommen}
+
+
+def read_resultaat_index(results_path: Path, cache: bool = True) -> ResultaatIndex:
+    """
+    ResultaatIndex voor een results-bestand (kolommenmap of JSONL), met
+    optimaal_score als extra kolom. Gebruikt <results>.index als die bij de
+    huidige bron hoort; anders wordt (één keer) gebouwd en weggeschreven.
+    """
+    pad  = index_pad(results_path)
+    bron = results_kenmerk(results_path)
+    basis_in_bron = results_path.is_dir()
+
+    if cache and pad.exists():
+        try:
+            _, meta = read_kolommen(pad)
+            if meta.get("bron") == bron:
+                return ResultaatIndex.laad(pad, read_kolommen(results_path)[0] if basis_in_bron else None)
+        except (OSError, KeyError, ValueError):
+            pass  # onleesbaar/oud/kapot formaat: opnieuw bouwen
+
+    kolommen = {k: v for k, v in read_results_kolommen(results_path).items() if k in BASIS}
+    kolommen[OPTIMAAL] = optimaal_kolom(kolommen[PRIJS], kolommen[CO2])
+    index = ResultaatIndex.bouw(kolommen)
+    if not cache:
+        return index
+    try:
+        index.schrijf(pad, bron, [OPTIMAAL] if basis_in_bron else [*BASIS, OPTIMAAL])
+    except OSError:
+        return index  # read-only map: dan alleen in het geheugen
+    # Opnieuw openen als memmaps, zodat het geheugen van de bouw vrijkomt
+    return ResultaatIndex.laad(pad, read_kolommen(results_path)[0] if basis_in_bron else None)
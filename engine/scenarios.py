@@ -0,0 +1,256 @@
+# engine/scenarios.py
+#
+# Impliciete scenarioruimte: het cartesisch product van de actieve onderdelen
+# wordt niet weggeschreven maar gerepresenteerd als lijst assen
+# (onderdeel_id, material_ids). Een scenario_id wordt via mixed-radix
+# rekenkunde terugvertaald naar zijn keuzes (zelfde volgorde als
+# itertools.product, scenario_id begint bij 1).
+#
+from __future__ import annotations
+from typing import Any, Dict, Generator, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.calculator import NONE_INDEX, bouw_materiaal_arrays, bepaal_factor_vector
+
+PANEEL_M2_PER_STUK = 1.7
+
+# Vaste mapping: (categorie, veld_in_afmetingen, enh, conditie_veld, conditie_waarde)
+CATEGORIE_MAP = [
+    ("Beglazing",           "beglazing_m2",  "m2",    None,      None),
+    ("Gevelisolatie",       "gevel_m2",      "m2",    None,      None),
+    ("Deuren",              "deuren_stuks",  "stuks", None,      None),
+    ("Hellend dakisolatie", "dak_m2",        "m2",    "daktype", "schuin"),
+    ("Plat dakisolatie",    "dak_m2",        "m2",    "daktype", "plat"),
+    ("Vloerisolatie",       "vloer_m2",      "m2",    None,      None),
+    ("Kozijnen",            "kozijnen_m1",   "m1",    None,      None),
+]
+
+OPTIE_MAP = [
+    ("Panelen",       "panelen",      "stuks", lambda afm: afm.get("dak_m2", 0) / PANEEL_M2_PER_STUK),
+    ("Zonne-energie", "zonnepanelen", "stuks", lambda afm: afm.get("dak_m2", 0) / PANEEL_M2_PER_STUK),
+    ("Ventilatie",    "ventilatie",   "stuks", lambda afm: 1),
+]
+
+VERWARMING_VOORKEUR_MAP = {
+    "ketel":           "Verwarming - Ketel",
+    "warmtepomp":      "Verwarming - Warmtepomp",
+    "stadsverwarming": "Stadsverwarming",
+}
+
+
+def load_onderdeel_map(onderdelen: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """Geeft categorie -> onderdeel_id mapping."""
+    result = {}
+    for item in onderdelen:
+        cat = item.get("categorie", "").strip()
+        oid = item.get("onderdeel_id", "").strip()
+        if cat and oid:
+            result[cat] = oid
+    return result
+
+
+def resolve_actief(gebouw: Dict) -> List[Dict]:
+    afm  = gebouw.get("afmetingen", {})
+    opts = gebouw.get("opties", {})
+    actief = []
+
+    for categorie, veld, enh, cond_veld, cond_waarde in CATEGORIE_MAP:
+        if cond_veld and afm.get(cond_veld) != cond_waarde:
+            continue
+        waarde = afm.get(veld)
+        if waarde and float(waarde) > 0:
+            actief.append({"categorie": categorie, "waarde": float(waarde), "enh": enh})
+
+    for categorie, optie_veld, enh, waarde_fn in OPTIE_MAP:
+        if opts.get(optie_veld):
+            waarde = waarde_fn(afm)
+            if waarde and float(waarde) > 0:
+                actief.append({"categorie": categorie, "waarde": round(float(waarde), 2), "enh": enh})
+
+    if opts.get("verwarming"):
+        voorkeur = opts.get("verwarming_voorkeur")
+        if voorkeur and voorkeur in VERWARMING_VOORKEUR_MAP:
+            cats = [VERWARMING_VOORKEUR_MAP[voorkeur]]
+        else:
+            cats = list(VERWARMING_VOORKEUR_MAP.values())
+        for cat in cats:
+            actief.append({"categorie": cat, "waarde": 1, "enh": "stuks"})
+
+    return actief
+
+
+class ScenarioRuimte:
+    """
+    Scenarioruimte als lijst assen [(onderdeel_id, material_ids), ...].
+    Scenario's worden on-demand gedecodeerd; er wordt niets gematerialiseerd.
+    """
+
+    def __init__(self, assen: Sequence[Tuple[str, Sequence[str]]], gebouw_id: Optional[str] = None,
+                 actief: Optional[List[Dict]] = None):
+        self.assen         = [(oid, list(ids)) for oid, ids in assen]
+        self.gebouw_id     = gebouw_id
+        self.actief        = actief or []
+        self.ontbrekend: List[Dict] = []
+        self.onderdeel_ids = [oid for oid, _ in self.assen]
+        self.radices       = [len(ids) for _, ids in self.assen]
+
+        totaal = 1
+        for r in self.radices:
+            totaal *= r
+        self.totaal = totaal if self.assen else 0
+
+    def __len__(self) -> int:
+        return self.totaal
+
+    @classmethod
+    def van_gebouw(
+        cls,
+        gebouw: Dict[str, Any],
+        materials: Iterable[Dict[str, Any]],
+        oid_map: Dict[str, str],
+        add_none: bool = False,
+    ) -> "ScenarioRuimte":
+        """
+        Bouwt de assen op basis van resolve_actief. Categorieën zonder
+        materialen worden overgeslagen (zie ontbrekend).
+        """
+        by_cat: Dict[str, List[Dict]] = {}
+        for m in materials:
+            cat = (m.get("categorie") or "").strip()
+            if cat:
+                by_cat.setdefault(cat, []).append(m)
+
+        assen  = []
+        actief = []
+        ontbrekend = []
+        for item in resolve_actief(gebouw):
+            cat   = item["categorie"]
+            oid   = oid_map.get(cat, cat)  # fallback op naam als ID niet gevonden
+            maten = by_cat.get(cat, [])
+
+            if not maten:
+                ontbrekend.append({**item, "onderdeel_id": oid})
+                continue
+
+            material_ids = sorted(set(m["material_id"] for m in maten))
+            if add_none:
+                material_ids = ["NONE"] + material_ids
+
+            assen.append((oid, material_ids))
+            actief.append({**item, "onderdeel_id": oid})
+
+        ruimte = cls(assen, gebouw.get("gebouw_id"), actief)
+        ruimte.ontbrekend = ontbrekend
+        return ruimte
+
+    # ── Decoderen ────────────────────────────────────────────────────────────
+
+    def indices(self, scenario_id: int) -> List[int]:
+        """Optie-index per as voor één scenario_id (1-based)."""
+        if not 1 <= scenario_id <= self.totaal:
+            raise IndexError(f"scenario_id {scenario_id} buiten ruimte (1..{self.totaal})")
+        rest = scenario_id - 1
+        idx  = [0] * len(self.radices)
+        for a in range(len(self.radices) - 1, -1, -1):
+            rest, idx[a] = divmod(rest, self.radices[a])
+        return idx
+
+    def scenario_id(self, indices: Sequence[int]) -> int:
+        """Inverse van indices()."""
+        rest = 0
+        for i, r in zip(indices, self.radices):
+            rest = rest * r + int(i)
+        return rest + 1
+
+    def keuzes(self, scenario_id: int) -> Dict[str, str]:
+        return {
+            oid: ids[i]
+            for (oid, ids), i in zip(self.assen, self.indices(scenario_id))
+        }
+
+    def index_ids(self, scenario_ids: np.ndarray) -> np.ndarray:
+        """(n, n_assen) matrix met optie-indices voor willekeurige scenario_ids."""
+        rest = np.asarray(scenario_ids, dtype=np.int64) - 1
+        blok = np.empty((len(rest), len(self.radices)), dtype=np.int32)
+        for a in range(len(self.radices) - 1, -1, -1):
+            rest, blok[:, a] = np.divmod(rest, self.radices[a])
+        return blok
+
+    def index_blok(self, start: int, stop: int) -> np.ndarray:
+        """(n, n_assen) matrix met optie-indices voor scenario_ids [start, stop)."""
+        return self.index_ids(np.arange(start, stop, dtype=np.int64))
+
+    def vertalingen(self, materiaal_index: Dict[str, int]) -> List[np.ndarray]:
+        """Per as: optie-index -> globale materiaal-index."""
+        return [
+            np.array([materiaal_index.get(mid, NONE_INDEX) for mid in ids], dtype=np.int32)
+            for _, ids in self.assen
+        ]
+
+    def materiaal_matrix(self, start: int, stop: int, materiaal_index: Dict[str, int]) -> np.ndarray:
+        """Zelfde blok, maar met globale materiaal-indices (invoer voor bereken_batch)."""
+        return self.vertaal(self.index_blok(start, stop), materiaal_index)
+
+    def vertaal(self, opties: np.ndarray, materiaal_index: Dict[str, int]) -> np.ndarray:
+        """Optie-indices -> globale materiaal-indices (in-place)."""
+        for a, vertaling in enumerate(self.vertalingen(materiaal_index)):
+            opties[:, a] = vertaling[opties[:, a]]
+        return opties
+
+    def bijdragen(self, material_lookup: Dict[str, Dict[str, Any]], gebouw: Dict[str, Any]) -> Dict[str, List[np.ndarray]]:
+        """
+        Bijdrage per optie per as (waarde * factor), per resultaatkolom.
+        Totalen zijn sommen van onafhankelijke bijdragen; basis voor de
+        separabele rankings in engine/ranking.py.
+        """
+        materiaal_index, prijzen, co2s = bouw_materiaal_arrays(material_lookup)
+        factoren    = bepaal_factor_vector(self.onderdeel_ids, gebouw)
+        vertalingen = self.vertalingen(materiaal_index)
+        return {
+            "cost_total": [(prijzen * factoren[a])[v] for a, v in enumerate(vertalingen)],
+            "co2_total":  [(co2s    * factoren[a])[v] for a, v in enumerate(vertalingen)],
+        }
+
+    # ── Itereren ─────────────────────────────────────────────────────────────
+
+    def einde(self, max_scenarios: Optional[int] = None) -> int:
+        """Laatste scenario_id (inclusief), eventueel begrensd door max_scenarios."""
+        return self.totaal if max_scenarios is None else min(self.totaal, max_scenarios)
+
+    def blokken(self, blok_grootte: int, max_scenarios: Optional[int] = None,
+                bereik: Optional[Tuple[int, int]] = None) -> Generator[Tuple[int, int], None, None]:
+        """Geeft (start, stop) scenario_id-bereiken van hooguit blok_grootte, optioneel binnen een shard."""
+        begin, stop = bereik or (1, self.einde(max_scenarios) + 1)
+        for start in range(begin, stop, blok_grootte):
+            yield start, min(start + blok_grootte, stop)
+
+    def id_blokken(self, blok_grootte: int, max_scenarios: Optional[int] = None,
+                   bereik: Optional[Tuple[int, int]] = None) -> Generator[np.ndarray, None, None]:
+        """Zelfde als blokken, maar als arrays met scenario_ids (zie ook RegelSet.id_blokken)."""
+        for start, stop in self.blokken(blok_grootte, max_scenarios, bereik):
+            yield np.arange(start, stop, dtype=np.int64)
+
+    def shards(self, aantal: int, max_scenarios: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Verdeelt de ruimte in hooguit `aantal` aaneengesloten (start, stop) bereiken."""
+        n       = self.einde(max_scenarios)
+        grenzen = [1 + n * i // aantal for i in range(aantal + 1)]
+        return [(a, b) for a, b in zip(grenzen, grenzen[1:]) if b > a]
+
+    def iter_scenarios(self, max_scenarios: Optional[int] = None, regels=None) -> Generator[Dict[str, Any], None, None]:
+        """
+        Scenario-records in dezelfde vorm als scenarios.jsonl. Met regels
+        (engine.constraints.RegelSet) worden ongeldige deelbomen overgeslagen.
+        """
+        bron = regels if regels is not None else self
+        for sids in bron.id_blokken(65_536, max_scenarios):
+            yield from self.records(sids)
+
+    def records(self, scenario_ids: np.ndarray) -> Generator[Dict[str, Any], None, None]:
+        """Scenario-records (vorm van scenarios.jsonl) voor een blok scenario_ids."""
+        for sid, rij in zip(scenario_ids.tolist(), self.index_ids(scenario_ids).tolist()):
+            yield {
+                "scenario_id": sid,
+                "gebouw_id":   self.gebouw_id,
+                "keuzes":      {oid: ids[i] for (oid, ids), i in zip(self.assen, rij)},
+            }
@@ -1,6 +1,32 @@
 # engine/writer.py
+import gzip
 import json
+import os
+import shutil
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from engine.metrics import stap, tel
+
+# Optioneel: snellere JSON-encoder en zstd-compressie
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+KOLOM_FORMAAT    = "kolommen/1"
+SCENARIO_FORMAAT = "scenarios/1"
+SCENARIO_MAGIC   = b"SCENARIO"
+
+# JSONL-regels van dumps_record: compact, gelijk aan de uitvoer van orjson
+JSONL_SEPARATORS = (",", ":")
 
 
 def write_summary(output_path: Path, result: dict):
@@ -12,8 +38,295 @@ def write_summary(output_path: Path, result: dict):
 
 
 def append_scenario_jsonl(output_path: Path, record: dict):
-    """Schrijft één scenario-resultaat naar JSONL (append)."""
+    """
+    Schrijft één scenario-resultaat naar JSONL (append).
+    Opent het bestand per record; gebruik JsonlWriter voor grote aantallen.
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with output_path.open("a", encoding="utf-8") as f_out:
-        f_out.write(json.dumps(record, ensure_ascii=False) + "\n")
\ No newline at end of file
+    with output_path.open("ab") as f_out:
+        f_out.write(dumps_record(record) + b"\n")
+
+
+def dumps_record(record: dict) -> bytes:
+    """
+    Eén JSONL-regel (zonder newline); orjson als die beschikbaar is.
+    Het formaat ligt vast, met of zonder orjson: compact (geen spaties na
+    , en :), UTF-8 zonder escapes, sleutels in invoervolgorde.
+    """
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, ensure_ascii=False, separators=JSONL_SEPARATORS).encode("utf-8")
+
+
+def tijdelijk_pad(path: Path) -> Path:
+    """Pad waar tijdens het schrijven naartoe geschreven wordt (matcht geen results-glob)."""
+    return path.with_name(path.name + ".tmp")
+
+
+def vervang_map(tmp: Path, path: Path):
+    """
+    Zet een volledig geschreven map (tmp) op de plek van path. Een bestaande
+    map gaat eerst opzij naar <pad>.oud en wordt pas verwijderd als de nieuwe
+    op zijn plek staat: valt het proces tussen de twee hernoemingen weg, dan
+    staan de oude results nog compleet in <pad>.oud (matcht geen results-glob).
+    """
+    oud = path.with_name(path.name + ".oud")
+    if oud.exists():
+        shutil.rmtree(oud)
+    if path.exists():
+        os.replace(path, oud)
+    os.replace(tmp, path)
+    shutil.rmtree(oud, ignore_errors=True)
+
+
+class JsonlWriter:
+    """
+    Gebufferde JSONL-writer: records worden verzameld en in grote blokken
+    weggeschreven. Er wordt naar <pad>.tmp geschreven en pas bij succesvol
+    afsluiten hernoemd, zodat een half geschreven bestand nooit gevonden wordt.
+    Bij een exceptie in het with-blok wordt het tijdelijke bestand verwijderd.
+
+    compressie: None, "gzip" of "zstd" (vereist zstandard); standaard afgeleid
+    uit de extensie (.gz / .zst).
+
+        with JsonlWriter(path) as w:
+            for record in records:
+                w.schrijf(record)
+    """
+
+    def __init__(self, path: Path, compressie: Optional[str] = None, buffer_bytes: int = 8 << 20):
+        self.path = Path(path)
+        if compressie is None:
+            compressie = {".gz": "gzip", ".zst": "zstd"}.get(self.path.suffix)
+        self.compressie   = compressie
+        self.buffer_bytes = buffer_bytes
+        self.aantal       = 0
+        self.bytes        = 0
+        self._buffer: List[bytes] = []
+        self._grootte = 0
+        self._in_buffer = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = tijdelijk_pad(self.path)
+        if compressie == "gzip":
+            self._f = gzip.open(self._tmp, "wb", compresslevel=6)
+        elif compressie == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstd-compressie vereist het pakket 'zstandard'")
+            self._f = zstandard.ZstdCompressor().stream_writer(self._tmp.open("wb"))
+        elif compressie is None:
+            self._f = self._tmp.open("wb")
+        else:
+            raise ValueError(f"Onbekende compressie: {compressie}")
+
+    def schrijf(self, record: dict):
+        regel = dumps_record(record) + b"\n"
+        self._buffer.append(regel)
+        self._grootte += len(regel)
+        self._in_buffer += 1
+        self.aantal   += 1
+        if self._grootte >= self.buffer_bytes:
+            self.flush()
+
+    def schrijf_veel(self, records: Iterable[dict]):
+        for record in records:
+            self.schrijf(record)
+
+    def flush(self):
+        if self._buffer:
+            with stap("writer.jsonl"):
+                self._f.write(b"".join(self._buffer))
+            tel("writer.jsonl", self._in_buffer, geschreven=self._grootte)
+            self.bytes += self._grootte
+            self._buffer.clear()
+            self._grootte = 0
+            self._in_buffer = 0
+
+    def sluit(self):
+        """Schrijft de buffer weg en hernoemt het tijdelijke bestand naar het eindpad."""
+        self.flush()
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def afbreken(self):
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.sluit()
+        else:
+            self.afbreken()
+
+
+class KolomWriter:
+    """
+    Schrijft resultaten kolomsgewijs naar een map: per kolom een ruw binair
+    bestand (<kolom>.bin) plus meta.json met dtype, breedte en aantal rijen.
+    Lezen gaat zero-copy via np.memmap (zie engine.loader.read_kolommen).
+    Net als JsonlWriter wordt in <pad>.tmp geschreven en pas bij sluiten hernoemd.
+
+        with KolomWriter(path, {"scenario_id": "int64", "cost_total": "float64"}) as w:
+            w.schrijf(scenario_id=ids, cost_total=prijs)
+    """
+
+    def __init__(self, path: Path, kolommen: Dict[str, str], meta: Optional[Dict[str, Any]] = None):
+        self.path     = Path(path)
+        self.kolommen = {naam: np.dtype(dtype) for naam, dtype in kolommen.items()}
+        self.meta     = dict(meta or {})
+        self.rijen    = 0
+        self.breedte: Dict[str, int] = {}
+        self._tmp = tijdelijk_pad(self.path)
+        if self._tmp.exists():
+            shutil.rmtree(self._tmp)
+        self._tmp.mkdir(parents=True)
+        self._files = {naam: (self._tmp / f"{naam}.bin").open("wb") for naam in self.kolommen}
+
+    def schrijf(self, **blokken: np.ndarray):
+        """Voegt een blok rijen toe; alle kolommen moeten even lang zijn."""
+        lengtes = {len(b) for b in blokken.values()}
+        if set(blokken) != set(self.kolommen) or len(lengtes) != 1:
+            raise ValueError(f"Blok moet kolommen {sorted(self.kolommen)} met gelijke lengte bevatten")
+
+        n = lengtes.pop()
+        with stap("writer.kolommen"):
+            geschreven = 0
+            for naam, blok in blokken.items():
+                blok = np.ascontiguousarray(blok, dtype=self.kolommen[naam])
+                self.breedte.setdefault(naam, blok.shape[1] if blok.ndim == 2 else 1)
+                self._files[naam].write(blok.tobytes())
+                geschreven += blok.nbytes
+        tel("writer.kolommen", n, geschreven=geschreven)
+        self.rijen += n
+
+    def sluit(self):
+        for f in self._files.values():
+            f.close()
+        meta = {
+            **self.meta,
+            "formaat":  KOLOM_FORMAAT,
+            "rijen":    self.rijen,
+            "kolommen": {
+                naam: {"dtype": dtype.str, "breedte": self.breedte.get(naam, 1)}
+                for naam, dtype in self.kolommen.items()
+            },
+        }
+        write_summary(self._tmp / "meta.json", meta)
+        vervang_map(self._tmp, self.path)
+
+    def afbreken(self):
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def __enter__(self) -> "KolomWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.sluit()
+        else:
+            self.afbreken()
+
+
+class ScenarioWriter:
+    """
+    Compact scenariobestand (.scen): in plaats van per regel gebouw_id en een
+    keuzes-dict staat er één header met de assen, daarna per scenario alleen
+    het mixed-radix scenario_id (int64, little-endian). De keuzes volgen uit
+    de assen (ScenarioRuimte.keuzes); zie engine.loader.read_scenarios.
+
+        [SCENARIO_MAGIC][headerlengte uint64][JSON-header, uitgelijnd op 8][scenario_ids ...]
+
+    Het aantal scenario's volgt uit de bestandsgrootte, dus de header hoeft
+    niet achteraf bijgewerkt te worden. Schrijven gaat via <pad>.tmp.
+
+        with ScenarioWriter(path, ruimte.assen, ruimte.gebouw_id) as w:
+            for ids in ruimte.id_blokken(65_536):
+                w.schrijf(ids)
+    """
+
+    def __init__(self, path: Path, assen: Sequence, gebouw_id: Optional[str] = None,
+                 meta: Optional[Dict[str, Any]] = None):
+        self.path   = Path(path)
+        self.aantal = 0
+        self.bytes  = 0
+        header = json.dumps({
+            **(meta or {}),
+            "formaat":   SCENARIO_FORMAAT,
+            "gebouw_id": gebouw_id,
+            "assen":     [[oid, list(ids)] for oid, ids in assen],
+            "dtype":     "<i8",
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(SCENARIO_MAGIC) + 8 + len(header)) % 8)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = tijdelijk_pad(self.path)
+        self._f   = self._tmp.open("wb")
+        self._f.write(SCENARIO_MAGIC + len(header).to_bytes(8, "little") + header)
+
+    def schrijf(self, scenario_ids: np.ndarray):
+        blok = np.ascontiguousarray(scenario_ids, dtype="<i8")
+        with stap("writer.scenarios"):
+            self._f.write(blok.tobytes())
+        tel("writer.scenarios", len(blok), geschreven=blok.nbytes)
+        self.aantal += len(blok)
+        self.bytes  += blok.nbytes
+
+    def sluit(self):
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def afbreken(self):
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ScenarioWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.sluit()
+        else:
+            self.afbreken()
+
+
+def voeg_jsonl_samen(delen: Sequence[Path], path: Path):
+    """
+    Plakt deelbestanden (bijv. per shard) byte voor byte achter elkaar.
+    Werkt ook voor gzip/zstd: het resultaat bevat dan meerdere members/frames,
+    wat gzip, zstd en read_jsonl als één stroom lezen. Er wordt niet opnieuw
+    gecomprimeerd, dus de bytes verschillen van één doorlopende stroom.
+    """
+    path = Path(path)
+    tmp  = tijdelijk_pad(path)
+    with tmp.open("wb") as f_out:
+        for deel in delen:
+            with Path(deel).open("rb") as f_in:
+                shutil.copyfileobj(f_in, f_out, 8 << 20)
+    os.replace(tmp, path)
+
+
+def voeg_kolommen_samen(delen: Sequence[Path], path: Path):
+    """Voegt kolommen-mappen (zelfde kolommen, zelfde volgorde) samen tot één map."""
+    path  = Path(path)
+    tmp   = tijdelijk_pad(path)
+    metas = [json.loads((Path(d) / "meta.json").read_text(encoding="utf-8")) for d in delen]
+    if not metas:
+        raise ValueError("Geen delen om samen te voegen")
+
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    for naam in metas[0]["kolommen"]:
+        with (tmp / f"{naam}.bin").open("wb") as f_out:
+            for deel in delen:
+                with (Path(deel) / f"{naam}.bin").open("rb") as f_in:
+                    shutil.copyfileobj(f_in, f_out, 8 << 20)
+
+    write_summary(tmp / "meta.json", {**metas[0], "rijen": sum(m["rijen"] for m in metas)})
+    vervang_map(tmp, path)
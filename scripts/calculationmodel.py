@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+#
+# calculationmodel.py
+#
+# Eén ingang voor de hele keten, in één proces:
+#
+#   materials  materialenlijst.csv -> materials-records (of materials.jsonl lezen)
+#   ruimte     scenarioruimte + constraints per gebouw
+#   results    prijs + CO2 voor alle geldige scenario's als numpy-arrays
+#   ranks      top-N rankings          (zelfde vorm als gen_ranks.py)
+#   pareto     Pareto-front            (zelfde vorm als gen_pareto.py)
+#   summary    beste binnen budget     (zelfde vorm als gen_summary.py)
+#
+# De stappen geven arrays/records in het geheugen door; er wordt niets
+# tussentijds geserialiseerd en opnieuw ingelezen. Wat naar schijf gaat kies
+# je met --schrijf (default ranks, pareto en summary). Per stap wordt de
+# duur getoond.
+#
+# Gebruik:
+#   python scripts/calculationmodel.py run
+#   python scripts/calculationmodel.py run --gebouw gebouw_002 --add-none
+#   python scripts/calculationmodel.py run --gebouwdata data/gebouwdata/portfolio.json --alle
+#   python scripts/calculationmodel.py run --schrijf materials results ranks pareto summary
+#   python scripts/calculationmodel.py run --geen-csv --schrijf summary
+#
+
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.calculator  import bepaal_factor_vector, bereken_batch
+from engine.constraints import RegelSet, load_constraints, load_requirements, summary_document, vertaal_requirements
+from engine.incrementeel import inhoud_hash, vingerafdruk
+from engine.loader      import read_gebouw, read_gebouwen, read_jsonl
+from engine.materiaaltabel import MateriaalTabel, schrijf_materiaal_tabel
+from engine.materialenlijst import converteer_materialenlijst, load_onderdelen_map, schrijf_materials
+from engine.pareto      import pareto_front_punten
+from engine.ranking     import filter_binnen_grenzen, rank_kolommen, ranks_document, zoek_binnen_grenzen
+from engine.scenarios   import ScenarioRuimte, load_onderdeel_map
+from engine.writer      import KolomWriter, write_summary
+
+BLOK_GROOTTE = 250_000
+STAPPEN      = ["materials", "results", "ranks", "pareto", "summary"]
+
+
+@contextmanager
+def meet(tijden: dict, stap: str):
+    """Telt de duur van een stap op bij tijden[stap]."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        tijden[stap] = tijden.get(stap, 0.0) + time.perf_counter() - t0
+
+
+def laad_materials(args, root: Path, tijden: dict):
+    """CSV-conversie in het geheugen (of materials.jsonl als er geen CSV is / --geen-csv)."""
+    with meet(tijden, "materials"):
+        src = root / args.materialenlijst
+        if not args.geen_csv and src.exists():
+            materials, overgeslagen = converteer_materialenlijst(src, load_onderdelen_map(root))
+            print(f"Materialen: {len(materials)} uit {src.name} (overgeslagen: {overgeslagen})")
+            if "materials" in args.schrijf:
+                schrijf_materials(materials, root / args.materials)
+                print(f"  OK -> {root / args.materials}")
+        else:
+            materials = list(read_jsonl(root / args.materials))
+            print(f"Materialen: {len(materials)} uit {args.materials}")
+    return materials
+
+
+def bereken_results(ruimte, regels, gebouw, materiaal_index, prijzen, co2s, max_scenarios=None):
+    """Alle (geldige) scenario's als kolommen {scenario_id, cost_total, co2_total}."""
+    factoren = bepaal_factor_vector(ruimte.onderdeel_ids, gebouw)
+    bron     = regels if regels is not None else ruimte
+    delen    = {"scenario_id": [], "cost_total": [], "co2_total": []}
+    for ids in bron.id_blokken(BLOK_GROOTTE, max_scenarios):
+        matrix     = ruimte.vertaal(ruimte.index_ids(ids), materiaal_index)
+        prijs, co2 = bereken_batch(matrix, factoren, prijzen, co2s)
+        delen["scenario_id"].append(ids)
+        delen["cost_total"].append(prijs)
+        delen["co2_total"].append(co2)
+
+    leeg = {"scenario_id": np.int64, "cost_total": np.float64, "co2_total": np.float64}
+    return {k: np.concatenate(v) if v else np.empty(0, dtype=leeg[k]) for k, v in delen.items()}
+
+
+def run_gebouw(gebouw, ctx, args, out_dir: Path, tijden: dict) -> dict:
+    gebouw_id = gebouw.get("gebouw_id", "onbekend")
+
+    with meet(tijden, "ruimte"):
+        ruimte = ScenarioRuimte.van_gebouw(gebouw, ctx["materials"], ctx["onderdeel_map"], add_none=args.add_none)
+        regels = None if args.geen_constraints else RegelSet(ctx["constraints"], ruimte)
+
+    with meet(tijden, "results"):
+        kol = bereken_results(ruimte, regels, gebouw, ctx["materiaal_index"], ctx["prijzen"], ctx["co2s"], args.max_scenarios)
+        aantal = len(kol["scenario_id"])
+        if "results" in args.schrijf:
+            meta = {
+                "gebouw_id":     gebouw_id,
+                "assen":         ruimte.assen,
+                "add_none":      args.add_none,
+                "max_scenarios": args.max_scenarios,
+                "vingerafdruk":  vingerafdruk(ruimte, gebouw, ctx["materials"], ruimte.bijdragen(ctx["tabel"], gebouw)),
+            }
+            if regels is not None:
+                meta["constraints"]      = [r.constraint_id for r in regels.actief]
+                meta["constraints_hash"] = inhoud_hash(ctx["constraints"])
+            with KolomWriter(out_dir / f"results_{gebouw_id}.kolommen",
+                             {"scenario_id": "int64", "cost_total": "float64", "co2_total": "float64"}, meta) as w:
+                w.schrijf(**kol)
+
+    with meet(tijden, "ranks"):
+        tops, _, _ = rank_kolommen(kol, gebouw_id, top_n=10)
+        if "ranks" in args.schrijf:
+            write_summary(out_dir / f"ranks_{gebouw_id}.json", ranks_document(gebouw_id, aantal, tops, top_n=10))
+
+    with meet(tijden, "pareto"):
+        punten = pareto_front_punten(kol["cost_total"], kol["co2_total"], kol["scenario_id"])
+        if "pareto" in args.schrijf:
+            write_summary(out_dir / f"pareto_{gebouw_id}.json", {
+                "gebouw_id":        gebouw_id,
+                "totaal_scenarios": aantal,
+                "bron":             "results",
+                "front":            punten,
+            })
+
+    with meet(tijden, "summary"):
+        t0 = time.perf_counter()
+        grenzen, key, reverse, top_n = ctx["doel"]
+        if args.max_scenarios is None:
+            # Zelfde branch-and-bound als gen_summary.py; de results-kolommen zijn niet nodig
+            records, stat = zoek_binnen_grenzen(ruimte, ruimte.bijdragen(ctx["tabel"], gebouw),
+                                                grenzen, key, reverse, top_n, regels)
+        else:
+            # Begrensd op de eerste N scenario's: filteren op de al berekende kolommen
+            records, binnen = filter_binnen_grenzen(kol, grenzen, key, reverse, top_n, gebouw_id)
+            stat = {
+                "totaal":           ruimte.totaal,
+                "doorgerekend":     aantal,
+                "binnen_grenzen":   binnen,
+                "gesnoeid_grenzen": aantal - binnen,
+                "gesnoeid_doel":    0,
+                "gesnoeid_regels":  (regels or ruimte).einde(args.max_scenarios) - aantal,
+            }
+        if "summary" in args.schrijf:
+            write_summary(out_dir / f"results_summary_{gebouw_id}.json", summary_document(
+                gebouw_id, ctx["requirements"], records, stat, key, reverse, top_n,
+                ruimte.keuzes, time.perf_counter() - t0,
+            ))
+
+    return {"gebouw_id": gebouw_id, "scenarios": aantal, "front": len(punten), "binnen_budget": stat["binnen_grenzen"]}
+
+
+def cmd_run(args):
+    root    = ROOT
+    out_dir = root / args.out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tijden  = {}
+    t0      = time.perf_counter()
+
+    materials = laad_materials(args, root, tijden)
+    with meet(tijden, "materials"):
+        tabel = MateriaalTabel.van_records(materials)
+        materiaal_index, prijzen, co2s = tabel.arrays()
+        if "materials" in args.schrijf:
+            schrijf_materiaal_tabel(tabel, root / args.materials)
+
+    requirements = load_requirements(root / args.requirements)
+    ctx = {
+        "materials":       materials,
+        "tabel":           tabel,
+        "materiaal_index": materiaal_index,
+        "prijzen":         prijzen,
+        "co2s":            co2s,
+        "onderdeel_map":   load_onderdeel_map(read_jsonl(root / args.onderdelen)),
+        "constraints":     load_constraints(root / args.constraints),
+        "requirements":    requirements,
+        "doel":            vertaal_requirements(requirements),
+    }
+
+    if args.alle:
+        gebouwen = read_gebouwen(root / args.gebouwdata)
+    else:
+        gebouw = read_gebouw(root / args.gebouwdata, args.gebouw)
+        if not gebouw:
+            print("ERROR: gebouw niet gevonden.")
+            return
+        gebouwen = [gebouw]
+
+    for gebouw in gebouwen:
+        r = run_gebouw(gebouw, ctx, args, out_dir, tijden)
+        print(f"  {r['gebouw_id']:12s} {r['scenarios']:>12,} scenario's  |  front {r['front']:>5,}  |  binnen budget {r['binnen_budget']:>10,}")
+
+    totaal = time.perf_counter() - t0
+    print("\nDuur per stap:")
+    for stap in ["materials", "ruimte", "results", "ranks", "pareto", "summary"]:
+        print(f"  {stap:10s} {tijden.get(stap, 0.0):>9.3f}s")
+    print(f"  {'totaal':10s} {totaal:>9.3f}s")
+
+    if args.timing:
+        pad = root / args.timing
+        pad.write_text(json.dumps({
+            "gebouwen": len(gebouwen),
+            "stappen":  {k: round(v, 4) for k, v in tijden.items()},
+            "totaal_s": round(totaal, 4),
+        }, indent=2), encoding="utf-8")
+        print(f"OK -> {pad}")
+    print(f"\nOK -> {out_dir} ({', '.join(args.schrijf) or 'niets geschreven'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="calculationmodel")
+    sub    = parser.add_subparsers(dest="commando", required=True)
+
+    run = sub.add_parser("run", help="CSV -> scenarioruimte -> results -> ranks/pareto/summary in één proces")
+    run.add_argument("--gebouw",          default=None,                                  help="Gebouw ID")
+    run.add_argument("--alle",            action="store_true",                           help="Alle gebouwen uit --gebouwdata")
+    run.add_argument("--gebouwdata",      default="data/gebouwdata/gebouwgegevens.json",  help="Pad naar gebouwgegevens.json")
+    run.add_argument("--materialenlijst", default="data/brondata/materialenlijst.csv",   help="Pad naar materialenlijst.csv")
+    run.add_argument("--geen-csv",        action="store_true",                           help="materials.jsonl lezen i.p.v. de CSV te converteren")
+    run.add_argument("--materials",       default="data/brondata/materials.jsonl",        help="Pad naar materials.jsonl")
+    run.add_argument("--onderdelen",      default="data/brondata/onderdelen.jsonl",       help="Pad naar onderdelen.jsonl")
+    run.add_argument("--constraints",     default="data/brondata/constraints.jsonl",      help="Pad naar constraints.jsonl")
+    run.add_argument("--geen-constraints", action="store_true",                          help="Constraints niet toepassen")
+    run.add_argument("--requirements",    default="data/config/requirements.json",       help="Pad naar requirements.json")
+    run.add_argument("--add-none",        action="store_true",                           help="Voeg NONE-optie toe per onderdeel")
+    run.add_argument("--max-scenarios",   type=int, default=None,                        help="Maximaal aantal scenario's per gebouw")
+    run.add_argument("--out-dir",         default="data/output",                         help="Output map")
+    run.add_argument("--schrijf",         nargs="*", choices=STAPPEN, default=["ranks", "pareto", "summary"],
+                     help="Welke stappen naar schijf schrijven (leeg = niets)")
+    run.add_argument("--timing",          default=None,                                  help="Schrijf de duur per stap als JSON naar dit pad")
+    run.set_defaults(functie=cmd_run)
+
+    args = parser.parse_args()
+    args.functie(args)
+
+
+if __name__ == "__main__":
+    main()
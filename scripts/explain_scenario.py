@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
-import argparse, json
+import argparse, json, sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.loader import zoek_scenario
+
 M2_COL = {
     "VASTGLAS": "VASTGLAS_m2",
     "METSELWERK": "METSELWERK_m2",
@@ -104,11 +108,8 @@ def main():
     if building is None:
         raise SystemExit(f"Gebouw {args.gebouw_id} niet gevonden in {args.buildings}")
 
-    scenario = None
-    for s in read_jsonl(Path(args.scenarios)):
-        if int(s.get("scenario_id")) == args.scenario_id:
-            scenario = s
-            break
+    # Random access via offset-index (.jsonl) of binair zoeken (.scen), geen lineaire scan
+    scenario = zoek_scenario(Path(args.scenarios), args.scenario_id)
     if scenario is None:
         raise SystemExit(f"Scenario {args.scenario_id} niet gevonden in {args.scenarios}")
 
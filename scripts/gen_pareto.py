@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+# gen_pareto.py
+#
+# Bepaalt de exacte Pareto-front (prijs vs CO2) en schrijft een compact
+# frontbestand voor de Streamlit scatter- en rankingpagina's.
+#
+#   - standaard: direct uit de scenarioruimte (as voor as samenvoegen, zonder
+#     het product te enumereren)
+#   - --results: streaming over een bestaand results_gebouw_xxx.jsonl, of
+#     sorteer-en-veeg over een results_gebouw_xxx.kolommen map
+#
+# Gebruik:
+#   python scripts/gen_pareto.py
+#   python scripts/gen_pareto.py --gebouw gebouw_002 --add-none
+#   python scripts/gen_pareto.py --results data/output/results_gebouw_001.jsonl
+#
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.loader    import read_jsonl, read_kolommen, read_gebouw
+from engine.materiaaltabel import read_materiaal_tabel
+from engine.pareto    import ParetoFront, pareto_front_punten, pareto_front_ruimte
+from engine.scenarios import ScenarioRuimte, load_onderdeel_map
+from engine.writer    import write_summary
+from engine.metrics   import METRICS, PROFIELEN, draai_met_metrics, stap
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gebouw",      default=None,                                  help="Gebouw ID")
+    parser.add_argument("--results",     default=None,                                  help="Streaming over een bestaand results-bestand")
+    parser.add_argument("--materials",   default="data/brondata/materials.jsonl",        help="Pad naar materials.jsonl")
+    parser.add_argument("--onderdelen",  default="data/brondata/onderdelen.jsonl",       help="Pad naar onderdelen.jsonl")
+    parser.add_argument("--gebouwdata",  default="data/gebouwdata/gebouwgegevens.json",  help="Pad naar gebouwgegevens.json")
+    parser.add_argument("--add-none",    action="store_true",                            help="Voeg NONE-optie toe per onderdeel")
+    parser.add_argument("--out",         default=None,                                   help="Output pad (default: data/output/pareto_<gebouw>.json)")
+    parser.add_argument("--metrics",     action="store_true",                            help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",     choices=PROFIELEN, default=None,                help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
+    args = parser.parse_args()
+
+    draai_met_metrics(genereer, args, "gen_pareto")
+
+
+def genereer(args):
+    """Bepaalt het Pareto-front; geeft (outputpad, extra velden) of None."""
+
+    root = ROOT
+
+    if args.results:
+        results_path = root / args.results
+        gebouw_id    = results_path.name.split(".")[0].replace("results_", "")
+
+        with stap("gen_pareto.front"):
+            if results_path.is_dir():
+                print(f"Front over kolommen {results_path.name}...")
+                kol, _ = read_kolommen(results_path)
+                punten = pareto_front_punten(kol["cost_total"], kol["co2_total"], kol["scenario_id"])
+                totaal = len(kol["scenario_id"])
+            else:
+                print(f"Streaming front over {results_path.name}...")
+                front  = ParetoFront().verwerk(read_jsonl(results_path))
+                punten = front.punten()
+                totaal = front.verwerkt
+        bron = "results"
+    else:
+        gebouw = read_gebouw(root / args.gebouwdata, args.gebouw)
+        if not gebouw:
+            print("ERROR: gebouw niet gevonden.")
+            return
+        gebouw_id = gebouw.get("gebouw_id", "onbekend")
+        ruimte    = ScenarioRuimte.van_gebouw(
+            gebouw,
+            read_jsonl(root / args.materials),
+            load_onderdeel_map(read_jsonl(root / args.onderdelen)),
+            add_none=args.add_none,
+        )
+        print(f"Scenarioruimte: {ruimte.totaal:,} scenario's over {len(ruimte.assen)} onderdelen")
+        kolommen = ruimte.bijdragen(read_materiaal_tabel(root / args.materials), gebouw)
+        with stap("gen_pareto.front"):
+            punten = pareto_front_ruimte(ruimte, kolommen)
+        totaal   = ruimte.totaal
+        bron     = "ruimte"
+
+    METRICS.tel("gen_pareto.front", totaal)
+
+    out_path = root / (args.out or f"data/output/pareto_{gebouw_id}.json")
+    write_summary(out_path, {
+        "gebouw_id":        gebouw_id,
+        "totaal_scenarios": totaal,
+        "bron":             bron,
+        "front":            punten,
+    })
+
+    print(f"\nOK -> {out_path}")
+    print(f"Front: {len(punten):,} niet-gedomineerde scenario's van {totaal:,}")
+    for p in punten[:3]:
+        print(f"  #{p['scenario_id']:<10}  €{p['cost_total']:>12,.2f}  |  CO2: {p['co2_total']:>12,.2f}")
+    return out_path, {"gebouw_id": gebouw_id, "scenarios": totaal, "front": len(punten), "bron": bron}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+#
+# gen_portfolio.py
+#
+# Rekent alle gebouwen uit gebouwgegevens.json (lijst) in één run door.
+# Materialen worden één keer geladen; gebouwen met dezelfde actieve
+# onderdelen worden gegroepeerd en samen doorgerekend (engine/portfolio.py).
+#
+# Output (in --out-dir, default data/output/portfolio/):
+#   ranks_<gebouw>.json            top-N rankings per gebouw (zelfde vorm als gen_ranks.py)
+#   portfolio_summary.json         groepen, bandbreedtes per gebouw en portfolio-totalen
+#   results_<gebouw>.kolommen/     alleen met --results
+#
+# Constraints uit data/brondata/constraints.jsonl worden net als in
+# gen_results.py per groep toegepast; --geen-constraints schakelt ze uit.
+#
+# Gebruik:
+#   python scripts/gen_portfolio.py --gebouwdata data/gebouwdata/portfolio.json
+#   python scripts/gen_portfolio.py --gebouwdata data/gebouwdata/portfolio.json --results
+#   python scripts/gen_portfolio.py --gebouwdata data/gebouwdata/portfolio.json --geen-constraints
+#
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.constraints import load_constraints
+from engine.incrementeel import inhoud_hash
+from engine.loader     import read_gebouwen, read_jsonl
+from engine.materiaaltabel import read_materiaal_tabel
+from engine.portfolio  import groepeer_gebouwen, portfolio_samenvatting, rank_groep
+from engine.ranking    import ranks_document
+from engine.scenarios  import load_onderdeel_map
+from engine.writer     import KolomWriter, write_summary
+from engine.metrics    import PROFIELEN, draai_met_metrics
+
+
+def schrijf_ranks(out_dir: Path, gebouw_id: str, resultaat: dict, top_n: int):
+    document = ranks_document(gebouw_id, resultaat["aantal"], resultaat["tops"], top_n)
+    write_summary(out_dir / f"ranks_{gebouw_id}.json", document)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gebouwdata", default="data/gebouwdata/gebouwgegevens.json", help="Pad naar gebouwgegevens.json (lijst van gebouwen)")
+    parser.add_argument("--materials",  default="data/brondata/materials.jsonl",       help="Pad naar materials.jsonl")
+    parser.add_argument("--onderdelen", default="data/brondata/onderdelen.jsonl",      help="Pad naar onderdelen.jsonl")
+    parser.add_argument("--out-dir",    default="data/output/portfolio",               help="Output map")
+    parser.add_argument("--add-none",   action="store_true",                           help="Voeg NONE-optie toe per onderdeel")
+    parser.add_argument("--top-n",      type=int, default=10,                          help="Aantal scenario's per ranking")
+    parser.add_argument("--results",    action="store_true",                           help="Schrijf ook results-kolommen per gebouw")
+    parser.add_argument("--constraints", default="data/brondata/constraints.jsonl",    help="Pad naar constraints.jsonl")
+    parser.add_argument("--geen-constraints", action="store_true",                     help="Constraints niet toepassen")
+    parser.add_argument("--metrics",    action="store_true",                           help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",    choices=PROFIELEN, default=None,               help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
+    args = parser.parse_args()
+
+    draai_met_metrics(genereer, args, "gen_portfolio")
+
+
+def genereer(args):
+    """Rekent alle gebouwen door; geeft (pad van portfolio_summary.json, extra velden)."""
+
+    root    = ROOT
+    out_dir = root / args.out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+
+    gebouwen = read_gebouwen(root / args.gebouwdata)
+    print(f"Gebouwen:  {len(gebouwen)}")
+
+    tabel = read_materiaal_tabel(root / args.materials)
+    materiaal_index, prijzen, co2s = tabel.arrays()
+    print(f"  {len(tabel)} materialen geladen")
+
+    constraints = None if args.geen_constraints else load_constraints(root / args.constraints)
+    groepen = groepeer_gebouwen(
+        gebouwen,
+        read_jsonl(root / args.materials),
+        load_onderdeel_map(read_jsonl(root / args.onderdelen)),
+        add_none=args.add_none,
+        constraints=constraints,
+    )
+    print(f"  {len(groepen)} groepen met dezelfde onderdelen")
+
+    per_gebouw = {}
+    for nr, groep in enumerate(groepen, 1):
+        print(f"Groep {nr}/{len(groepen)}: {len(groep)} gebouwen x {groep.aantal:,} scenario's")
+        if groep.regels is not None:
+            for r in groep.regels.rapport():
+                print(f"  Constraint {r['constraint_id']}: {r['status']}, gesnoeid: {r['gesnoeid']:,}")
+
+        bij_blok = None
+        writers  = []
+        if args.results:
+            meta     = {"assen": groep.ruimte.assen, "add_none": args.add_none}
+            if groep.regels is not None:
+                meta["constraints"]      = [r.constraint_id for r in groep.regels.actief]
+                meta["constraints_hash"] = inhoud_hash(constraints)
+            kolommen = {"scenario_id": "int64", "cost_total": "float64", "co2_total": "float64"}
+            writers  = [
+                KolomWriter(out_dir / f"results_{gid}.kolommen", kolommen, {**meta, "gebouw_id": gid})
+                for gid in groep.gebouw_ids
+            ]
+
+            def bij_blok(ids, prijs, co2):
+                for g, w in enumerate(writers):
+                    w.schrijf(scenario_id=ids, cost_total=prijs[g], co2_total=co2[g])
+
+        try:
+            resultaten = rank_groep(groep, tabel, materiaal_index, prijzen, co2s,
+                                    top_n=args.top_n, bij_blok=bij_blok)
+        except BaseException:
+            for w in writers:
+                w.afbreken()
+            raise
+        for w in writers:
+            w.sluit()
+
+        for gebouw_id, resultaat in resultaten.items():
+            schrijf_ranks(out_dir, gebouw_id, resultaat, args.top_n)
+        per_gebouw.update(resultaten)
+
+    samenvatting = portfolio_samenvatting(groepen, per_gebouw)
+    samenvatting["duur_s"] = round(time.perf_counter() - t0, 3)
+    write_summary(out_dir / "portfolio_summary.json", samenvatting)
+
+    print(f"\nOK -> {out_dir}")
+    print(f"Gebouwen: {samenvatting['aantal_gebouwen']}  |  scenario's: {samenvatting['totaal_scenarios']:,}  |  {samenvatting['duur_s']}s")
+    p = samenvatting["portfolio"]
+    print(f"Portfolio prijs: €{p['prijs_min']:,.2f} - €{p['prijs_max']:,.2f}")
+    print(f"Portfolio CO2:   {p['co2_min']:,.2f} - {p['co2_max']:,.2f}")
+    return out_dir / "portfolio_summary.json", {"gebouwen": samenvatting["aantal_gebouwen"], "scenarios": samenvatting["totaal_scenarios"]}
+
+
+if __name__ == "__main__":
+    main()
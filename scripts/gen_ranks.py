@@ -12,43 +12,54 @@
 # Gebruik:
 #   python scripts/gen_ranks.py
 #   python scripts/gen_ranks.py --gebouw gebouw_002
+#   python scripts/gen_ranks.py --direct              (zonder results, direct uit de scenarioruimte)
+#   python scripts/gen_ranks.py --analytisch          (min/max uit de scenarioruimte, één pass over results)
+#
+# Met --direct/--analytisch worden de constraints uit constraints.jsonl op de
+# scenarioruimte toegepast, net als in gen_results.py: ongeldige scenario's
+# tellen niet mee in de rankings, het totaal en de min/max (--geen-constraints
+# schakelt ze uit).
+#
+# Het results-bestand wordt gestreamd (twee passes: min/max, daarna scoren
+# en ranken), zodat het nooit volledig in geheugen hoeft.
 #
 
 import argparse
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def load_results(path: Path) -> list:
-    results = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                results.append(json.loads(line))
-    return results
-
+from engine.constraints import RegelSet, load_constraints
+from engine.loader    import find_results, read_jsonl, read_kolommen, read_gebouw
+from engine.materiaaltabel import read_materiaal_tabel
+from engine.metrics   import METRICS, PROFIELEN, draai_met_metrics, stap
+from engine.ranking   import extremen_ruimte, rank_kolommen, rank_ruimte, rank_stroom
+from engine.scenarios import ScenarioRuimte, load_onderdeel_map
 
-def bereken_optimaal_score(results: list) -> list:
-    """Voeg genormaliseerde 50/50 score toe aan elk resultaat."""
-    prijzen = [r["cost_total"] for r in results]
-    co2s    = [r["co2_total"]  for r in results]
 
-    p_min, p_max = min(prijzen), max(prijzen)
-    c_min, c_max = min(co2s),    max(co2s)
-
-    for r in results:
-        p_norm = (r["cost_total"] - p_min) / (p_max - p_min) if p_max != p_min else 0
-        c_norm = (r["co2_total"]  - c_min) / (c_max - c_min) if c_max != c_min else 0
-        r["optimaal_score"] = round((p_norm + c_norm) / 2, 6)
+def top10(tops: dict) -> dict:
+    # Verwijder optimaal_score uit output (intern gebruik)
+    return {
+        f"top10_{naam}": [{k: v for k, v in r.items() if k != "optimaal_score"} for r in ranked]
+        for naam, ranked in tops.items()
+    }
 
-    return results
 
+def top10_direct(ruimte: ScenarioRuimte, kolommen: dict, extremen: dict, regels=None) -> dict:
+    """Zelfde rankings als de results-route, exact via best-first zoeken in de scenarioruimte."""
+    p_min, p_max = extremen["cost_total"]
+    c_min, c_max = extremen["co2_total"]
+    optimaal = {"cost_total": 1 / ((p_max - p_min) or 1), "co2_total": 1 / ((c_max - c_min) or 1)}
 
-def top10(results: list, key: str, reverse: bool) -> list:
-    ranked = sorted(results, key=lambda r: r[key], reverse=reverse)[:10]
-    # Verwijder optimaal_score uit output (intern gebruik)
-    return [{k: v for k, v in r.items() if k != "optimaal_score"} for r in ranked]
+    return {
+        "top10_duurste":      rank_ruimte(ruimte, kolommen, "cost_total", reverse=True,  top_n=10, regels=regels),
+        "top10_goedkoopste":  rank_ruimte(ruimte, kolommen, "cost_total", reverse=False, top_n=10, regels=regels),
+        "top10_meeste_co2":   rank_ruimte(ruimte, kolommen, "co2_total",  reverse=True,  top_n=10, regels=regels),
+        "top10_minste_co2":   rank_ruimte(ruimte, kolommen, "co2_total",  reverse=False, top_n=10, regels=regels),
+        "top10_optimaal":     rank_ruimte(ruimte, kolommen, optimaal,     reverse=False, top_n=10, regels=regels),
+    }
 
 
 def main():
@@ -56,49 +67,97 @@ def main():
     parser.add_argument("--gebouw",   default=None,                                 help="Gebouw ID")
     parser.add_argument("--results",  default=None,                                 help="Pad naar results_gebouw_xxx.jsonl")
     parser.add_argument("--out",      default=None,                                 help="Output pad")
+    parser.add_argument("--direct",   action="store_true",                          help="Rank direct uit de scenarioruimte")
+    parser.add_argument("--analytisch", action="store_true",                        help="Min/max voor optimaal_score uit de scenarioruimte i.p.v. een extra pass")
+    parser.add_argument("--add-none", action="store_true",                          help="Scenarioruimte met NONE-optie (met --direct)")
+    parser.add_argument("--materials",  default="data/brondata/materials.jsonl",    help="Pad naar materials.jsonl (met --direct)")
+    parser.add_argument("--onderdelen", default="data/brondata/onderdelen.jsonl",   help="Pad naar onderdelen.jsonl (met --direct)")
+    parser.add_argument("--gebouwdata", default="data/gebouwdata/gebouwgegevens.json", help="Pad naar gebouwgegevens.json (met --direct)")
+    parser.add_argument("--constraints", default="data/brondata/constraints.jsonl", help="Pad naar constraints.jsonl (met --direct/--analytisch)")
+    parser.add_argument("--geen-constraints", action="store_true",                  help="Constraints niet toepassen (met --direct/--analytisch)")
+    parser.add_argument("--metrics",  action="store_true",                          help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",  choices=PROFIELEN, default=None,              help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
     args = parser.parse_args()
 
+    draai_met_metrics(genereer, args, "gen_ranks")
+
+
+def genereer(args):
+    """Rankt de results; geeft (pad van ranks_<gebouw>.json, extra velden) of None."""
+
     root = Path(__file__).resolve().parents[1]
 
+    def laad_ruimte():
+        gebouw = read_gebouw(root / args.gebouwdata, args.gebouw)
+        ruimte = ScenarioRuimte.van_gebouw(
+            gebouw,
+            read_jsonl(root / args.materials),
+            load_onderdeel_map(read_jsonl(root / args.onderdelen)),
+            add_none=args.add_none,
+        )
+        print(f"Scenarioruimte: {ruimte.totaal:,} scenario's over {len(ruimte.assen)} onderdelen")
+        regels = None
+        if not args.geen_constraints:
+            regels = RegelSet(load_constraints(root / args.constraints), ruimte)
+            for r in regels.rapport():
+                print(f"  Constraint {r['constraint_id']}: {r['status']}, gesnoeid: {r['gesnoeid']:,}")
+        return gebouw, ruimte, regels, ruimte.bijdragen(read_materiaal_tabel(root / args.materials), gebouw)
+
+    if args.direct:
+        gebouw, ruimte, regels, kolommen = laad_ruimte()
+        gebouw_id = gebouw.get("gebouw_id", "onbekend")
+        out_path  = root / (args.out or f"data/output/ranks_{gebouw_id}.json")
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+        totaal = regels.aantal_geldig() if regels is not None else ruimte.totaal
+        output = {"gebouw_id": gebouw_id, "totaal_scenarios": totaal}
+        output.update(top10_direct(ruimte, kolommen, extremen_ruimte(kolommen, ruimte, regels), regels))
+
+        out_path.write_text(json.dumps(output, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nOK -> {out_path}")
+        return out_path, {"gebouw_id": gebouw_id, "scenarios": totaal, "direct": True}
+
     # Bepaal input pad
     if args.results:
         results_path = root / args.results
-    elif args.gebouw:
-        results_path = root / f"data/output/results_{args.gebouw}.jsonl"
     else:
-        # Zoek automatisch het eerste results bestand
-        matches = list((root / "data/output").glob("results_gebouw_*.jsonl"))
-        if not matches:
+        # Zoek automatisch het results bestand (kolommen gaan voor JSONL)
+        results_path = find_results(root / "data/output", args.gebouw)
+        if results_path is None:
             print("ERROR: geen results bestand gevonden in data/output/")
             return
-        results_path = matches[0]
 
-    gebouw_id = results_path.stem.replace("results_", "")
+    gebouw_id = results_path.name.split(".")[0].replace("results_", "")
 
     out_path = root / (args.out or f"data/output/ranks_{gebouw_id}.json")
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    print(f"Laden resultaten: {results_path.name}")
-    results = load_results(results_path)
-    print(f"  {len(results):,} scenario's geladen")
+    grenzen = None
+    if args.analytisch:
+        _, ruimte, regels, kolommen = laad_ruimte()
+        grenzen = extremen_ruimte(kolommen, ruimte, regels)
 
     print("Berekenen scores en rankings...")
-    results = bereken_optimaal_score(results)
+    with stap("gen_ranks.ranking"):
+        if results_path.is_dir():
+            print(f"Kolommen: {results_path.name}")
+            kol, meta = read_kolommen(results_path)
+            tops, grenzen, aantal = rank_kolommen(kol, meta.get("gebouw_id"), top_n=10, grenzen=grenzen)
+        else:
+            print(f"Streaming resultaten: {results_path.name}")
+            tops, grenzen, aantal = rank_stroom(lambda: read_jsonl(results_path), top_n=10, grenzen=grenzen)
+    METRICS.tel("gen_ranks.ranking", aantal)
 
     output = {
         "gebouw_id":          gebouw_id,
-        "totaal_scenarios":   len(results),
-        "top10_duurste":      top10(results, "cost_total",     reverse=True),
-        "top10_goedkoopste":  top10(results, "cost_total",     reverse=False),
-        "top10_meeste_co2":   top10(results, "co2_total",      reverse=True),
-        "top10_minste_co2":   top10(results, "co2_total",      reverse=False),
-        "top10_optimaal":     top10(results, "optimaal_score", reverse=False),
+        "totaal_scenarios":   aantal,
     }
+    output.update(top10(tops))
 
     out_path.write_text(json.dumps(output, indent=2, ensure_ascii=False), encoding="utf-8")
 
     print(f"\nOK -> {out_path}")
-    print(f"Totaal scenario's: {len(results):,}")
+    print(f"Totaal scenario's: {aantal:,}")
     print(f"\n--- TOP 3 GOEDKOOPSTE ---")
     for i, s in enumerate(output["top10_goedkoopste"][:3], 1):
         print(f"  #{i}  €{s['cost_total']:>12,.2f}  |  CO2: {s['co2_total']:>12,.2f}")
@@ -108,6 +167,7 @@ def main():
     print(f"\n--- TOP 3 OPTIMAAL ---")
     for i, s in enumerate(output["top10_optimaal"][:3], 1):
         print(f"  #{i}  €{s['cost_total']:>12,.2f}  |  CO2: {s['co2_total']:>12,.2f}")
+    return out_path, {"gebouw_id": gebouw_id, "scenarios": aantal}
 
 
 if __name__ == "__main__":
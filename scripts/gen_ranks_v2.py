@@ -5,15 +5,40 @@
 # Genereert top 100 rankings inclusief materiaalkeuzes + duurzaamheidsscore.
 # Output wordt gebruikt door streamlit_app.py
 #
+# Met --direct wordt er geen results-bestand gelezen: de rankings komen exact
+# uit de scenarioruimte via best-first zoeken (engine/ranking.py), zodat ook
+# ruimtes die te groot zijn om te enumereren gerankt kunnen worden.
+#
 # Gebruik:
 #   python scripts/gen_ranks_v2.py
 #   python scripts/gen_ranks_v2.py --gebouw gebouw_002 --top 100
+#   python scripts/gen_ranks_v2.py --direct --add-none
+#   python scripts/gen_ranks_v2.py --analytisch
+#
+# Met --direct/--analytisch worden de constraints uit constraints.jsonl op de
+# scenarioruimte toegepast, net als in gen_results.py (--geen-constraints
+# schakelt ze uit).
+#
+# Zonder --direct wordt het results-bestand gestreamd: pass 1 bepaalt min/max
+# voor de optimaal_score (of --analytisch: uit de per-as extremen van de
+# scenarioruimte), pass 2 scoort en rankt met begrensde heaps.
 #
 
 import argparse
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.constraints import RegelSet, load_constraints
+from engine.loader    import (find_results, find_scenarios, read_jsonl, read_kolommen, scenarios_gebouw_id,
+                              zoek_scenarios)
+from engine.materiaaltabel import read_materiaal_tabel
+from engine.ranking   import extremen_ruimte, optimaal_score, rank_kolommen, rank_ruimte, rank_stroom
+from engine.metrics   import PROFIELEN, draai_met_metrics
+from engine.scenarios import ScenarioRuimte, load_onderdeel_map
+
 PANEEL_M2_PER_STUK = 1.7
 
 VELD_MAP = {
@@ -54,18 +79,6 @@ def load_gebouw(path: Path, gebouw_id=None) -> dict:
     return data
 
 
-def bereken_optimaal_score(results: list) -> list:
-    prijzen = [r["cost_total"] for r in results]
-    co2s    = [r["co2_total"]  for r in results]
-    p_min, p_max = min(prijzen), max(prijzen)
-    c_min, c_max = min(co2s),    max(co2s)
-    for r in results:
-        p_norm = (r["cost_total"] - p_min) / (p_max - p_min) if p_max != p_min else 0
-        c_norm = (r["co2_total"]  - c_min) / (c_max - c_min) if c_max != c_min else 0
-        r["optimaal_score"] = round((p_norm + c_norm) / 2, 6)
-    return results
-
-
 def verrijk(scenario: dict, keuzes: dict, mat_lookup: dict, ond_lookup: dict, afm: dict) -> dict:
     materialen = []
     for oid, mid in keuzes.items():
@@ -103,52 +116,113 @@ def verrijk(scenario: dict, keuzes: dict, mat_lookup: dict, ond_lookup: dict, af
     return scenario
 
 
-def rank(results: list, key: str, reverse: bool, top_n: int) -> list:
-    return sorted(results, key=lambda r: r[key], reverse=reverse)[:top_n]
-
-
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--gebouw",     default=None)
     parser.add_argument("--results",    default=None)
-    parser.add_argument("--scenarios",  default="data/output/scenarios.jsonl")
+    parser.add_argument("--scenarios",  default=None, help="Scenariobestand (.scen of .jsonl; default: data/output/scenarios.*)")
     parser.add_argument("--materials",  default="data/brondata/materials.jsonl")
     parser.add_argument("--onderdelen", default="data/brondata/onderdelen.jsonl")
     parser.add_argument("--gebouwdata", default="data/gebouwdata/gebouwgegevens.json")
+    parser.add_argument("--constraints", default="data/brondata/constraints.jsonl", help="Pad naar constraints.jsonl (met --direct/--analytisch)")
+    parser.add_argument("--geen-constraints", action="store_true", help="Constraints niet toepassen (met --direct/--analytisch)")
     parser.add_argument("--out",        default=None)
     parser.add_argument("--top",        type=int, default=100)
+    parser.add_argument("--add-none",   action="store_true", help="Scenarioruimte met NONE-optie (zonder scenarios.jsonl)")
+    parser.add_argument("--direct",     action="store_true", help="Rank direct uit de scenarioruimte, zonder results-bestand")
+    parser.add_argument("--analytisch", action="store_true", help="Min/max voor optimaal_score uit de scenarioruimte i.p.v. een extra pass")
+    parser.add_argument("--metrics",    action="store_true", help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",    choices=PROFIELEN, default=None, help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
     args = parser.parse_args()
 
+    draai_met_metrics(genereer, args, "gen_ranks_v2")
+
+
+def genereer(args):
+    """Rankt en verrijkt met materiaalkeuzes; geeft (outputpad, extra velden) of None."""
+
     root = Path(__file__).resolve().parents[1]
 
-    if args.results:
+    ruimte = None
+    regels = None
+    meta   = {}
+    if args.direct or args.analytisch:
+        gebouw    = load_gebouw(root / args.gebouwdata, args.gebouw)
+        ruimte    = ScenarioRuimte.van_gebouw(
+            gebouw,
+            load_jsonl(root / args.materials),
+            load_onderdeel_map(load_jsonl(root / args.onderdelen)),
+            add_none=args.add_none,
+        )
+        print(f"Scenarioruimte: {ruimte.totaal:,} scenario's over {len(ruimte.assen)} onderdelen")
+        if not args.geen_constraints:
+            regels = RegelSet(load_constraints(root / args.constraints), ruimte)
+            for r in regels.rapport():
+                print(f"  Constraint {r['constraint_id']}: {r['status']}, gesnoeid: {r['gesnoeid']:,}")
+        kolommen = ruimte.bijdragen(read_materiaal_tabel(root / args.materials), gebouw)
+        extremen = extremen_ruimte(kolommen, ruimte, regels)
+
+    if args.direct:
+        gebouw_id = gebouw.get("gebouw_id", "onbekend")
+    elif args.results:
         results_path = root / args.results
-    elif args.gebouw:
-        results_path = root / f"data/output/results_{args.gebouw}.jsonl"
     else:
-        matches = sorted((root / "data/output").glob("results_gebouw_*.jsonl"))
-        if not matches:
+        results_path = find_results(root / "data/output", args.gebouw)
+        if results_path is None:
             print("ERROR: geen results bestand gevonden.")
             return
-        results_path = matches[0]
 
-    gebouw_id = results_path.stem.replace("results_", "")
+    if not args.direct:
+        gebouw_id = results_path.name.split(".")[0].replace("results_", "")
     out_path  = root / (args.out or f"data/output/ranks_v2_{gebouw_id}.json")
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    print(f"Laden resultaten...")
-    results = load_jsonl(results_path)
-    print(f"  {len(results):,} scenario's geladen")
-
-    print(f"Berekenen scores...")
-    results = bereken_optimaal_score(results)
-
-    print(f"Bepalen top {args.top} per ranking...")
-    top_goedkoopste = rank(results, "cost_total",     reverse=False, top_n=args.top)
-    top_duurste     = rank(results, "cost_total",     reverse=True,  top_n=args.top)
-    top_minste_co2  = rank(results, "co2_total",      reverse=False, top_n=args.top)
-    top_meeste_co2  = rank(results, "co2_total",      reverse=True,  top_n=args.top)
-    top_optimaal    = rank(results, "optimaal_score", reverse=False, top_n=args.top)
+    if args.direct:
+        totaal   = regels.aantal_geldig() if regels is not None else ruimte.totaal
+        prijs_min, prijs_max = extremen["cost_total"]
+        co2_min,   co2_max   = extremen["co2_total"]
+
+        # optimaal_score is lineair in prijs en CO2, dus ook separabel
+        p_range = (prijs_max - prijs_min) or 1
+        c_range = (co2_max   - co2_min)   or 1
+        optimaal = {"cost_total": 1 / p_range, "co2_total": 1 / c_range}
+
+        print(f"Bepalen top {args.top} per ranking (best-first)...")
+        top_goedkoopste = rank_ruimte(ruimte, kolommen, "cost_total", reverse=False, top_n=args.top, regels=regels)
+        top_duurste     = rank_ruimte(ruimte, kolommen, "cost_total", reverse=True,  top_n=args.top, regels=regels)
+        top_minste_co2  = rank_ruimte(ruimte, kolommen, "co2_total",  reverse=False, top_n=args.top, regels=regels)
+        top_meeste_co2  = rank_ruimte(ruimte, kolommen, "co2_total",  reverse=True,  top_n=args.top, regels=regels)
+        top_optimaal    = rank_ruimte(ruimte, kolommen, optimaal,     reverse=False, top_n=args.top, regels=regels)
+
+        for lst in [top_goedkoopste, top_duurste, top_minste_co2, top_meeste_co2, top_optimaal]:
+            for r in lst:
+                r["optimaal_score"] = optimaal_score(r, extremen)
+    else:
+        print(f"Berekenen scores en top {args.top} per ranking...")
+        if results_path.is_dir():
+            print(f"Kolommen: {results_path.name}")
+            kol, meta = read_kolommen(results_path)
+            tops, grenzen, totaal = rank_kolommen(
+                kol, meta.get("gebouw_id"),
+                top_n=args.top,
+                grenzen=extremen if args.analytisch else None,
+            )
+        else:
+            print(f"Streaming resultaten: {results_path.name}")
+            tops, grenzen, totaal = rank_stroom(
+                lambda: read_jsonl(results_path),
+                top_n=args.top,
+                grenzen=extremen if args.analytisch else None,
+            )
+        print(f"  {totaal:,} scenario's verwerkt")
+        top_goedkoopste = tops["goedkoopste"]
+        top_duurste     = tops["duurste"]
+        top_minste_co2  = tops["minste_co2"]
+        top_meeste_co2  = tops["meeste_co2"]
+        top_optimaal    = tops["optimaal"]
+
+        prijs_min, prijs_max = grenzen["cost_total"]
+        co2_min,   co2_max   = grenzen["co2_total"]
 
     alle_ids = set()
     for lst in [top_goedkoopste, top_duurste, top_minste_co2, top_meeste_co2, top_optimaal]:
@@ -157,17 +231,39 @@ def main():
 
     print(f"Laden keuzes voor {len(alle_ids)} unieke scenario's...")
     keuzes_map = {}
-    with (root / args.scenarios).open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            s = json.loads(line)
-            if s["scenario_id"] in alle_ids:
-                keuzes_map[s["scenario_id"]] = s["keuzes"]
+    scenarios_path = root / args.scenarios if args.scenarios else find_scenarios(root / "data/output")
+    export_gebouw  = scenarios_gebouw_id(scenarios_path) if scenarios_path is not None and scenarios_path.exists() else None
+    if meta.get("assen"):
+        # Keuzes decoderen met de assen waarmee de results zijn berekend
+        if "add_none" in meta and meta["add_none"] != args.add_none:
+            print(f"ERROR: results berekend met add_none={meta['add_none']}, maar --add-none={args.add_none}.")
+            return
+        ruimte     = ScenarioRuimte(meta["assen"], gebouw_id)
+        keuzes_map = {sid: ruimte.keuzes(sid) for sid in alle_ids}
+    elif args.direct:
+        keuzes_map = {sid: ruimte.keuzes(sid) for sid in alle_ids}
+    elif export_gebouw == str(gebouw_id):
+        # Random access (offset-index / binair zoeken), geen scan over het hele bestand
+        keuzes_map = {sid: s["keuzes"] for sid, s in zoek_scenarios(scenarios_path, alle_ids).items()}
+    else:
+        # Geen meta (JSONL) en geen export van dit gebouw: scenarioruimte opnieuw opbouwen met --add-none
+        if export_gebouw is not None:
+            print(f"  {scenarios_path.name} hoort bij {export_gebouw}, niet bij {gebouw_id}; niet gebruikt")
+        if ruimte is None:
+            ruimte = ScenarioRuimte.van_gebouw(
+                load_gebouw(root / args.gebouwdata, args.gebouw),
+                load_jsonl(root / args.materials),
+                load_onderdeel_map(load_jsonl(root / args.onderdelen)),
+                add_none=args.add_none,
+            )
+        if max(alle_ids, default=0) > ruimte.totaal:
+            print(f"ERROR: scenario_id buiten de scenarioruimte ({ruimte.totaal:,}); klopt --add-none?")
+            return
+        print(f"  WAARSCHUWING: geen results-meta, keuzes gedecodeerd met --add-none={args.add_none}")
+        keuzes_map = {sid: ruimte.keuzes(sid) for sid in alle_ids}
 
     print(f"Laden materialen en onderdelen...")
-    mat_lookup = {m["material_id"]: m for m in load_jsonl(root / args.materials)}
+    mat_lookup = read_materiaal_tabel(root / args.materials)
     ond_lookup = {o["onderdeel_id"]: o["categorie"] for o in load_jsonl(root / args.onderdelen)}
     gebouw     = load_gebouw(root / args.gebouwdata, args.gebouw)
     afm        = gebouw.get("afmetingen", {})
@@ -178,12 +274,12 @@ def main():
 
     output = {
         "gebouw_id":        gebouw_id,
-        "totaal_scenarios": len(results),
+        "totaal_scenarios": totaal,
         "top_n":            args.top,
-        "prijs_min":        min(r["cost_total"] for r in results),
-        "prijs_max":        max(r["cost_total"] for r in results),
-        "co2_min":          min(r["co2_total"]  for r in results),
-        "co2_max":          max(r["co2_total"]  for r in results),
+        "prijs_min":        prijs_min,
+        "prijs_max":        prijs_max,
+        "co2_min":          co2_min,
+        "co2_max":          co2_max,
         "top_goedkoopste":  verrijk_lijst(top_goedkoopste),
         "top_duurste":      verrijk_lijst(top_duurste),
         "top_minste_co2":   verrijk_lijst(top_minste_co2),
@@ -194,9 +290,10 @@ def main():
     out_path.write_text(json.dumps(output, indent=2, ensure_ascii=False), encoding="utf-8")
 
     print(f"\nOK -> {out_path}")
-    print(f"Totaal scenario's: {len(results):,}")
+    print(f"Totaal scenario's: {totaal:,}")
     print(f"Prijs range: €{output['prijs_min']:,.2f} - €{output['prijs_max']:,.2f}")
     print(f"CO2 range:   {output['co2_min']:,.2f} - {output['co2_max']:,.2f}")
+    return out_path, {"gebouw_id": gebouw_id, "scenarios": totaal, "top_n": args.top}
 
 
 if __name__ == "__main__":
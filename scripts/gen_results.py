@@ -2,75 +2,445 @@
 #
 # gen_results.py
 #
-# Berekent prijs + CO2 per scenario en schrijft naar JSONL.
+# Berekent prijs + CO2 per scenario en schrijft naar JSONL en/of kolommen.
+# Standaard wordt de scenarioruimte direct uit gebouw + materialen opgebouwd
+# (engine/scenarios.py); een scenariobestand (scenarios.scen of .jsonl) is
+# alleen nodig met --scenarios.
+#
+# Formaten (--formaat):
+#   jsonl     results_<gebouw>.jsonl, één record per regel
+#   kolommen  results_<gebouw>.kolommen/, getypeerde binaire kolommen (memmap)
+#   beide     allebei
 #
 # Gebruik:
 #   python scripts/gen_results.py
 #   python scripts/gen_results.py --gebouw gebouw_002
+#   python scripts/gen_results.py --add-none --max-scenarios 1000000
+#   python scripts/gen_results.py --scenarios data/output/scenarios.scen
+#   python scripts/gen_results.py --scenarios data/output/scenarios.jsonl
+#   python scripts/gen_results.py --formaat kolommen --keuzes
+#   python scripts/gen_results.py --compressie gzip
+#   python scripts/gen_results.py --workers 32
+#   python scripts/gen_results.py --add-none --geen-constraints
+#
+# Constraints uit data/brondata/constraints.jsonl worden op de scenarioruimte
+# toegepast (engine/constraints.py); ongeldige scenario's worden niet berekend.
+#
+# Met --incrementeel --formaat kolommen worden bestaande kolommen bijgewerkt:
+# alleen scenario's met een gewijzigde optie (prijs, CO2 of afmeting) worden
+# herberekend, daarna worden de rankings ververst (engine/incrementeel.py). Een
+# bestaande pareto_<gebouw>.json wordt opnieuw bepaald; ranks_v2_<gebouw>.json
+# krijgt een "verouderd"-veld tot gen_ranks_v2.py opnieuw draait.
+#   python scripts/gen_results.py --formaat kolommen --incrementeel
+#
+# Met --workers > 1 wordt de ruimte (of het scenariobestand per byte-/rijbereik) in
+# shards verdeeld over een process pool; de deelbestanden worden op volgorde
+# samengevoegd, dus de records zijn gelijk aan een seriële run. Met --compressie
+# bestaat het .gz/.zst-bestand dan uit één member/frame per shard achter elkaar;
+# gzip -d, zcat, zstd -d en read_jsonl lezen dat als één stroom, maar de bytes
+# wijken af van een seriële run (gebruik --workers 1 voor een enkele stroom).
 #
 
 import argparse
+import itertools
 import json
+import os
+import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from engine.loader     import read_jsonl, read_materials_lookup, read_gebouw
-from engine.calculator import bereken_totaal_prijs, bereken_totaal_co2
+from engine.loader     import read_jsonl, read_jsonl_bereik, byte_bereiken, read_gebouw, read_kolommen, kolommen_pad
+from engine.loader     import is_compact, read_scenario_ids, read_scenarios_header, scenario_bereiken
+from engine.materiaaltabel import read_materiaal_tabel
+from engine.calculator import bepaal_factor_vector, codeer_keuzes, bereken_batch
+from engine.scenarios  import ScenarioRuimte, load_onderdeel_map
+from engine.constraints import RegelSet, load_constraints
+from engine.writer     import JsonlWriter, KolomWriter, voeg_jsonl_samen, voeg_kolommen_samen, write_summary
+from engine.ranking    import rank_kolommen, ranks_document
+from engine.pareto     import pareto_front_punten
+from engine.incrementeel import bepaal_wijzigingen, inhoud_hash, vingerafdruk, werk_kolommen_bij
+from engine.metrics    import METRICS, PROFIELEN, draai_met_metrics, stap
+
+BLOK_GROOTTE = 250_000
+
+# Read-only context per worker-proces (gezet door _init_worker)
+_CONTEXT: Dict[str, Any] = {}
+
+
+def schrijf_blok(writer, gebouw_id, scenario_ids, prijs, co2):
+    for sid, p, c in zip(scenario_ids.tolist(), prijs.tolist(), co2.tolist()):
+        writer.schrijf({
+            "gebouw_id":   gebouw_id,
+            "scenario_id": sid,
+            "cost_total":  p,
+            "co2_total":   c,
+        })
+
+
+def bereken_uit_ruimte(ruimte, gebouw, materiaal_index, prijzen, co2s, max_scenarios=None, bereik=None, regels=None):
+    """
+    Rekent direct op de impliciete scenarioruimte (geen scenarios.jsonl nodig).
+    Met regels (RegelSet) worden alleen geldige scenario's doorgerekend.
+    Geeft per blok (scenario_ids, prijs, co2, optie-indices).
+    """
+    bron = regels if regels is not None else ruimte
+    yield from bereken_ids(ruimte, bron.id_blokken(BLOK_GROOTTE, max_scenarios, bereik), gebouw, materiaal_index, prijzen, co2s)
+
+
+def bereken_uit_compact(path, gebouw, materiaal_index, prijzen, co2s, bereik=None):
+    """Rekent op een compact scenariobestand (.scen); de assen staan in de header, dus ook met optie-indices."""
+    header, _ = read_scenarios_header(path)
+    ruimte    = ScenarioRuimte(header["assen"], header.get("gebouw_id"))
+    yield from bereken_ids(ruimte, read_scenario_ids(path, BLOK_GROOTTE, bereik), gebouw, materiaal_index, prijzen, co2s)
+
+
+def bereken_ids(ruimte, id_blokken, gebouw, materiaal_index, prijzen, co2s):
+    """Geeft per blok scenario_ids (scenario_ids, prijs, co2, optie-indices)."""
+    factoren = bepaal_factor_vector(ruimte.onderdeel_ids, gebouw)
+    for ids in id_blokken:
+        opties     = ruimte.index_ids(ids)
+        matrix     = ruimte.vertaal(opties.copy(), materiaal_index)
+        prijs, co2 = bereken_batch(matrix, factoren, prijzen, co2s)
+        yield ids, prijs, co2, opties
+
+
+def bereken_uit_bestand(scenarios, gebouw, materiaal_index, prijzen, co2s):
+    """Rekent op scenario-records uit een scenarios.jsonl export (zonder optie-indices)."""
+    onderdeel_ids = None
+    factoren      = None
+    scenarios     = iter(scenarios)
+
+    while True:
+        blok = list(itertools.islice(scenarios, BLOK_GROOTTE))
+        if not blok:
+            break
+
+        # Kolomvolgorde + factoren eenmalig bepalen op basis van het eerste scenario
+        if onderdeel_ids is None:
+            onderdeel_ids = list(blok[0]["keuzes"].keys())
+            factoren      = bepaal_factor_vector(onderdeel_ids, gebouw)
+
+        matrix     = codeer_keuzes((s["keuzes"] for s in blok), onderdeel_ids, materiaal_index)
+        prijs, co2 = bereken_batch(matrix, factoren, prijzen, co2s)
+        yield np.array([s["scenario_id"] for s in blok], dtype=np.int64), prijs, co2, None
+
+
+def schrijf_alles(blokken, gebouw_id, jsonl_w, kol_w, keuzes, toon=True):
+    """Schrijft alle blokken naar de actieve writers; geeft het aantal scenario's."""
+    count = 0
+    t0    = time.perf_counter()
+    for ids, prijs, co2, opties in blokken:
+        if jsonl_w:
+            with stap("gen_results.jsonl"):
+                schrijf_blok(jsonl_w, gebouw_id, ids, prijs, co2)
+        if kol_w:
+            blok = {"scenario_id": ids, "cost_total": prijs, "co2_total": co2}
+            if keuzes:
+                blok["keuzes"] = opties
+            kol_w.schrijf(**blok)
+
+        count += len(ids)
+        if toon:
+            print(f"  Verwerkt: {count:,} ({count / (time.perf_counter() - t0):,.0f}/s)")
+    return count
+
+
+def reken_shard(ctx, bereik, jsonl_pad, kol_pad, toon=True):
+    """
+    Rekent één shard (scenario_id-bereik, byte-bereik van scenarios.jsonl of
+    rijbereik van een compact .scen-bestand, None = alles)
+    en schrijft die naar jsonl_pad en/of kol_pad. Geeft het aantal scenario's.
+    """
+    args = (ctx["gebouw"], ctx["materiaal_index"], ctx["prijzen"], ctx["co2s"])
+    if ctx["ruimte"] is not None:
+        blokken = bereken_uit_ruimte(ctx["ruimte"], *args, ctx["max_scenarios"], bereik, ctx["regels"])
+    elif ctx["compact"]:
+        blokken = bereken_uit_compact(ctx["scenarios"], *args, bereik)
+    elif bereik is None:
+        blokken = bereken_uit_bestand(read_jsonl(ctx["scenarios"]), *args)
+    else:
+        blokken = bereken_uit_bestand(read_jsonl_bereik(ctx["scenarios"], *bereik), *args)
+
+    jsonl_w = JsonlWriter(jsonl_pad, ctx["compressie"]) if jsonl_pad else None
+    kol_w   = KolomWriter(kol_pad, ctx["kolommen"], ctx["meta"]) if kol_pad else None
+    try:
+        count = schrijf_alles(blokken, ctx["gebouw_id"], jsonl_w, kol_w, ctx["keuzes"], toon)
+    except BaseException:
+        for w in (jsonl_w, kol_w):
+            if w:
+                w.afbreken()
+        raise
+
+    for w in (jsonl_w, kol_w):
+        if w:
+            w.sluit()
+    return count
+
+
+def _init_worker(ctx):
+    _CONTEXT.update(ctx)
+
+
+def _reken_deel(taak):
+    """Rekent één shard in een worker; geeft (aantal, metrics van deze shard)."""
+    bereik, jsonl_pad, kol_pad = taak
+    METRICS.reset()
+    count = reken_shard(_CONTEXT, bereik, jsonl_pad, kol_pad, toon=False)
+    return count, METRICS.export()
+
+
+def reken_parallel(ctx, bereiken, jsonl_pad, kol_pad, workers):
+    """
+    Verdeelt de bereiken over een process pool. Elke shard schrijft eigen
+    deelbestanden in een tijdelijke map; daarna worden ze op volgorde
+    samengevoegd, zodat de output gelijk is aan die van een seriële run.
+    """
+    basis   = jsonl_pad or kol_pad
+    delen   = basis.with_name(basis.name.split(".")[0] + ".delen")
+    shutil.rmtree(delen, ignore_errors=True)
+    delen.mkdir(parents=True)
+
+    taken = [
+        (bereik,
+         delen / f"deel_{nr:04d}.jsonl" if jsonl_pad else None,
+         delen / f"deel_{nr:04d}.kolommen" if kol_pad else None)
+        for nr, bereik in enumerate(bereiken)
+    ]
+
+    count = 0
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(ctx,)) as pool:
+            for nr, (n, metrics) in enumerate(pool.map(_reken_deel, taken), 1):
+                count += n
+                METRICS.voeg_samen(metrics)
+                print(f"  Shard {nr}/{len(taken)} klaar, verwerkt: {count:,}")
+
+        print("Samenvoegen...")
+        with stap("gen_results.samenvoegen"):
+            if jsonl_pad:
+                voeg_jsonl_samen([t[1] for t in taken], jsonl_pad)
+            if kol_pad:
+                voeg_kolommen_samen([t[2] for t in taken], kol_pad)
+    finally:
+        shutil.rmtree(delen, ignore_errors=True)
+    return count
+
+
+def werk_incrementeel_bij(ctx, kol_pad, bijdragen, ranks_pad):
+    """
+    Werkt bestaande kolommen in-place bij op basis van de vingerafdruk in
+    meta.json en ververst de rankings. Geeft False als een volledige
+    herberekening nodig is (geen vingerafdruk, andere assen/constraints/limiet).
+    """
+    if not (kol_pad / "meta.json").exists():
+        return False
+    kol, meta = read_kolommen(kol_pad, modus="r+")
+    for sleutel in ("max_scenarios", "constraints", "constraints_hash"):
+        if meta.get(sleutel) != ctx["meta"].get(sleutel):
+            return False
+
+    wijzigingen = bepaal_wijzigingen(meta, ctx["ruimte"], ctx["meta"]["vingerafdruk"])
+    if wijzigingen is None:
+        return False
+
+    print(f"Incrementeel: {kol_pad.name}")
+    print(f"  Gewijzigde materialen: {', '.join(wijzigingen['materials']) or '-'}")
+    print(f"  Gewijzigde gebouwvelden: {', '.join(wijzigingen['gebouw']) or '-'}")
+    for a, masker in wijzigingen["opties"].items():
+        print(f"  Onderdeel {ctx['ruimte'].onderdeel_ids[a]}: {int(masker.sum())} van {len(masker)} opties gewijzigd")
+
+    bijgewerkt = werk_kolommen_bij(kol, ctx["ruimte"], bijdragen, wijzigingen["opties"])
+    meta.update(ctx["meta"])
+    write_summary(kol_pad / "meta.json", meta)
+    print(f"  Bijgewerkt: {bijgewerkt:,} van {meta['rijen']:,} rijen")
+
+    tops, _, aantal = rank_kolommen(kol, ctx["gebouw_id"], top_n=10)
+    write_summary(ranks_pad, ranks_document(ctx["gebouw_id"], aantal, tops, top_n=10))
+    print(f"\nOK -> {kol_pad}")
+    print(f"OK -> {ranks_pad}")
+    ververs_afgeleiden(kol, ctx["gebouw_id"], ranks_pad.parent, kol_pad.name)
+    return True
+
+
+def ververs_afgeleiden(kol, gebouw_id, out_dir: Path, bron: str):
+    """
+    Na een incrementele update: pareto_<gebouw>.json opnieuw uit de kolommen,
+    ranks_v2_<gebouw>.json (verrijkt, dus niet goedkoop na te rekenen) gemarkeerd
+    als verouderd tot gen_ranks_v2.py opnieuw draait.
+    """
+    pareto_pad = out_dir / f"pareto_{gebouw_id}.json"
+    if pareto_pad.exists():
+        write_summary(pareto_pad, {
+            "gebouw_id":        gebouw_id,
+            "totaal_scenarios": len(kol["scenario_id"]),
+            "bron":             "results",
+            "front":            pareto_front_punten(kol["cost_total"], kol["co2_total"], kol["scenario_id"]),
+        })
+        print(f"OK -> {pareto_pad}")
+
+    v2_pad = out_dir / f"ranks_v2_{gebouw_id}.json"
+    if v2_pad.exists():
+        document = json.loads(v2_pad.read_text(encoding="utf-8"))
+        document["verouderd"] = {"reden": "incrementele update", "bron": bron}
+        write_summary(v2_pad, document)
+        print(f"  WAARSCHUWING: {v2_pad.name} gemarkeerd als verouderd; draai gen_ranks_v2.py opnieuw")
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--gebouw",      default=None,                                  help="Gebouw ID")
-    parser.add_argument("--scenarios",   default="data/output/scenarios.jsonl",          help="Pad naar scenarios.jsonl")
+    parser.add_argument("--scenarios",   default=None,                                   help="Pad naar scenarios.scen/.jsonl (default: impliciete scenarioruimte)")
     parser.add_argument("--materials",   default="data/brondata/materials.jsonl",        help="Pad naar materials.jsonl")
+    parser.add_argument("--onderdelen",  default="data/brondata/onderdelen.jsonl",       help="Pad naar onderdelen.jsonl")
     parser.add_argument("--gebouwdata",  default="data/gebouwdata/gebouwgegevens.json",  help="Pad naar gebouwgegevens.json")
     parser.add_argument("--out",         default=None,                                   help="Output pad (default: data/output/results_gebouw_<id>.jsonl)")
+    parser.add_argument("--max-scenarios", type=int, default=None,                       help="Maximaal aantal (geldige) scenario's; de eerste N in scenario_id-volgorde")
+    parser.add_argument("--add-none",    action="store_true",                            help="Voeg NONE-optie toe per onderdeel")
+    parser.add_argument("--formaat",     choices=["jsonl", "kolommen", "beide"], default="jsonl", help="Outputformaat")
+    parser.add_argument("--keuzes",      action="store_true",                            help="Sla optie-indices per onderdeel op in de kolommen")
+    parser.add_argument("--compressie",  choices=["gzip", "zstd"], default=None,         help="Comprimeer de JSONL-output (.gz / .zst)")
+    parser.add_argument("--constraints", default="data/brondata/constraints.jsonl",     help="Pad naar constraints.jsonl (alleen zonder --scenarios)")
+    parser.add_argument("--geen-constraints", action="store_true",                      help="Constraints niet toepassen")
+    parser.add_argument("--incrementeel", action="store_true",                          help="Werk bestaande kolommen bij voor gewijzigde materialen/afmetingen")
+    parser.add_argument("--workers",     type=int, default=1,                            help="Aantal processen (0 = alle cores)")
+    parser.add_argument("--metrics",     action="store_true",                            help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",     choices=PROFIELEN, default=None,                help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
     args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers moet 0 (alle cores) of groter zijn")
 
+    draai_met_metrics(genereer, args, "gen_results")
+
+
+def genereer(args):
+    """Berekent prijs + CO2 per scenario; geeft (outputpad, extra velden) of None."""
     root = ROOT
 
     gebouw = read_gebouw(root / args.gebouwdata, args.gebouw)
     if not gebouw:
         print("ERROR: gebouw niet gevonden.")
-        return
+        return None
 
     gebouw_id = gebouw.get("gebouw_id", "onbekend")
     out_path  = root / (args.out or f"data/output/results_{gebouw_id}.jsonl")
+    if args.compressie and not args.out:
+        out_path = out_path.with_name(out_path.name + {"gzip": ".gz", "zstd": ".zst"}[args.compressie])
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     print(f"Gebouw:    {gebouw_id}")
     print(f"Laden materialen...")
-    material_lookup = read_materials_lookup(root / args.materials)
-    print(f"  {len(material_lookup)} materialen geladen")
+    with stap("gen_results.laden"):
+        tabel = read_materiaal_tabel(root / args.materials)
+        materiaal_index, prijzen, co2s = tabel.arrays()
+    print(f"  {len(tabel)} materialen geladen")
 
     print(f"Start berekening...")
 
-    count = 0
-    with out_path.open("w", encoding="utf-8") as f_out:
-        for scenario in read_jsonl(root / args.scenarios):
-            keuzes = scenario["keuzes"]
-
-            prijs = bereken_totaal_prijs(keuzes, material_lookup, gebouw)
-            co2   = bereken_totaal_co2(keuzes, material_lookup, gebouw)
-
-            record = {
-                "gebouw_id":   gebouw_id,
-                "scenario_id": scenario["scenario_id"],
-                "cost_total":  prijs,
-                "co2_total":   co2,
-            }
-            f_out.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-            count += 1
-            if count % 25000 == 0:
-                print(f"  Verwerkt: {count:,}")
-
-    print(f"\nOK -> {out_path}")
+    kolommen = {"scenario_id": "int64", "cost_total": "float64", "co2_total": "float64"}
+    meta     = {"gebouw_id": gebouw_id}
+
+    ctx = {
+        "gebouw":          gebouw,
+        "gebouw_id":       gebouw_id,
+        "materiaal_index": materiaal_index,
+        "prijzen":         prijzen,
+        "co2s":            co2s,
+        "ruimte":          None,
+        "regels":          None,
+        "scenarios":       None,
+        "compact":         False,
+        "max_scenarios":   args.max_scenarios,
+        "kolommen":        kolommen,
+        "meta":            meta,
+        "compressie":      args.compressie,
+        "keuzes":          args.keuzes,
+    }
+
+    if args.scenarios:
+        ctx["scenarios"] = root / args.scenarios
+        ctx["compact"]   = is_compact(ctx["scenarios"])
+        if ctx["compact"]:
+            # Compact bestand: assen uit de header, dus optie-indices zijn beschikbaar
+            assen = read_scenarios_header(ctx["scenarios"])[0]["assen"]
+            meta["assen"] = assen
+            if args.keuzes:
+                kolommen["keuzes"] = "uint8" if max((len(ids) for _, ids in assen), default=0) <= 256 else "uint16"
+        elif args.keuzes:
+            print("  WAARSCHUWING: --keuzes alleen zonder --scenarios of met een compact .scen-bestand, genegeerd")
+            ctx["keuzes"] = False
+    else:
+        with stap("gen_results.ruimte"):
+            materials = list(read_jsonl(root / args.materials))
+            ruimte    = ScenarioRuimte.van_gebouw(
+                gebouw,
+                materials,
+                load_onderdeel_map(read_jsonl(root / args.onderdelen)),
+                add_none=args.add_none,
+            )
+        print(f"  Scenarioruimte: {ruimte.totaal:,} scenario's over {len(ruimte.assen)} onderdelen")
+        ctx["ruimte"]    = ruimte
+        meta["assen"]    = ruimte.assen
+        meta["add_none"] = args.add_none
+        if not args.geen_constraints:
+            regels = RegelSet(load_constraints(root / args.constraints), ruimte)
+            for r in regels.rapport():
+                print(f"  Constraint {r['constraint_id']}: {r['status']}, gesnoeid: {r['gesnoeid']:,}")
+            ctx["regels"]       = regels
+            meta["constraints"] = [r.constraint_id for r in regels.actief]
+            meta["constraints_hash"] = inhoud_hash(load_constraints(root / args.constraints))
+        if args.keuzes:
+            kolommen["keuzes"] = "uint8" if max(ruimte.radices, default=0) <= 256 else "uint16"
+        bijdragen             = ruimte.bijdragen(tabel, gebouw)
+        meta["max_scenarios"] = args.max_scenarios
+        meta["vingerafdruk"]  = vingerafdruk(ruimte, gebouw, materials, bijdragen)
+
+    jsonl_pad = out_path if args.formaat in ("jsonl", "beide") else None
+    kol_pad   = kolommen_pad(out_path) if args.formaat in ("kolommen", "beide") else None
+
+    if args.incrementeel:
+        if ctx["ruimte"] is None or jsonl_pad:
+            print("  WAARSCHUWING: --incrementeel alleen met --formaat kolommen zonder --scenarios")
+        else:
+            with stap("gen_results.incrementeel"):
+                bijgewerkt = werk_incrementeel_bij(ctx, kol_pad, bijdragen, out_path.parent / f"ranks_{gebouw_id}.json")
+            if bijgewerkt:
+                return kol_pad, {"gebouw_id": gebouw_id, "incrementeel": True}
+        print("  Incrementeel niet mogelijk, volledige herberekening")
+
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1 and ctx["scenarios"] and not ctx["compact"] and ctx["scenarios"].suffix != ".jsonl":
+        print("  WAARSCHUWING: gecomprimeerde scenarios.jsonl kan niet gesplitst worden, serieel")
+        workers = 1
+
+    if workers > 1:
+        if ctx["ruimte"] is not None:
+            bereiken = (ctx["regels"] or ctx["ruimte"]).shards(workers, args.max_scenarios)
+        elif ctx["compact"]:
+            bereiken = scenario_bereiken(ctx["scenarios"], workers)
+        else:
+            bereiken = byte_bereiken(ctx["scenarios"], workers)
+        print(f"  Parallel: {len(bereiken)} shards over {workers} workers")
+        with stap("gen_results.berekening"):
+            count = reken_parallel(ctx, bereiken, jsonl_pad, kol_pad, workers)
+    else:
+        with stap("gen_results.berekening"):
+            count = reken_shard(ctx, None, jsonl_pad, kol_pad)
+    METRICS.tel("gen_results.berekening", count)
+
+    for pad in (jsonl_pad, kol_pad):
+        if pad:
+            print(f"\nOK -> {pad}")
     print(f"Scenario's berekend: {count:,}")
+    return jsonl_pad or kol_pad, {"gebouw_id": gebouw_id, "scenarios": count, "workers": workers}
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
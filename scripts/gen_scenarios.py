@@ -2,47 +2,48 @@
 #
 # gen_scenarios.py
 #
-# Genereert alle mogelijke scenario's op basis van:
+# Exporteert alle mogelijke scenario's naar een scenariobestand op basis van:
 #   - data/gebouwdata/gebouwgegevens.json   (gebouwafmetingen + opties)
 #   - data/brondata/materials.jsonl         (materialen per categorie)
 #   - data/brondata/onderdelen.jsonl        (categorie -> onderdeel_id mapping)
 #
+# De scenarioruimte zelf zit in engine/scenarios.py; gen_results.py rekent er
+# direct op en heeft deze export niet meer nodig.
+#
+# Formaten (--formaat):
+#   compact   scenarios.scen: één header met de assen, daarna per scenario
+#             alleen het scenario_id als int64 (engine.writer.ScenarioWriter)
+#   jsonl     scenarios.jsonl: per regel gebouw_id + keuzes-dict (~20x groter),
+#             met een offset-index scenarios.jsonl.index voor random access
+# Beide worden gelezen met engine.loader.read_scenarios.
+#
 # Voorbeelden:
 #   python scripts/gen_scenarios.py
 #   python scripts/gen_scenarios.py --gebouw gebouw_002
 #   python scripts/gen_scenarios.py --max-scenarios 10000
+#   python scripts/gen_scenarios.py --dry-run
+#   python scripts/gen_scenarios.py --formaat jsonl
+#   python scripts/gen_scenarios.py --add-none --geen-constraints
+#
+# Regels uit data/brondata/constraints.jsonl worden tijdens het enumereren
+# toegepast (engine/constraints.py): ongeldige deelbomen worden nooit
+# gegenereerd. scenario_ids blijven die van de volledige ruimte (met gaten).
 #
 
 import argparse
-import itertools
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
-PANEEL_M2_PER_STUK = 1.7
-
-# Vaste mapping: (categorie, veld_in_afmetingen, enh, conditie_veld, conditie_waarde)
-CATEGORIE_MAP = [
-    ("Beglazing",           "beglazing_m2",  "m2",    None,      None),
-    ("Gevelisolatie",       "gevel_m2",      "m2",    None,      None),
-    ("Deuren",              "deuren_stuks",  "stuks", None,      None),
-    ("Hellend dakisolatie", "dak_m2",        "m2",    "daktype", "schuin"),
-    ("Plat dakisolatie",    "dak_m2",        "m2",    "daktype", "plat"),
-    ("Vloerisolatie",       "vloer_m2",      "m2",    None,      None),
-    ("Kozijnen",            "kozijnen_m1",   "m1",    None,      None),
-]
-
-OPTIE_MAP = [
-    ("Panelen",       "panelen",      "stuks", lambda afm: afm.get("dak_m2", 0) / PANEEL_M2_PER_STUK),
-    ("Zonne-energie", "zonnepanelen", "stuks", lambda afm: afm.get("dak_m2", 0) / PANEEL_M2_PER_STUK),
-    ("Ventilatie",    "ventilatie",   "stuks", lambda afm: 1),
-]
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-VERWARMING_VOORKEUR_MAP = {
-    "ketel":           "Verwarming - Ketel",
-    "warmtepomp":      "Verwarming - Warmtepomp",
-    "stadsverwarming": "Stadsverwarming",
-}
+from engine.constraints import RegelSet, load_constraints
+from engine.loader      import bouw_scenario_index
+from engine.scenarios   import ScenarioRuimte, load_onderdeel_map
+from engine.writer      import JsonlWriter, ScenarioWriter
+from engine.metrics     import METRICS, PROFIELEN, draai_met_metrics, stap
 
 
 def read_jsonl(path: Path) -> List[Dict]:
@@ -67,45 +68,22 @@ def load_gebouw(path: Path, gebouw_id: Optional[str]) -> Dict:
     return data
 
 
-def load_onderdeel_map(path: Path) -> Dict[str, str]:
-    """Geeft categorie -> onderdeel_id mapping."""
-    result = {}
-    for item in read_jsonl(path):
-        cat = item.get("categorie", "").strip()
-        oid = item.get("onderdeel_id", "").strip()
-        if cat and oid:
-            result[cat] = oid
-    return result
-
-
-def resolve_actief(gebouw: Dict) -> List[Dict]:
-    afm  = gebouw.get("afmetingen", {})
-    opts = gebouw.get("opties", {})
-    actief = []
-
-    for categorie, veld, enh, cond_veld, cond_waarde in CATEGORIE_MAP:
-        if cond_veld and afm.get(cond_veld) != cond_waarde:
-            continue
-        waarde = afm.get(veld)
-        if waarde and float(waarde) > 0:
-            actief.append({"categorie": categorie, "waarde": float(waarde), "enh": enh})
-
-    for categorie, optie_veld, enh, waarde_fn in OPTIE_MAP:
-        if opts.get(optie_veld):
-            waarde = waarde_fn(afm)
-            if waarde and float(waarde) > 0:
-                actief.append({"categorie": categorie, "waarde": round(float(waarde), 2), "enh": enh})
-
-    if opts.get("verwarming"):
-        voorkeur = opts.get("verwarming_voorkeur")
-        if voorkeur and voorkeur in VERWARMING_VOORKEUR_MAP:
-            cats = [VERWARMING_VOORKEUR_MAP[voorkeur]]
-        else:
-            cats = list(VERWARMING_VOORKEUR_MAP.values())
-        for cat in cats:
-            actief.append({"categorie": cat, "waarde": 1, "enh": "stuks"})
+def print_ruimte(ruimte: ScenarioRuimte):
+    print(f"Gebouw: {ruimte.gebouw_id}")
+    print(f"Actieve onderdelen ({len(ruimte.actief) + len(ruimte.ontbrekend)}):")
+    for item in ruimte.ontbrekend:
+        print(f"  WAARSCHUWING: geen materialen voor '{item['categorie']}' ({item['onderdeel_id']}), overgeslagen")
+    for item, (oid, ids) in zip(ruimte.actief, ruimte.assen):
+        print(f"  {len(ids):3d}x  [{oid}] {item['categorie']}  ({item['waarde']} {item['enh']})")
+    print(f"\nTotaal scenario's: {ruimte.totaal:,}")
+
 
-    return actief
+def print_regels(regels: RegelSet):
+    print("Constraints:")
+    for r in regels.rapport():
+        extra = f"  ({r['reden']})" if r["reden"] else ""
+        print(f"  {r['constraint_id']:5s} {r['type']:9s} {r['status']:16s} gesnoeid: {r['gesnoeid']:,}{extra}")
+    print(f"Geldige scenario's: {regels.aantal_geldig():,}")
 
 
 def main():
@@ -114,77 +92,70 @@ def main():
     parser.add_argument("--gebouwdata",    default="data/gebouwdata/gebouwgegevens.json",  help="Pad naar gebouwgegevens.json")
     parser.add_argument("--materials",     default="data/brondata/materials.jsonl",        help="Pad naar materials.jsonl")
     parser.add_argument("--onderdelen",    default="data/brondata/onderdelen.jsonl",       help="Pad naar onderdelen.jsonl")
-    parser.add_argument("--out",           default="data/output/scenarios.jsonl",          help="Output pad")
+    parser.add_argument("--out",           default=None,                                   help="Output pad (default: data/output/scenarios.scen of .jsonl)")
+    parser.add_argument("--formaat",       choices=["compact", "jsonl"], default="compact", help="compact (.scen, alleen scenario_ids) of jsonl (keuzes per regel)")
     parser.add_argument("--max-scenarios", type=int, default=None,                         help="Maximaal aantal scenario's")
     parser.add_argument("--add-none",      action="store_true",                            help="Voeg NONE-optie toe per onderdeel")
+    parser.add_argument("--dry-run",       action="store_true",                            help="Alleen de scenarioruimte tonen, niets schrijven")
+    parser.add_argument("--constraints",   default="data/brondata/constraints.jsonl",      help="Pad naar constraints.jsonl")
+    parser.add_argument("--geen-constraints", action="store_true",                         help="Constraints niet toepassen")
+    parser.add_argument("--metrics",          action="store_true",                         help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",          choices=PROFIELEN, default=None,             help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
     args = parser.parse_args()
 
-    root        = Path(__file__).resolve().parents[1]
-    gebouw      = load_gebouw(root / args.gebouwdata, args.gebouw)
-    mats        = read_jsonl(root / args.materials)
-    oid_map     = load_onderdeel_map(root / args.onderdelen)
-    out_path    = root / args.out
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    draai_met_metrics(genereer, args, "gen_scenarios")
 
-    by_cat: Dict[str, List[Dict]] = {}
-    for m in mats:
-        cat = m.get("categorie", "").strip()
-        if cat:
-            by_cat.setdefault(cat, []).append(m)
 
-    actief = resolve_actief(gebouw)
+def genereer(args):
+    """Schrijft de scenario's; geeft (outputpad, extra velden) of None."""
 
-    if not actief:
-        print("Geen actieve onderdelen gevonden.")
-        return
+    root    = ROOT
+    gebouw  = load_gebouw(root / args.gebouwdata, args.gebouw)
+    mats    = read_jsonl(root / args.materials)
+    oid_map = load_onderdeel_map(read_jsonl(root / args.onderdelen))
 
-    print(f"Gebouw: {gebouw.get('gebouw_id')}")
-    print(f"Actieve onderdelen ({len(actief)}):")
+    ruimte = ScenarioRuimte.van_gebouw(gebouw, mats, oid_map, add_none=args.add_none)
 
-    opties_per_cat = []
-    totaal = 1
+    if not ruimte.actief and not ruimte.ontbrekend:
+        print("Geen actieve onderdelen gevonden.")
+        return
 
-    for item in actief:
-        cat   = item["categorie"]
-        oid   = oid_map.get(cat, cat)  # fallback op naam als ID niet gevonden
-        maten = by_cat.get(cat, [])
+    print_ruimte(ruimte)
 
-        if not maten:
-            print(f"  WAARSCHUWING: geen materialen voor '{cat}' ({oid}), overgeslagen")
-            continue
+    regels = None
+    if not args.geen_constraints:
+        regels = RegelSet(load_constraints(root / args.constraints), ruimte)
+        print_regels(regels)
 
-        material_ids = sorted(set(m["material_id"] for m in maten))
-        if args.add_none:
-            material_ids = ["NONE"] + material_ids
+    if args.dry_run:
+        return
 
-        print(f"  {len(material_ids):3d}x  [{oid}] {cat}  ({item['waarde']} {item['enh']})")
-        totaal *= len(material_ids)
-        opties_per_cat.append((oid, material_ids))
+    out_path = root / (args.out or f"data/output/scenarios.{'scen' if args.formaat == 'compact' else 'jsonl'}")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    print(f"\nTotaal scenario's: {totaal:,}")
     print("Genereren...")
 
-    oid_namen     = [o for o, _ in opties_per_cat]
-    optie_lijsten = [ids for _, ids in opties_per_cat]
-
-    scenario_id = 0
-
-    with out_path.open("w", encoding="utf-8") as f_out:
-        for combo in itertools.product(*optie_lijsten):
-            scenario_id += 1
-            record = {
-                "scenario_id": scenario_id,
-                "gebouw_id":   gebouw.get("gebouw_id"),
-                "keuzes":      {oid_namen[i]: combo[i] for i in range(len(oid_namen))},
-            }
-            f_out.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-            if args.max_scenarios and scenario_id >= args.max_scenarios:
-                break
+    with stap("gen_scenarios.genereren"):
+        if args.formaat == "compact":
+            bron = regels if regels is not None else ruimte
+            with ScenarioWriter(out_path, ruimte.assen, ruimte.gebouw_id) as writer:
+                for ids in bron.id_blokken(65_536, args.max_scenarios):
+                    writer.schrijf(ids)
+        else:
+            with JsonlWriter(out_path) as writer:
+                writer.schrijf_veel(ruimte.iter_scenarios(args.max_scenarios, regels))
+            # Offset-index voor random access (engine.loader.zoek_scenarios)
+            try:
+                print(f"Index -> {bouw_scenario_index(out_path)}")
+            except OSError as e:
+                print(f"  WAARSCHUWING: index niet geschreven ({e}); wordt bij gebruik in het geheugen opgebouwd")
+    count = writer.aantal
+    METRICS.tel("gen_scenarios.genereren", count)
 
-    print(f"OK -> {out_path}")
-    print(f"Scenario's gegenereerd: {scenario_id:,}")
+    print(f"OK -> {out_path} ({out_path.stat().st_size:,} bytes)")
+    print(f"Scenario's gegenereerd: {count:,}")
+    return out_path, {"gebouw_id": ruimte.gebouw_id, "scenarios": count, "formaat": args.formaat}
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
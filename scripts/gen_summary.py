@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+#
+# gen_summary.py
+#
+# Beste scenario's binnen de budgetten uit data/config/requirements.json:
+#   constraints  min/max op totaal_prijs en totaal_mg_co2
+#   objective    primary + direction (min/max)
+#   top_n
+#
+# Zoekt met branch-and-bound direct in de scenarioruimte
+# (engine.ranking.zoek_binnen_grenzen): deelscenario's die het venster niet
+# meer kunnen halen worden weggesnoeid, dus scenario's buiten het budget
+# worden niet doorgerekend. Constraints uit constraints.jsonl worden
+# meegenomen.
+#
+# Output: data/output/results_summary_<gebouw>.json
+#
+# Gebruik:
+#   python scripts/gen_summary.py
+#   python scripts/gen_summary.py --gebouw gebouw_002 --add-none
+#   python scripts/gen_summary.py --requirements data/config/requirements.json --top-n 25
+#
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.constraints import RegelSet, load_constraints, load_requirements, summary_document, vertaal_requirements
+from engine.loader      import read_gebouw, read_jsonl
+from engine.materiaaltabel import read_materiaal_tabel
+from engine.ranking     import zoek_binnen_grenzen
+from engine.scenarios   import ScenarioRuimte, load_onderdeel_map
+from engine.writer      import write_summary
+from engine.metrics     import METRICS, PROFIELEN, draai_met_metrics, stap
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gebouw",       default=None,                                  help="Gebouw ID")
+    parser.add_argument("--requirements", default="data/config/requirements.json",       help="Pad naar requirements.json")
+    parser.add_argument("--materials",    default="data/brondata/materials.jsonl",        help="Pad naar materials.jsonl")
+    parser.add_argument("--onderdelen",   default="data/brondata/onderdelen.jsonl",       help="Pad naar onderdelen.jsonl")
+    parser.add_argument("--gebouwdata",   default="data/gebouwdata/gebouwgegevens.json",  help="Pad naar gebouwgegevens.json")
+    parser.add_argument("--constraints",  default="data/brondata/constraints.jsonl",      help="Pad naar constraints.jsonl")
+    parser.add_argument("--geen-constraints", action="store_true",                        help="Constraints niet toepassen")
+    parser.add_argument("--add-none",     action="store_true",                            help="Voeg NONE-optie toe per onderdeel")
+    parser.add_argument("--top-n",        type=int, default=None,                         help="Overschrijft top_n uit requirements.json")
+    parser.add_argument("--out",          default=None,                                   help="Output pad (default: data/output/results_summary_<gebouw>.json)")
+    parser.add_argument("--metrics",      action="store_true",                            help="Schrijf een metrics-rapport naast de output (<output>.metrics.json)")
+    parser.add_argument("--profiel",      choices=PROFIELEN, default=None,                help="Profileer de run (cprofile of sample); resultaat in het metrics-rapport")
+    args = parser.parse_args()
+
+    draai_met_metrics(genereer, args, "gen_summary")
+
+
+def genereer(args):
+    """Zoekt de beste scenario's binnen de grenzen; geeft (outputpad, extra velden) of None."""
+
+    root = ROOT
+
+    requirements = load_requirements(root / args.requirements)
+    grenzen, key, reverse, top_n = vertaal_requirements(requirements)
+    top_n = args.top_n or top_n
+
+    gebouw = read_gebouw(root / args.gebouwdata, args.gebouw)
+    if not gebouw:
+        print("ERROR: gebouw niet gevonden.")
+        return
+    gebouw_id = gebouw.get("gebouw_id", "onbekend")
+
+    ruimte = ScenarioRuimte.van_gebouw(
+        gebouw,
+        read_jsonl(root / args.materials),
+        load_onderdeel_map(read_jsonl(root / args.onderdelen)),
+        add_none=args.add_none,
+    )
+    kolommen = ruimte.bijdragen(read_materiaal_tabel(root / args.materials), gebouw)
+    regels   = None if args.geen_constraints else RegelSet(load_constraints(root / args.constraints), ruimte)
+
+    print(f"Gebouw:         {gebouw_id}")
+    print(f"Scenarioruimte: {ruimte.totaal:,} scenario's over {len(ruimte.assen)} onderdelen")
+    for kolom, (laag, hoog) in grenzen.items():
+        print(f"  {kolom:11s} {laag if laag is not None else '-'} .. {hoog if hoog is not None else '-'}")
+    print(f"Doel: {'max' if reverse else 'min'} {key}, top {top_n}")
+
+    t0 = time.perf_counter()
+    with stap("gen_summary.zoeken"):
+        records, stat = zoek_binnen_grenzen(ruimte, kolommen, grenzen, key, reverse, top_n, regels)
+    METRICS.tel("gen_summary.zoeken", stat["doorgerekend"])
+    duur = time.perf_counter() - t0
+
+    output = summary_document(gebouw_id, requirements, records, stat, key, reverse, top_n, ruimte.keuzes, duur)
+
+    out_path = root / (args.out or f"data/output/results_summary_{gebouw_id}.json")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    write_summary(out_path, output)
+
+    print(f"\nDoorgerekend: {stat['doorgerekend']:,} van {stat['totaal']:,} ({duur:.3f}s)")
+    print(f"Gesnoeid: grenzen {stat['gesnoeid_grenzen']:,}  |  doel {stat['gesnoeid_doel']:,}  |  regels {stat['gesnoeid_regels']:,}")
+    for i, s in enumerate(output["beste_scenarios"][:3], 1):
+        print(f"  #{i}  €{s['totaal_prijs']:>12,.2f}  |  CO2: {s['totaal_mg_co2']:>12,.2f}")
+    print(f"\nOK -> {out_path}")
+    return out_path, {"gebouw_id": gebouw_id, "scenarios": stat["totaal"], "doorgerekend": stat["doorgerekend"]}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+#
+# run_pipeline.py
+#
+# Draait de keten gen_results -> gen_ranks -> gen_pareto -> gen_summary voor
+# alle (of de gekozen) gebouwen, met een content-addressed cache
+# (engine/pipeline.py). Een stap draait alleen als zijn inputs (gebouwrecord,
+# materials/onderdelen/constraints/requirements, code) of parameters zijn
+# gewijzigd; eerder berekende artefacten worden uit data/output/cache/
+# teruggezet. Na de run wordt de cache opgeruimd tot --cache-max-mb (default
+# CACHE_MAX_MB); met --cache-max-mb 0 worden geen kopieën bewaard.
+#
+# Gebruik:
+#   python scripts/run_pipeline.py
+#   python scripts/run_pipeline.py --gebouwdata data/gebouwdata/portfolio.json
+#   python scripts/run_pipeline.py --gebouw gebouw_001 gebouw_002 --add-none
+#   python scripts/run_pipeline.py --droog                    (alleen tonen wat zou draaien)
+#   python scripts/run_pipeline.py --cache-max-mb 2000 --cache-max-dagen 30
+#   python scripts/run_pipeline.py --csv                      (ook gen_csv: materialenlijst.csv -> materials.jsonl)
+#
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.incrementeel import inhoud_hash
+from engine.loader       import read_gebouwen
+from engine.pipeline     import CACHE_MAX_MB, PipelineCache, Stap, bestand_hash
+
+
+def code_hash(script: str) -> str:
+    """Hash van het script plus alle engine-modules: codewijzigingen maken de cache ongeldig."""
+    paden = [ROOT / "scripts" / script] + sorted((ROOT / "engine").glob("*.py"))
+    return inhoud_hash({str(p.relative_to(ROOT)): bestand_hash(p) for p in paden})
+
+
+def draai(*argv: str):
+    """Voert een gen_*-script uit; bij een fout wordt de output getoond."""
+    proces = subprocess.run([sys.executable, *argv], cwd=ROOT, capture_output=True, text=True)
+    if proces.returncode != 0:
+        print(proces.stdout)
+        print(proces.stderr, file=sys.stderr)
+        raise RuntimeError(f"{argv[0]} faalde (exit {proces.returncode})")
+
+
+def stappen_voor_gebouw(gebouw: dict, args, bronnen: dict, out_dir: Path):
+    """De vier stappen voor één gebouw; elke stap neemt de sleutel van zijn voorganger als input."""
+    gid        = gebouw.get("gebouw_id", "onbekend")
+    results    = out_dir / f"results_{gid}.kolommen"
+    gemeenschappelijk = {
+        "gebouw":      inhoud_hash(gebouw),
+        "materials":   bronnen["materials"],
+        "onderdelen":  bronnen["onderdelen"],
+        "constraints": bronnen["constraints"],
+    }
+    basis = ["--gebouw", gid, "--gebouwdata", args.gebouwdata, "--materials", args.materials, "--onderdelen", args.onderdelen]
+    none  = ["--add-none"] if args.add_none else []
+
+    stap_results = Stap(
+        "results",
+        {**gemeenschappelijk, "code": code_hash("gen_results.py")},
+        {"gebouw_id": gid, "add_none": args.add_none, "formaat": "kolommen"},
+        [results],
+        lambda: draai("scripts/gen_results.py", *basis, *none, "--formaat", "kolommen",
+                      "--constraints", args.constraints, "--out", str(out_dir / f"results_{gid}.jsonl")),
+    )
+    stap_ranks = Stap(
+        "ranks",
+        {"results": stap_results.sleutel, "code": code_hash("gen_ranks.py")},
+        {"gebouw_id": gid},
+        [out_dir / f"ranks_{gid}.json"],
+        lambda: draai("scripts/gen_ranks.py", "--results", str(results), "--out", str(out_dir / f"ranks_{gid}.json")),
+    )
+    stap_pareto = Stap(
+        "pareto",
+        {"results": stap_results.sleutel, "code": code_hash("gen_pareto.py")},
+        {"gebouw_id": gid},
+        [out_dir / f"pareto_{gid}.json"],
+        lambda: draai("scripts/gen_pareto.py", "--results", str(results), "--out", str(out_dir / f"pareto_{gid}.json")),
+    )
+    stap_summary = Stap(
+        "summary",
+        {**gemeenschappelijk, "requirements": bronnen["requirements"], "code": code_hash("gen_summary.py")},
+        {"gebouw_id": gid, "add_none": args.add_none},
+        [out_dir / f"results_summary_{gid}.json"],
+        lambda: draai("scripts/gen_summary.py", *basis, *none, "--constraints", args.constraints,
+                      "--requirements", args.requirements, "--out", str(out_dir / f"results_summary_{gid}.json")),
+    )
+    return [stap_results, stap_ranks, stap_pareto, stap_summary]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gebouw",       nargs="*", default=None,                        help="Gebouw ID(s); default alle gebouwen")
+    parser.add_argument("--gebouwdata",   default="data/gebouwdata/gebouwgegevens.json",  help="Pad naar gebouwgegevens.json")
+    parser.add_argument("--materials",    default="data/brondata/materials.jsonl",        help="Pad naar materials.jsonl")
+    parser.add_argument("--onderdelen",   default="data/brondata/onderdelen.jsonl",       help="Pad naar onderdelen.jsonl")
+    parser.add_argument("--constraints",  default="data/brondata/constraints.jsonl",      help="Pad naar constraints.jsonl")
+    parser.add_argument("--requirements", default="data/config/requirements.json",       help="Pad naar requirements.json")
+    parser.add_argument("--out-dir",      default="data/output",                          help="Outputmap (manifest + cache)")
+    parser.add_argument("--add-none",     action="store_true",                            help="Voeg NONE-optie toe per onderdeel")
+    parser.add_argument("--csv",          action="store_true",                            help="Eerst gen_csv.py (materialenlijst.csv -> materials.jsonl)")
+    parser.add_argument("--forceer",      action="store_true",                            help="Alle stappen opnieuw uitvoeren")
+    parser.add_argument("--droog",        action="store_true",                            help="Alleen tonen welke stappen zouden draaien")
+    parser.add_argument("--cache-max-mb", type=float, default=CACHE_MAX_MB,               help=f"Cache opruimen tot deze grootte (MB, default {CACHE_MAX_MB})")
+    parser.add_argument("--cache-max-dagen", type=float, default=None,                    help="Cache-items ouder dan dit aantal dagen verwijderen")
+    args = parser.parse_args()
+
+    root    = ROOT
+    out_dir = root / args.out_dir
+    cache   = PipelineCache(out_dir)
+
+    if args.csv:
+        csv_stap = Stap(
+            "csv",
+            {
+                "materialenlijst": bestand_hash(root / "data/brondata/materialenlijst.csv"),
+                "onderdelen":      bestand_hash(root / args.onderdelen),
+                "code":            code_hash("gen_csv.py"),
+            },
+            {},
+            [root / "data/brondata/materials.jsonl"],
+            lambda: draai("scripts/gen_csv.py"),
+        )
+        if args.droog:
+            print(f"{'-':12s} {'csv':8s} {cache.status(csv_stap)}")
+        else:
+            r = cache.voer_uit(csv_stap, args.forceer)
+            print(f"{'-':12s} {'csv':8s} {r['status']:10s} {r['duur_s']:>8.3f}s")
+
+    bronnen = {
+        "materials":    bestand_hash(root / args.materials),
+        "onderdelen":   bestand_hash(root / args.onderdelen),
+        "constraints":  bestand_hash(root / args.constraints),
+        "requirements": bestand_hash(root / args.requirements),
+    }
+
+    gebouwen = read_gebouwen(root / args.gebouwdata)
+    if args.gebouw:
+        gebouwen = [g for g in gebouwen if g.get("gebouw_id") in args.gebouw]
+    print(f"Gebouwen: {len(gebouwen)}\n")
+
+    telling = {"actueel": 0, "cache": 0, "uitvoeren": 0}
+    for gebouw in gebouwen:
+        gid = gebouw.get("gebouw_id", "onbekend")
+        for stap in stappen_voor_gebouw(gebouw, args, bronnen, out_dir):
+            if args.droog:
+                status = cache.status(stap)
+                print(f"{gid:12s} {stap.naam:8s} {status}")
+            else:
+                r = cache.voer_uit(stap, args.forceer)
+                status = r["status"]
+                print(f"{gid:12s} {stap.naam:8s} {status:10s} {r['duur_s']:>8.3f}s")
+            telling[status] += 1
+
+    print(f"\nActueel: {telling['actueel']}  |  uit cache: {telling['cache']}  |  uitgevoerd: {telling['uitvoeren']}")
+
+    if not args.droog:
+        weg = cache.ruim_op(int(args.cache_max_mb * 1024 * 1024), args.cache_max_dagen)
+        print(f"Cache opgeruimd: {len(weg)} items verwijderd, {cache.grootte() / 1e6:,.1f} MB over")
+
+
+if __name__ == "__main__":
+    main()
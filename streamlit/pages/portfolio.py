@@ -0,0 +1,64 @@
+# pages/portfolio.py
+
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.helpers import format_eur, format_co2
+from utils.charts  import portfolio_bars, portfolio_fronten
+from utils.data    import load_overzicht
+
+
+def render(gebouw_ids):
+
+    st.markdown("## Portfolio — gebouwen vergeleken")
+
+    # Per gebouw uit de voorberekende ranks (of de index); gecached per gebouw
+    overzichten = [load_overzicht(gid) for gid in gebouw_ids]
+    overzichten = [o for o in overzichten if o.get("goedkoopste")]
+    if not overzichten:
+        st.warning("Geen gebouwen met results of ranks gevonden in data/output.")
+        return
+
+    rows = []
+    for o in overzichten:
+        g, c, opt = o["goedkoopste"], o["minste_co2"], o.get("optimaal")
+        rows.append({
+            "Gebouw":            o["gebouw_id"],
+            "Scenario's":        o["aantal"],
+            "Goedkoopste prijs": g["cost_total"],
+            "Goedkoopste CO₂":   g["co2_total"],
+            "Minste CO₂ prijs":  c["cost_total"],
+            "Minste CO₂ CO₂":    c["co2_total"],
+            "Optimaal":          f"#{opt['scenario_id']} — {format_eur(opt['cost_total'])} | {format_co2(opt['co2_total'])}" if opt else "-",
+            "Pareto-punten":     len(o["pareto"]) if o.get("pareto") is not None else None,
+        })
+    df = pd.DataFrame(rows)
+
+    # ── Totalen ──────────────────────────────────────────────────────────────
+    totaal = int(df["Scenario's"].sum())
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Gebouwen",               f"{len(df):,}")
+    c2.metric("Scenario's",             f"{totaal:,}")
+    c3.metric("Alles goedkoopste",      format_eur(df["Goedkoopste prijs"].sum()),
+              help=f"CO₂: {format_co2(df['Goedkoopste CO₂'].sum())}")
+    c4.metric("Alles minste CO₂",       format_co2(df["Minste CO₂ CO₂"].sum()),
+              delta=f"€ {df['Minste CO₂ prijs'].sum() - df['Goedkoopste prijs'].sum():+,.0f} t.o.v. goedkoopste",
+              delta_color="off")
+
+    st.divider()
+
+    # ── Tabel ────────────────────────────────────────────────────────────────
+    weergave = df.assign(**{
+        kolom: df[kolom].apply(format_eur) for kolom in ("Goedkoopste prijs", "Minste CO₂ prijs")
+    }).assign(**{
+        kolom: df[kolom].apply(format_co2) for kolom in ("Goedkoopste CO₂", "Minste CO₂ CO₂")
+    })
+    st.dataframe(weergave, use_container_width=True, hide_index=True)
+
+    # ── Charts ───────────────────────────────────────────────────────────────
+    st.plotly_chart(portfolio_bars(df), use_container_width=True)
+    st.plotly_chart(portfolio_fronten(overzichten), use_container_width=True)
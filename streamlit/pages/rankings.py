@@ -7,12 +7,13 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from utils.helpers import format_eur, format_co2, bereken_materialen, duurzaam_score, materialen_df_display
+from utils.helpers import format_eur, format_co2, uitsplitsing, materialen_df_display
 from utils.charts  import bar_prijs, bar_co2, radar
+from utils.data    import load_index, load_pagina, load_scenario_rijen
 
 
-def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm,
-           max_prijs, max_co2, ranking_keuze, top_n):
+def render(samenvatting, keuzes_map, mat_lookup, ond_lookup, afm, gebouw_id,
+           max_prijs, max_co2, ranking_keuze, top_n, df_pareto=None):
 
     sort_map = {
         "Optimaal":    ("optimaal_score", False),
@@ -20,25 +21,37 @@ def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm,
         "Duurste":     ("cost_total",     True),
         "Minste CO₂":  ("co2_total",      False),
         "Meeste CO₂":  ("co2_total",      True),
+        "Pareto-front": ("cost_total",    False),
     }
-
-    df_filtered = df_results[
-        (df_results["cost_total"] <= max_prijs) &
-        (df_results["co2_total"]  <= max_co2)
-    ]
-
     sort_col, sort_desc = sort_map[ranking_keuze]
-    df_ranked = df_filtered.sort_values(sort_col, ascending=not sort_desc).head(top_n)
+
+    if ranking_keuze == "Pareto-front" and df_pareto is not None:
+        # Het front is klein: direct filteren en sorteren
+        df_front = df_pareto[(df_pareto["cost_total"] <= max_prijs) & (df_pareto["co2_total"] <= max_co2)]
+        aantal   = len(df_front)
+    else:
+        aantal   = load_index(gebouw_id).aantal(max_prijs, max_co2)
 
     # ── Header ───────────────────────────────────────────────────────────────
     st.markdown(f"## Scenario Analyse — {ranking_keuze}")
-    st.caption(f"{len(df_filtered):,} van {len(df_results):,} scenario's na filter — top {len(df_ranked)} getoond")
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Totaal",       f"{len(df_results):,}")
-    c2.metric("Na filter",    f"{len(df_filtered):,}")
-    c3.metric("Prijs range",  f"{format_eur(df_results['cost_total'].min())} – {format_eur(df_results['cost_total'].max())}")
-    c4.metric("CO₂ range",    f"{format_co2(df_results['co2_total'].min())} – {format_co2(df_results['co2_total'].max())}")
+    c1.metric("Totaal",       f"{samenvatting['aantal']:,}")
+    c2.metric("Na filter",    f"{aantal:,}")
+    c3.metric("Prijs range",  f"{format_eur(samenvatting['prijs_min'])} – {format_eur(samenvatting['prijs_max'])}")
+    c4.metric("CO₂ range",    f"{format_co2(samenvatting['co2_min'])} – {format_co2(samenvatting['co2_max'])}")
+
+    # Alleen de rijen van de getoonde pagina worden opgehaald
+    paginas = max(1, -(-aantal // top_n))
+    pagina  = st.number_input("Pagina", min_value=1, max_value=paginas, value=1, step=1, key=f"pagina_{gebouw_id}") - 1 if paginas > 1 else 0
+    if ranking_keuze == "Pareto-front" and df_pareto is not None:
+        ids       = df_front.sort_values(sort_col, kind="stable")["scenario_id"].iloc[pagina * top_n:(pagina + 1) * top_n]
+        df_ranked = load_scenario_rijen(gebouw_id, tuple(int(s) for s in ids))
+    else:
+        # Voorgesorteerde index: geen masker/sort over alle rijen
+        df_ranked = load_pagina(gebouw_id, sort_col, sort_desc, max_prijs, max_co2, pagina, top_n)
+    eerste = pagina * top_n + 1
+    st.caption(f"{aantal:,} van {samenvatting['aantal']:,} scenario's na filter — {eerste}–{eerste + len(df_ranked) - 1} getoond")
 
     st.divider()
 
@@ -46,14 +59,15 @@ def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm,
 
     # ── Lijst ────────────────────────────────────────────────────────────────
     with col_lijst:
-        st.markdown(f"#### Top {len(df_ranked)} — {ranking_keuze}")
+        titel = f"Top {len(df_ranked)}" if not pagina else f"#{eerste}–{eerste + len(df_ranked) - 1}"
+        st.markdown(f"#### {titel} — {ranking_keuze}")
 
         if df_ranked.empty:
             st.warning("Geen scenario's voldoen aan de filters.")
             return
 
         display_df = pd.DataFrame({
-            "#":        range(1, len(df_ranked) + 1),
+            "#":        range(eerste, eerste + len(df_ranked)),
             "Scenario": df_ranked["scenario_id"].values,
             "Prijs":    df_ranked["cost_total"].apply(format_eur).values,
             "CO₂":      df_ranked["co2_total"].apply(format_co2).values,
@@ -64,13 +78,14 @@ def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm,
                                 on_select="rerun", selection_mode="single-row", height=560)
         sel_rows = sel.selection.get("rows", [])
         sel_idx  = sel_rows[0] if sel_rows else 0
-        selected_id = int(df_ranked.iloc[sel_idx]["scenario_id"])
+        row         = df_ranked.iloc[sel_idx]
+        selected_id = int(row["scenario_id"])
 
     # ── Detail ───────────────────────────────────────────────────────────────
     with col_detail:
-        row        = df_results[df_results["scenario_id"] == selected_id].iloc[0]
-        materialen = bereken_materialen(selected_id, keuzes_map, mat_lookup, ond_lookup, afm)
-        d_score    = duurzaam_score(materialen)
+        # Gememoiseerd: terugklikken naar een scenario rekent niets opnieuw uit
+        materialen = uitsplitsing(gebouw_id, selected_id, keuzes_map, mat_lookup, ond_lookup, afm)
+        d_score    = materialen.score
 
         st.markdown(f"#### Scenario #{selected_id}")
         m1, m2, m3 = st.columns(3)
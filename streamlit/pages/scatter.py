@@ -7,29 +7,43 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from utils.helpers import format_eur, format_co2
-from utils.charts  import scatter_prijs_co2
+from utils.charts  import DICHTHEID_BINS, MAX_PUNTEN, dichtheid_prijs_co2, scatter_prijs_co2
+from utils.data    import load_dichtheid, load_index, load_pagina, load_punten
 
 
-def render(df_results, max_prijs, max_co2):
+def render(samenvatting, gebouw_id, max_prijs, max_co2, df_pareto=None):
 
     st.markdown("## Prijs vs CO₂ — Alle scenario's")
 
-    # Top 20 optimaal highlighten
-    top_ids = set(
-        df_results.sort_values("optimaal_score").head(20)["scenario_id"].values
-    )
+    # Top 20 optimaal highlighten (voorgesorteerd in de index)
+    df_top  = load_pagina(gebouw_id, "optimaal_score", False, float("inf"), float("inf"), 0, 20)
+    top_ids = set(df_top["scenario_id"].values)
+
+    zichtbaar = load_index(gebouw_id).aantal(max_prijs, max_co2)
+
+    if df_pareto is not None:
+        df_pareto = df_pareto[
+            (df_pareto["cost_total"] <= max_prijs) &
+            (df_pareto["co2_total"]  <= max_co2)
+        ]
+
+    if zichtbaar > MAX_PUNTEN:
+        # Te veel punten voor de browser: gebinde dichtheid + top-N en Pareto-front
+        raster = load_dichtheid(gebouw_id, max_prijs, max_co2)
+        df_top = df_top[(df_top["cost_total"] <= max_prijs) & (df_top["co2_total"] <= max_co2)]
+        st.caption(f"{zichtbaar:,} van {samenvatting['aantal']:,} scenario's zichtbaar (dichtheid, {DICHTHEID_BINS}×{DICHTHEID_BINS} cellen)")
+        fig = dichtheid_prijs_co2(raster, df_top, df_pareto)
+        laagste_prijs, laagste_co2 = raster["prijs_min"], raster["co2_min"]
+    else:
+        df_filtered = load_punten(gebouw_id, max_prijs, max_co2)
+        st.caption(f"{zichtbaar:,} van {samenvatting['aantal']:,} scenario's zichtbaar")
+        fig = scatter_prijs_co2(df_filtered, top_ids, df_pareto)
+        laagste_prijs, laagste_co2 = df_filtered["cost_total"].min(), df_filtered["co2_total"].min()
 
-    df_filtered = df_results[
-        (df_results["cost_total"] <= max_prijs) &
-        (df_results["co2_total"]  <= max_co2)
-    ]
-
-    st.caption(f"{len(df_filtered):,} van {len(df_results):,} scenario's zichtbaar")
-
-    fig = scatter_prijs_co2(df_filtered, top_ids)
     st.plotly_chart(fig, use_container_width=True)
 
-    c1, c2, c3 = st.columns(3)
-    c1.metric("Laagste prijs",    format_eur(df_filtered["cost_total"].min()))
-    c2.metric("Laagste CO₂",      format_co2(df_filtered["co2_total"].min()))
-    c3.metric("Zichtbare punten", f"{len(df_filtered):,}")
\ No newline at end of file
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Laagste prijs",    format_eur(laagste_prijs))
+    c2.metric("Laagste CO₂",      format_co2(laagste_co2))
+    c3.metric("Zichtbare punten", f"{zichtbaar:,}")
+    c4.metric("Pareto-front",     f"{len(df_pareto):,}" if df_pareto is not None else "-")
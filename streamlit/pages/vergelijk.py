@@ -7,26 +7,25 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from utils.helpers import format_eur, format_co2, bereken_materialen, duurzaam_score
+from utils.helpers import format_eur, format_co2, uitsplitsing
 from utils.charts  import radar
+from utils.data    import load_pagina
 
 
-def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm, max_prijs, max_co2):
+def render(samenvatting, keuzes_map, mat_lookup, ond_lookup, afm, gebouw_id, max_prijs, max_co2):
 
     st.markdown("## Scenario Vergelijking")
 
-    df_filtered = df_results[
-        (df_results["cost_total"] <= max_prijs) &
-        (df_results["co2_total"]  <= max_co2)
-    ].sort_values("optimaal_score").head(200)
+    df_filtered = load_pagina(gebouw_id, "optimaal_score", False, max_prijs, max_co2, 0, 200)
 
     if len(df_filtered) < 2:
         st.warning("Pas de filters aan om meer scenario's te tonen.")
         return
 
+    # label -> rij in df_filtered
     opties = {
-        f"#{int(r['scenario_id'])} — {format_eur(r['cost_total'])} | CO₂: {format_co2(r['co2_total'])}": int(r["scenario_id"])
-        for _, r in df_filtered.iterrows()
+        f"#{int(r['scenario_id'])} — {format_eur(r['cost_total'])} | CO₂: {format_co2(r['co2_total'])}": i
+        for i, (_, r) in enumerate(df_filtered.iterrows())
     }
     optie_labels = list(opties.keys())
 
@@ -36,13 +35,12 @@ def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm, max_prijs, max_c
     with col_b:
         keuze_b = st.selectbox("Scenario B", optie_labels, index=min(1, len(optie_labels) - 1), key="verg_b")
 
-    id_a = opties[keuze_a]
-    id_b = opties[keuze_b]
-
-    row_a = df_results[df_results["scenario_id"] == id_a].iloc[0]
-    row_b = df_results[df_results["scenario_id"] == id_b].iloc[0]
-    mat_a = bereken_materialen(id_a, keuzes_map, mat_lookup, ond_lookup, afm)
-    mat_b = bereken_materialen(id_b, keuzes_map, mat_lookup, ond_lookup, afm)
+    row_a = df_filtered.iloc[opties[keuze_a]]
+    row_b = df_filtered.iloc[opties[keuze_b]]
+    id_a  = int(row_a["scenario_id"])
+    id_b  = int(row_b["scenario_id"])
+    mat_a = uitsplitsing(gebouw_id, id_a, keuzes_map, mat_lookup, ond_lookup, afm)
+    mat_b = uitsplitsing(gebouw_id, id_b, keuzes_map, mat_lookup, ond_lookup, afm)
 
     # ── Totalen ──────────────────────────────────────────────────────────────
     st.divider()
@@ -53,16 +51,16 @@ def render(df_results, keuzes_map, mat_lookup, ond_lookup, afm, max_prijs, max_c
     m3.metric("A — CO₂",       format_co2(row_a["co2_total"]))
     m4.metric("B — CO₂",       format_co2(row_b["co2_total"]),
               delta=f"{row_b['co2_total'] - row_a['co2_total']:+,.0f} kg", delta_color="inverse")
-    m5.metric("A — Duurzaam",  f"{duurzaam_score(mat_a):.0f}%")
-    m6.metric("B — Duurzaam",  f"{duurzaam_score(mat_b):.0f}%",
-              delta=f"{duurzaam_score(mat_b) - duurzaam_score(mat_a):+.0f}%")
+    m5.metric("A — Duurzaam",  f"{mat_a.score:.0f}%")
+    m6.metric("B — Duurzaam",  f"{mat_b.score:.0f}%",
+              delta=f"{mat_b.score - mat_a.score:+.0f}%")
 
     # ── Per-onderdeel tabel ───────────────────────────────────────────────────
     st.divider()
     st.markdown("#### Vergelijking per onderdeel")
 
-    dict_a = {m["categorie"]: m for m in mat_a}
-    dict_b = {m["categorie"]: m for m in mat_b}
+    dict_a = mat_a.per_categorie
+    dict_b = mat_b.per_categorie
     alle_cats = sorted(set(list(dict_a.keys()) + list(dict_b.keys())))
 
     rows = []
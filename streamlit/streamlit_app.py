@@ -10,9 +10,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 import streamlit as st
-from utils.data    import load_results, load_scenarios, load_materials, load_onderdelen, load_gebouw
+from utils.data    import (beschikbare_gebouwen, find_file, load_gebouw, load_materials, load_onderdelen,
+                           load_pareto, load_samenvatting, load_scenarios, portfolio_gebouwen)
 from utils.helpers import format_eur, format_co2
-from pages         import rankings, scatter, vergelijk
+from pages         import portfolio, rankings, scatter, vergelijk
 
 st.set_page_config(
     page_title="Gebouw Scenario Analyse",
@@ -30,44 +31,57 @@ h1, h2, h3 { font-family: 'DM Mono', monospace !important; letter-spacing: -0.02
 """, unsafe_allow_html=True)
 
 
+# ── Gebouw kiezen ────────────────────────────────────────────────────────────
+gebouw_ids = beschikbare_gebouwen()
+if not gebouw_ids:
+    find_file("results_gebouw_*.jsonl")  # toont foutmelding en stopt
+
+with st.sidebar:
+    # Per gebouw een eigen dataset (utils.data.DatasetCache); wisselen laadt alleen dat gebouw
+    gebouw_id = st.selectbox("Gebouw", gebouw_ids, key="gebouw") if len(gebouw_ids) > 1 else gebouw_ids[0]
+
+
 # ── Data laden ───────────────────────────────────────────────────────────────
-df_results = load_results()
-keuzes_map = load_scenarios()
+samenvatting = load_samenvatting(gebouw_id)   # rijen zelf worden per pagina opgehaald
+df_pareto  = load_pareto(gebouw_id)
+keuzes_map = load_scenarios(gebouw_id)        # keuzes per scenario_id op aanvraag
 mat_lookup = load_materials()
 ond_lookup = load_onderdelen()
-gebouw     = load_gebouw()
+gebouw     = load_gebouw(gebouw_id)
 afm        = gebouw.get("afmetingen", {})
-gebouw_id  = gebouw.get("gebouw_id", "onbekend")
+if keuzes_map.waarschuwing:
+    st.warning(keuzes_map.waarschuwing)
 
-prijs_min = float(df_results["cost_total"].min())
-prijs_max = float(df_results["cost_total"].max())
-co2_min   = float(df_results["co2_total"].min())
-co2_max   = float(df_results["co2_total"].max())
+prijs_min = samenvatting["prijs_min"]
+prijs_max = samenvatting["prijs_max"]
+co2_min   = samenvatting["co2_min"]
+co2_max   = samenvatting["co2_max"]
 
 
 # ── Sidebar ──────────────────────────────────────────────────────────────────
 with st.sidebar:
     st.markdown(f"### 🏗️ {gebouw_id}")
-    st.caption(f"{len(df_results):,} scenario's geanalyseerd")
+    st.caption(f"{samenvatting['aantal']:,} scenario's geanalyseerd")
     st.divider()
 
     pagina = st.radio(
         "Pagina",
-        ["📊 Rankings", "🌐 Scatter", "⚖️ Vergelijk"],
+        ["📊 Rankings", "🌐 Scatter", "⚖️ Vergelijk", "🏘️ Portfolio"],
         label_visibility="collapsed",
     )
     st.divider()
 
     st.markdown("**Filter**")
-    max_prijs = st.slider("Max prijs (€)", int(prijs_min), int(prijs_max), int(prijs_max), step=1000, format="€%d")
-    max_co2   = st.slider("Max CO₂ (kg)",  int(co2_min),  int(co2_max),  int(co2_max),  step=500,  format="%d kg")
+    # Filterstand per gebouw (eigen key), zodat wisselen de grenzen niet meeneemt
+    max_prijs = st.slider("Max prijs (€)", int(prijs_min), int(prijs_max), int(prijs_max), step=1000, format="€%d", key=f"max_prijs_{gebouw_id}")
+    max_co2   = st.slider("Max CO₂ (kg)",  int(co2_min),  int(co2_max),  int(co2_max),  step=500,  format="%d kg", key=f"max_co2_{gebouw_id}")
 
     if pagina == "📊 Rankings":
         st.divider()
         st.markdown("**Ranking type**")
         ranking_keuze = st.radio(
     "Ranking type",
-    ["Optimaal", "Goedkoopste", "Duurste", "Minste CO₂", "Meeste CO₂"],
+    ["Optimaal", "Goedkoopste", "Duurste", "Minste CO₂", "Meeste CO₂", "Pareto-front"],
     label_visibility="collapsed",
 )
         top_n = st.select_slider("Top N", options=[10, 20, 50, 100], value=20)
@@ -82,15 +96,18 @@ with st.sidebar:
 # ── Pagina routing ───────────────────────────────────────────────────────────
 if pagina == "📊 Rankings":
     rankings.render(
-        df_results, keuzes_map, mat_lookup, ond_lookup, afm,
-        max_prijs, max_co2, ranking_keuze, top_n,
+        samenvatting, keuzes_map, mat_lookup, ond_lookup, afm, gebouw_id,
+        max_prijs, max_co2, ranking_keuze, top_n, df_pareto,
     )
 
 elif pagina == "🌐 Scatter":
-    scatter.render(df_results, max_prijs, max_co2)
+    scatter.render(samenvatting, gebouw_id, max_prijs, max_co2, df_pareto)
 
 elif pagina == "⚖️ Vergelijk":
     vergelijk.render(
-        df_results, keuzes_map, mat_lookup, ond_lookup, afm,
+        samenvatting, keuzes_map, mat_lookup, ond_lookup, afm, gebouw_id,
         max_prijs, max_co2,
-    )
\ No newline at end of file
+    )
+
+elif pagina == "🏘️ Portfolio":
+    portfolio.render(portfolio_gebouwen())
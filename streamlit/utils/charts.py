@@ -1,5 +1,8 @@
 # utils/charts.py
 
+from typing import Optional
+
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -9,10 +12,16 @@ BORDER      = "#2a2d3a"
 TEXT        = "#e5e7eb"
 MUTED       = "#6b7280"
 
+# Boven dit aantal punten wordt de scatter een dichtheidsplot (2D-histogram),
+# zodat de payload naar de browser constant blijft (DICHTHEID_BINS^2 cellen)
+MAX_PUNTEN     = 50_000
+DICHTHEID_BINS = 200
+
 
-def bar_prijs(materialen: list) -> go.Figure:
-    cats  = [m["categorie"] for m in materialen]
-    vals  = [m["prijs"]     for m in materialen]
+def bar_prijs(materialen) -> go.Figure:
+    # materialen: utils.helpers.Uitsplitsing (kolommen al berekend)
+    cats  = materialen.categorie
+    vals  = materialen.prijs
     fig = px.bar(
         x=cats, y=vals,
         labels={"x": "Onderdeel", "y": "Prijs (€)"},
@@ -29,9 +38,9 @@ def bar_prijs(materialen: list) -> go.Figure:
     return fig
 
 
-def bar_co2(materialen: list) -> go.Figure:
-    cats = [m["categorie"] for m in materialen]
-    vals = [m["co2"]       for m in materialen]
+def bar_co2(materialen) -> go.Figure:
+    cats = materialen.categorie
+    vals = materialen.co2
     fig = px.bar(
         x=cats, y=vals,
         labels={"x": "Onderdeel", "y": "CO₂ (kg)"},
@@ -48,15 +57,13 @@ def bar_co2(materialen: list) -> go.Figure:
     return fig
 
 
-def radar(materialen: list) -> go.Figure | None:
+def radar(materialen) -> Optional[go.Figure]:
     if not materialen:
         return None
-    cats   = [m["categorie"] for m in materialen]
-    p_max  = max(m["prijs"] for m in materialen) or 1
-    c_max  = max(m["co2"]   for m in materialen) or 1
-    p_norm = [round(m["prijs"] / p_max * 100, 1) for m in materialen]
-    c_norm = [round(m["co2"]   / c_max * 100, 1) for m in materialen]
-    d_norm = [m["duurzaam"] * 100                 for m in materialen]
+    cats   = materialen.categorie
+    p_norm = materialen.prijs_norm
+    c_norm = materialen.co2_norm
+    d_norm = materialen.duurzaam_norm
 
     fig = go.Figure()
     fig.add_trace(go.Scatterpolar(r=p_norm + [p_norm[0]], theta=cats + [cats[0]], name="Prijs",     fill="toself", line_color="#f97316"))
@@ -75,10 +82,55 @@ def radar(materialen: list) -> go.Figure | None:
     return fig
 
 
-def scatter_prijs_co2(df, top_ids: set) -> go.Figure:
-    import pandas as pd
-    df = df.copy()
-    df["type"] = df["scenario_id"].apply(lambda x: "Top Optimaal" if x in top_ids else "Overig")
+def dichtheid_raster(prijs: np.ndarray, co2: np.ndarray, bins: int = DICHTHEID_BINS) -> dict:
+    """
+    Aantallen per cel van een bins x bins raster over prijs/CO2 (server-side
+    binning). Lege cellen zijn NaN, zodat ze transparant blijven.
+    """
+    if not len(prijs):
+        return {"aantal": 0, "x": [], "y": [], "z": [], "prijs_min": float("nan"), "co2_min": float("nan")}
+    telling, x_rand, y_rand = np.histogram2d(prijs, co2, bins=bins)
+    z = telling.T
+    z[z == 0] = np.nan
+    return {
+        "aantal":    int(len(prijs)),
+        "x":         (x_rand[:-1] + x_rand[1:]) / 2,
+        "y":         (y_rand[:-1] + y_rand[1:]) / 2,
+        "z":         z,
+        "prijs_min": float(prijs.min()),
+        "co2_min":   float(co2.min()),
+    }
+
+
+def _pareto_trace(df_pareto) -> go.Scatter:
+    return go.Scatter(
+        x=df_pareto["cost_total"], y=df_pareto["co2_total"],
+        mode="lines+markers", name="Pareto-front",
+        line=dict(color="#f97316", shape="hv"), marker=dict(size=6),
+        customdata=df_pareto["scenario_id"],
+        hovertemplate="Scenario %{customdata}<br>€ %{x:,.0f}<br>%{y:,.0f} kg<extra>Pareto</extra>",
+    )
+
+
+def _scatter_layout(fig: go.Figure):
+    fig.update_layout(
+        paper_bgcolor=DARK_BG, plot_bgcolor=CARD_BG, font_color=TEXT,
+        legend=dict(bgcolor=CARD_BG, bordercolor=BORDER),
+        height=600,
+        xaxis=dict(gridcolor=BORDER),
+        yaxis=dict(gridcolor=BORDER),
+    )
+
+
+def scatter_prijs_co2(df, top_ids: set, df_pareto=None, max_punten: int = MAX_PUNTEN) -> go.Figure:
+    if len(df) > max_punten:
+        raster = dichtheid_raster(df["cost_total"].values, df["co2_total"].values)
+        return dichtheid_prijs_co2(raster, df[df["scenario_id"].isin(top_ids)], df_pareto)
+
+    # Alleen de benodigde kolommen; isin i.p.v. een Python-apply per rij
+    df = df[["scenario_id", "cost_total", "co2_total"]].assign(
+        type=np.where(df["scenario_id"].isin(top_ids), "Top Optimaal", "Overig"),
+    )
 
     fig = px.scatter(
         df,
@@ -93,11 +145,85 @@ def scatter_prijs_co2(df, top_ids: set) -> go.Figure:
     )
     fig.update_traces(marker=dict(size=4),                      selector=dict(name="Overig"))
     fig.update_traces(marker=dict(size=9, symbol="star"),        selector=dict(name="Top Optimaal"))
+    if df_pareto is not None and not df_pareto.empty:
+        fig.add_trace(_pareto_trace(df_pareto))
+    _scatter_layout(fig)
+    return fig
+
+
+def dichtheid_prijs_co2(raster: dict, df_top, df_pareto=None) -> go.Figure:
+    """
+    Dichtheidsplot (aantal scenario's per cel, zie dichtheid_raster) met de
+    top-N en het Pareto-front als losse punten erover.
+    """
+    fig = go.Figure(go.Heatmap(
+        x=raster["x"], y=raster["y"], z=raster["z"],
+        colorscale="Viridis", name="Scenario's",
+        colorbar=dict(title="Aantal"),
+        hovertemplate="€ %{x:,.0f}<br>%{y:,.0f} kg<br>%{z:,} scenario's<extra></extra>",
+    ))
+    if df_top is not None and not df_top.empty:
+        fig.add_trace(go.Scatter(
+            x=df_top["cost_total"], y=df_top["co2_total"],
+            mode="markers", name="Top Optimaal",
+            marker=dict(size=9, symbol="star", color="#4ade80"),
+            customdata=df_top["scenario_id"],
+            hovertemplate="Scenario %{customdata}<br>€ %{x:,.0f}<br>%{y:,.0f} kg<extra>Top</extra>",
+        ))
+    if df_pareto is not None and not df_pareto.empty:
+        fig.add_trace(_pareto_trace(df_pareto))
     fig.update_layout(
+        title=f"Prijs vs CO₂ — dichtheid van {raster['aantal']:,} scenario's",
+        xaxis_title="Prijs (€)", yaxis_title="CO₂ (kg)",
+    )
+    _scatter_layout(fig)
+    return fig
+
+
+# ── Portfolio ────────────────────────────────────────────────────────────────
+
+def portfolio_fronten(overzichten: list) -> go.Figure:
+    """Pareto-front per gebouw in één prijs/CO₂-vlak, met goedkoopste en minste CO₂ gemarkeerd."""
+    fig = go.Figure()
+    for o in overzichten:
+        gid = o["gebouw_id"]
+        if o.get("pareto") is not None and not o["pareto"].empty:
+            front = o["pareto"].sort_values("cost_total")
+            fig.add_trace(go.Scatter(
+                x=front["cost_total"], y=front["co2_total"],
+                mode="lines+markers", name=gid, legendgroup=gid,
+                line=dict(shape="hv"), marker=dict(size=5),
+                customdata=front["scenario_id"],
+                hovertemplate=f"{gid}<br>Scenario %{{customdata}}<br>€ %{{x:,.0f}}<br>%{{y:,.0f}} kg<extra></extra>",
+            ))
+        punten = [o[k] for k in ("goedkoopste", "minste_co2") if o.get(k)]
+        if punten:
+            fig.add_trace(go.Scatter(
+                x=[p["cost_total"] for p in punten], y=[p["co2_total"] for p in punten],
+                mode="markers", name=f"{gid} — uitersten", legendgroup=gid, showlegend=False,
+                marker=dict(size=11, symbol="diamond", line=dict(width=1, color=TEXT)),
+                customdata=[p["scenario_id"] for p in punten],
+                hovertemplate=f"{gid}<br>Scenario %{{customdata}}<br>€ %{{x:,.0f}}<br>%{{y:,.0f}} kg<extra></extra>",
+            ))
+    fig.update_layout(title="Pareto-fronten per gebouw", xaxis_title="Prijs (€)", yaxis_title="CO₂ (kg)")
+    _scatter_layout(fig)
+    return fig
+
+
+def portfolio_bars(df) -> go.Figure:
+    """Per gebouw: prijs en CO₂ van het goedkoopste en het minste-CO₂ scenario naast elkaar (offsetgroups over twee assen)."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=df["Gebouw"], y=df["Goedkoopste prijs"], name="Goedkoopste — prijs", marker_color="#f97316", offsetgroup=1))
+    fig.add_trace(go.Bar(x=df["Gebouw"], y=df["Minste CO₂ prijs"],  name="Minste CO₂ — prijs",  marker_color="#fdba74", offsetgroup=2))
+    fig.add_trace(go.Bar(x=df["Gebouw"], y=df["Goedkoopste CO₂"],   name="Goedkoopste — CO₂",   marker_color="#60a5fa", yaxis="y2", offsetgroup=3))
+    fig.add_trace(go.Bar(x=df["Gebouw"], y=df["Minste CO₂ CO₂"],    name="Minste CO₂ — CO₂",    marker_color="#bfdbfe", yaxis="y2", offsetgroup=4))
+    fig.update_layout(
+        barmode="group", title="Goedkoopste vs minste CO₂ per gebouw",
         paper_bgcolor=DARK_BG, plot_bgcolor=CARD_BG, font_color=TEXT,
         legend=dict(bgcolor=CARD_BG, bordercolor=BORDER),
-        height=600,
+        height=420, margin=dict(t=50, b=20),
         xaxis=dict(gridcolor=BORDER),
-        yaxis=dict(gridcolor=BORDER),
+        yaxis=dict(title="Prijs (€)", gridcolor=BORDER),
+        yaxis2=dict(title="CO₂ (kg)", overlaying="y", side="right", showgrid=False),
     )
-    return fig
\ No newline at end of file
+    return fig
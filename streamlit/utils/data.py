@@ -1,16 +1,54 @@
 # utils/data.py
 
+#
+# Lui geopende data: de results worden niet als DataFrame ingeladen maar via
+# de ResultaatIndex (engine/resultaatindex.py, memmaps op schijf) bevraagd.
+# Samenvatting en top N komen uit de voorgesorteerde index, rijen worden per
+# pagina opgehaald en keuzes per scenario_id. Koude start en geheugen hangen
+# daardoor niet af van het aantal scenario's (alleen de allereerste keer
+# wordt de index gebouwd en naast de results weggeschreven).
+#
+# Meerdere gebouwen: alles is per gebouw_id. De results-index, ranks en het
+# Pareto-front van een gebouw zitten samen in een Dataset; de DatasetCache
+# houdt de recentst gebruikte gebouwen vast tot MAX_DATASETS_MB en laat
+# daarboven het langst niet gebruikte gebouw los. Wisselen van gebouw laadt
+# dus alleen de kolommen en ranks van dat gebouw.
+#
+
 import json
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 import streamlit as st
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from engine.loader    import find_results, find_scenarios, read_gebouwen, scenarios_gebouw_id, zoek_scenario
+from engine.materiaaltabel import MateriaalTabel, read_materiaal_tabel
+from engine.pareto    import pareto_front_punten
+from engine.resultaatindex import ResultaatIndex, read_resultaat_index
+from engine.scenarios import ScenarioRuimte, load_onderdeel_map
+from utils.charts     import dichtheid_raster
+
 
 def get_root() -> Path:
     # streamlit/ map zit in de project root
     return Path(__file__).resolve().parents[2]
 
 
+# Waar results/ranks/pareto per gebouw kunnen staan (gen_results e.d. en gen_portfolio)
+OUTPUT_MAPPEN = ("data/output", "data/output/portfolio")
+GEBOUWDATA    = ("data/gebouwdata/gebouwgegevens.json", "data/gebouwdata/portfolio.json")
+RESULTS_SUFFIXEN = (".kolommen", ".jsonl", ".jsonl.gz", ".jsonl.zst")
+
+# Geheugengrens voor de per-gebouw datasets (gemapte results + index)
+MAX_DATASETS_MB = 2048
+
+
 def find_file(pattern: str) -> Path:
     root = get_root()
     matches = sorted((root / "data/output").glob(pattern))
@@ -20,45 +58,317 @@ def find_file(pattern: str) -> Path:
     return matches[0]
 
 
-@st.cache_data
-def load_results() -> pd.DataFrame:
-    path = find_file("results_gebouw_*.jsonl")
-    rows = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
-    df = pd.DataFrame(rows)
+def _zoek_output(naam: str) -> Optional[Path]:
+    """Eerste data/output(/portfolio)/<naam> die bestaat."""
+    for map_ in OUTPUT_MAPPEN:
+        path = get_root() / map_ / naam
+        if path.exists():
+            return path
+    return None
 
-    # Optimaal score berekenen
-    p_min, p_max = df["cost_total"].min(), df["cost_total"].max()
-    c_min, c_max = df["co2_total"].min(),  df["co2_total"].max()
-    p_range = p_max - p_min or 1
-    c_range = c_max - c_min or 1
-    df["optimaal_score"] = (
-        (df["cost_total"] - p_min) / p_range +
-        (df["co2_total"]  - c_min) / c_range
-    ) / 2
 
-    return df
+def _results_pad(gebouw_id: str) -> Optional[Path]:
+    for map_ in OUTPUT_MAPPEN:
+        path = find_results(get_root() / map_, gebouw_id)
+        if path is not None:
+            return path
+    return None
 
 
-@st.cache_data
-def load_scenarios() -> dict:
-    path = get_root() / "data/output/scenarios.jsonl"
-    if not path.exists():
+def _gebouw_ids(prefix: str, suffixen) -> list:
+    # Een gebouw_id bevat geen punt: ranks_<g>.metrics.json, results_<g>.kolommen.index
+    # e.d. zijn geen gebouwen
+    ids = set()
+    for map_ in OUTPUT_MAPPEN:
+        for suffix in suffixen:
+            patroon = re.compile(re.escape(prefix) + r"([^.]+)" + re.escape(suffix))
+            for path in (get_root() / map_).glob(f"{prefix}*{suffix}"):
+                if (match := patroon.fullmatch(path.name)):
+                    ids.add(match.group(1))
+    return sorted(ids)
+
+
+@st.cache_data(ttl=60)
+def beschikbare_gebouwen() -> list:
+    """gebouw_ids met results (detailpagina's)."""
+    return _gebouw_ids("results_", RESULTS_SUFFIXEN)
+
+
+@st.cache_data(ttl=60)
+def portfolio_gebouwen() -> list:
+    """gebouw_ids met results of alleen ranks (portfolio-overzicht)."""
+    ranks = [g for g in _gebouw_ids("ranks_", (".json",)) if not g.startswith("v2_")]
+    return sorted(set(beschikbare_gebouwen()) | set(ranks))
+
+
+# ── Datasets per gebouw ──────────────────────────────────────────────────────
+
+class Dataset:
+    """Wat het dashboard per gebouw vasthoudt: results-index (memmaps) en voorberekende ranks."""
+
+    def __init__(self, gebouw_id: str, index: Optional[ResultaatIndex], ranks: Optional[dict]):
+        self.gebouw_id = gebouw_id
+        self.index     = index
+        self.ranks     = ranks
+        # Gemapte bytes: bovengrens van wat er van dit gebouw resident kan worden
+        arrays     = [*index.kolommen.values(), *index.afgeleid().values()] if index else []
+        self.bytes = sum(a.nbytes for a in arrays)
+
+
+class DatasetCache:
+    """
+    LRU van Datasets per gebouw_id, begrensd op het totaal aantal bytes.
+    Gedeeld door alle sessies (st.cache_resource), die elk in een eigen thread
+    draaien: de OrderedDict wordt alleen onder het lock aangeraakt. Laden
+    gebeurt buiten het lock, zodat een trage indexbouw andere gebouwen niet
+    blokkeert; laden twee sessies hetzelfde gebouw, dan wint de eerste.
+    """
+
+    def __init__(self, max_mb: float = MAX_DATASETS_MB):
+        self.max_bytes = max_mb * 1024 * 1024
+        self._items    = OrderedDict()
+        self._lock     = threading.Lock()
+
+    def get(self, gebouw_id: str, laad) -> Dataset:
+        with self._lock:
+            if gebouw_id in self._items:
+                self._items.move_to_end(gebouw_id)
+                return self._items[gebouw_id]
+        dataset = laad()
+        with self._lock:
+            if gebouw_id in self._items:
+                self._items.move_to_end(gebouw_id)
+                return self._items[gebouw_id]
+            self._items[gebouw_id] = dataset
+            # Het gevraagde gebouw blijft altijd staan, ook als het alleen al te groot is
+            while self._bytes() > self.max_bytes and len(self._items) > 1:
+                self._items.popitem(last=False)
+        return dataset
+
+    def _bytes(self) -> int:
+        return sum(d.bytes for d in self._items.values())
+
+    @property
+    def bytes(self) -> int:
+        with self._lock:
+            return self._bytes()
+
+    def __contains__(self, gebouw_id: str) -> bool:
+        with self._lock:
+            return gebouw_id in self._items
+
+
+@st.cache_resource
+def _datasets() -> DatasetCache:
+    return DatasetCache()
+
+
+def _laad_dataset(gebouw_id: str) -> Dataset:
+    path  = _results_pad(gebouw_id)
+    ranks = _zoek_output(f"ranks_{gebouw_id}.json")
+    return Dataset(
+        gebouw_id,
+        read_resultaat_index(path) if path is not None else None,
+        json.loads(ranks.read_text(encoding="utf-8")) if ranks is not None else None,
+    )
+
+
+def load_dataset(gebouw_id: str) -> Dataset:
+    return _datasets().get(gebouw_id, lambda: _laad_dataset(gebouw_id))
+
+
+def load_index(gebouw_id: str) -> ResultaatIndex:
+    """
+    Query-index over de results van een gebouw (kolommenmap of JSONL) met
+    optimaal_score: voorgesorteerde permutaties per rankingkolom +
+    2D-bereikindex op prijs/CO2. Staat als memmaps op schijf
+    (results_<gebouw>.<formaat>.index/) en wordt via de DatasetCache vastgehouden.
+    """
+    index = load_dataset(gebouw_id).index
+    if index is None:
+        find_file(f"results_{gebouw_id}.*")  # toont foutmelding en stopt
+    return index
+
+
+@st.cache_data(max_entries=64)
+def load_samenvatting(gebouw_id: str) -> dict:
+    """Aantal en min/max prijs/CO2 (uit de gesorteerde kolommen, zonder scan)."""
+    return load_index(gebouw_id).samenvatting()
+
+
+def _frame(gebouw_id: str, rijen) -> pd.DataFrame:
+    return pd.DataFrame(load_index(gebouw_id).rijen(rijen))
+
+
+@st.cache_data(max_entries=64)
+def load_pagina(gebouw_id: str, sleutel: str, aflopend: bool, max_prijs: float, max_co2: float,
+                pagina: int = 0, grootte: int = 20) -> pd.DataFrame:
+    """Eén pagina van de ranking op sleutel binnen de filters."""
+    rijen = load_index(gebouw_id).top(sleutel, aflopend, max_prijs, max_co2, (pagina + 1) * grootte)
+    return _frame(gebouw_id, rijen[pagina * grootte:])
+
+
+@st.cache_data(max_entries=64)
+def load_scenario_rijen(gebouw_id: str, scenario_ids: tuple) -> pd.DataFrame:
+    """Rijen van een handvol scenario_ids, in de gegeven volgorde (onbekende ids vallen weg)."""
+    index = load_index(gebouw_id)
+    rijen = [p for p in (index.positie(int(s)) for s in scenario_ids) if p is not None]
+    return _frame(gebouw_id, rijen)
+
+
+@st.cache_data(max_entries=8)
+def load_punten(gebouw_id: str, max_prijs: float, max_co2: float) -> pd.DataFrame:
+    """Alle rijen binnen de filters; alleen voor kleine selecties (scatter met losse punten)."""
+    return _frame(gebouw_id, load_index(gebouw_id).rijen_binnen(max_prijs, max_co2))
+
+
+@st.cache_data(max_entries=32)
+def load_dichtheid(gebouw_id: str, max_prijs: float, max_co2: float) -> dict:
+    """Dichtheidsraster (utils.charts.dichtheid_raster) van de gefilterde results, per filterstand gecached."""
+    return dichtheid_raster(*load_index(gebouw_id).punten_binnen(max_prijs, max_co2))
+
+
+@st.cache_data(max_entries=64)
+def load_pareto(gebouw_id: str) -> Optional[pd.DataFrame]:
+    """Pareto-front uit pareto_<gebouw>.json (gen_pareto.py), anders berekend uit de results (None zonder results)."""
+    path = _zoek_output(f"pareto_{gebouw_id}.json")
+    if path is not None:
+        front = json.loads(path.read_text(encoding="utf-8"))["front"]
+    else:
+        index = load_dataset(gebouw_id).index
+        if index is None:
+            return None
+        kol   = index.kolommen
+        front = pareto_front_punten(kol["cost_total"], kol["co2_total"], kol["scenario_id"])
+    return pd.DataFrame(front, columns=["scenario_id", "cost_total", "co2_total"])
+
+
+def _eerste(ranks: dict, naam: str) -> Optional[dict]:
+    """Beste record van ranking naam uit een ranks-document (top10_<naam> of top_<naam>)."""
+    for sleutel, records in ranks.items():
+        if sleutel.startswith("top") and sleutel.endswith(f"_{naam}") and records:
+            return records[0]
+    return None
+
+
+# Ranking (naam in ranks-documenten) -> kolom in de index
+OVERZICHT_RANKINGS = {"goedkoopste": "cost_total", "minste_co2": "co2_total", "optimaal": "optimaal_score"}
+
+
+@st.cache_data(max_entries=256)
+def load_overzicht(gebouw_id: str) -> dict:
+    """
+    Portfolio-regel van één gebouw: goedkoopste, minste CO2, optimaal en het
+    Pareto-front. Uit de voorberekende ranks als die er zijn, anders uit de
+    index (de eerste rij van elke permutatie).
+    """
+    dataset = load_dataset(gebouw_id)
+    beste, aantal = {}, 0
+    if dataset.ranks:
+        beste  = {naam: _eerste(dataset.ranks, naam) for naam in OVERZICHT_RANKINGS}
+        aantal = dataset.ranks.get("totaal_scenarios", 0)
+    index = dataset.index
+    if not (beste and all(beste.values())) and index is not None and index.n:
+        alles = float("inf")
+        beste = {
+            naam: {k: v.item() for k, v in index.rijen(index.top(sleutel, False, alles, alles, 1)).items()}
+            for naam, sleutel in OVERZICHT_RANKINGS.items()
+        }
+        aantal = index.n
+    return {"gebouw_id": gebouw_id, "aantal": aantal, **beste, "pareto": load_pareto(gebouw_id)}
+
+
+def _results_meta(gebouw_id: str) -> dict:
+    """meta.json van de results-kolommenmap van een gebouw; {} voor JSONL-results."""
+    path = _results_pad(gebouw_id)
+    if path is None or not path.is_dir():
+        return {}
+    return json.loads((path / "meta.json").read_text(encoding="utf-8"))
+
+
+@st.cache_resource(max_entries=8, ttl=60)
+def load_ruimte(gebouw_id: str) -> Tuple[Optional[ScenarioRuimte], Optional[str]]:
+    """
+    (scenarioruimte, waarschuwing) om de scenario_ids van de results van een
+    gebouw te decoderen. Kolommen-results hebben de assen waarmee ze berekend
+    zijn in hun meta (ook met --add-none of andere materialen). Zonder meta
+    wordt de ruimte uit de huidige materialen opgebouwd, zonder NONE-optie;
+    dat klopt alleen als de results daar ook mee berekend zijn.
+    """
+    meta = _results_meta(gebouw_id)
+    if meta.get("assen"):
+        return ScenarioRuimte(meta["assen"], gebouw_id), None
+    if gebouw_id not in load_gebouwen():
+        return None, None  # results zonder gebouwgegevens: geen scenarioruimte
+    root   = get_root()
+    ruimte = ScenarioRuimte.van_gebouw(
+        load_gebouw(gebouw_id),
+        [json.loads(l) for l in (root / "data/brondata/materials.jsonl").read_text(encoding="utf-8").splitlines() if l.strip()],
+        load_onderdeel_map(json.loads(l) for l in (root / "data/brondata/onderdelen.jsonl").read_text(encoding="utf-8").splitlines() if l.strip()),
+    )
+    return ruimte, (
+        "De results hebben geen assen in hun meta (JSONL): materiaalkeuzes zijn afgeleid uit de "
+        "huidige materialen zonder NONE-optie en kloppen niet als de results met --add-none of "
+        "andere materialen zijn berekend. Gebruik --formaat kolommen of een scenario-export."
+    )
+
+
+@st.cache_data(ttl=60)
+def _export_gebouw_id() -> Optional[str]:
+    """gebouw_id van de scenario-export in data/output, of None."""
+    path = find_scenarios(get_root() / "data/output")
+    return scenarios_gebouw_id(path) if path is not None else None
+
+
+@st.cache_data(max_entries=1024, ttl=60)
+def load_keuzes(gebouw_id: str, scenario_id: int) -> dict:
+    """
+    Keuzes van één scenario, op aanvraag: uit de assen in de results-meta, anders
+    random access in de export (alleen als die bij dit gebouw hoort), anders uit
+    de opnieuw opgebouwde scenarioruimte (zie load_ruimte).
+    """
+    ruimte, waarschuwing = load_ruimte(gebouw_id)
+    if ruimte is not None and waarschuwing is None:
+        return ruimte.keuzes(scenario_id) if 1 <= scenario_id <= ruimte.totaal else {}
+    path = find_scenarios(get_root() / "data/output")
+    if path is not None:
+        record = zoek_scenario(path, scenario_id)
+        if record and str(record.get("gebouw_id")) == gebouw_id:
+            return record["keuzes"]
+    if ruimte is None:
         return {}
-    lookup = {}
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if line.strip():
-            s = json.loads(line)
-            lookup[s["scenario_id"]] = s["keuzes"]
-    return lookup
+    return ruimte.keuzes(scenario_id) if 1 <= scenario_id <= ruimte.totaal else {}
+
+
+class Keuzes:
+    """Keuzes per scenario_id van één gebouw via load_keuzes; zelfde .get() als de vroegere dict van alle scenario's."""
+
+    def __init__(self, gebouw_id: str):
+        self.gebouw_id = gebouw_id
+
+    @property
+    def waarschuwing(self) -> Optional[str]:
+        """Gezet als de keuzes niet uit de results-meta komen en er geen export van dit gebouw is."""
+        _, waarschuwing = load_ruimte(self.gebouw_id)
+        if waarschuwing is not None and _export_gebouw_id() == self.gebouw_id:
+            return None
+        return waarschuwing
+
+    def get(self, scenario_id: int, default=None):
+        return load_keuzes(self.gebouw_id, int(scenario_id)) or default
+
+    def __getitem__(self, scenario_id: int) -> dict:
+        return load_keuzes(self.gebouw_id, int(scenario_id))
+
+
+def load_scenarios(gebouw_id: str) -> Keuzes:
+    return Keuzes(gebouw_id)
 
 
 @st.cache_data
-def load_materials() -> dict:
-    path = get_root() / "data/brondata/materials.jsonl"
-    return {
-        m["material_id"]: m
-        for m in [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
-    }
+def load_materials() -> MateriaalTabel:
+    # Gecompileerde tabel (materials.tabel); werkt ook als dict material_id -> record
+    return read_materiaal_tabel(get_root() / "data/brondata/materials.jsonl")
 
 
 @st.cache_data
@@ -71,7 +381,20 @@ def load_onderdelen() -> dict:
 
 
 @st.cache_data
-def load_gebouw() -> dict:
-    path = get_root() / "data/gebouwdata/gebouwgegevens.json"
-    data = json.loads(path.read_text(encoding="utf-8"))
-    return data[0] if isinstance(data, list) else data
\ No newline at end of file
+def load_gebouwen() -> dict:
+    """gebouw_id -> gebouw uit gebouwgegevens.json en (als die er is) portfolio.json."""
+    gebouwen = {}
+    for naam in GEBOUWDATA:
+        path = get_root() / naam
+        if path.exists():
+            for g in read_gebouwen(path):
+                gebouwen.setdefault(str(g.get("gebouw_id")), g)
+    return gebouwen
+
+
+def load_gebouw(gebouw_id: Optional[str] = None) -> dict:
+    """Eén gebouw; zonder gebouw_id het eerste (zoals voorheen), onbekend: alleen het gebouw_id."""
+    gebouwen = load_gebouwen()
+    if gebouw_id is None:
+        return next(iter(gebouwen.values()), {})
+    return gebouwen.get(gebouw_id, {"gebouw_id": gebouw_id})
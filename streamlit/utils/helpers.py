@@ -1,7 +1,20 @@
 # utils/helpers.py
 
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from engine.incrementeel import inhoud_hash
+
 PANEEL_M2_PER_STUK = 1.7
 
+# Aantal materiaaluitsplitsingen dat in het geheugen blijft (LRU)
+MAX_UITSPLITSINGEN = 512
+
 VELD_MAP = {
     "01": ("beglazing_m2",  "m2"),
     "03": ("deuren_stuks",  "stuks"),
@@ -52,13 +65,86 @@ def bereken_materialen(scenario_id: int, keuzes_map: dict, mat_lookup: dict, ond
     return materialen
 
 
-def duurzaam_score(materialen: list) -> float:
+class Uitsplitsing:
+    """
+    Materiaaluitsplitsing van één scenario, één keer berekend en gedeeld door
+    tabel, bar charts, radar en vergelijking: de regels van bereken_materialen
+    plus kolommen (categorie, prijs, co2, duurzaam) en de afgeleide waarden.
+    Itereren geeft de regels, zodat hij ook als lijst te gebruiken is.
+    """
+
+    def __init__(self, materialen: list):
+        self.materialen = tuple(materialen)
+        self.categorie  = [m["categorie"] for m in materialen]
+        self.prijs      = np.array([m["prijs"]    for m in materialen], dtype=np.float64)
+        self.co2        = np.array([m["co2"]      for m in materialen], dtype=np.float64)
+        self.duurzaam   = np.array([m["duurzaam"] for m in materialen], dtype=np.int8)
+        self.per_categorie = {m["categorie"]: m for m in materialen}
+        self.score      = round(np.count_nonzero(self.duurzaam) / len(materialen) * 100, 1) if materialen else 0.0
+
+        # Radar: genormaliseerd op het maximum per as (0-100)
+        p_max = max(self.prijs.tolist(), default=0) or 1
+        c_max = max(self.co2.tolist(), default=0) or 1
+        self.prijs_norm    = [round(p / p_max * 100, 1) for p in self.prijs.tolist()]
+        self.co2_norm      = [round(c / c_max * 100, 1) for c in self.co2.tolist()]
+        self.duurzaam_norm = [d * 100 for d in self.duurzaam.tolist()]
+
+    def __iter__(self):
+        return iter(self.materialen)
+
+    def __len__(self) -> int:
+        return len(self.materialen)
+
+
+class UitsplitsingCache:
+    """LRU-cache van Uitsplitsingen op (gebouw, scenario_id, materialenversie, invoerhashes)."""
+
+    def __init__(self, max_grootte: int = MAX_UITSPLITSINGEN):
+        self.max_grootte = max_grootte
+        self._items      = OrderedDict()
+
+    def get(self, sleutel: tuple, bereken) -> Uitsplitsing:
+        if sleutel in self._items:
+            self._items.move_to_end(sleutel)
+            return self._items[sleutel]
+        uitsplitsing = self._items[sleutel] = Uitsplitsing(bereken())
+        if len(self._items) > self.max_grootte:
+            self._items.popitem(last=False)
+        return uitsplitsing
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Module-niveau: overleeft de reruns van Streamlit (modules worden niet opnieuw geïmporteerd)
+UITSPLITSINGEN = UitsplitsingCache()
+
+
+def uitsplitsing(gebouw_id: str, scenario_id: int, keuzes_map: dict, mat_lookup, ond_lookup: dict, afm: dict) -> Uitsplitsing:
+    """
+    Gememoiseerde bereken_materialen. De materialenversie is MateriaalTabel.versie
+    (inhoudshash); zonder versie (gewone dict) wordt niet gecached. Afmetingen,
+    keuzes en onderdeelnamen gaan als inhoudshash mee in de sleutel, zodat een
+    gewijzigd gebouw of scenariobestand nooit een oude uitsplitsing oplevert.
+    """
+    scenario_id = int(scenario_id)
+    bereken     = lambda: bereken_materialen(scenario_id, keuzes_map, mat_lookup, ond_lookup, afm)
+    versie      = getattr(mat_lookup, "versie", None)
+    if versie is None:
+        return Uitsplitsing(bereken())
+    invoer = inhoud_hash([afm, keuzes_map.get(scenario_id, {}), ond_lookup])
+    return UITSPLITSINGEN.get((gebouw_id, scenario_id, versie, invoer), bereken)
+
+
+def duurzaam_score(materialen) -> float:
+    if isinstance(materialen, Uitsplitsing):
+        return materialen.score
     if not materialen:
         return 0.0
     return round(sum(1 for m in materialen if m["duurzaam"]) / len(materialen) * 100, 1)
 
 
-def materialen_df_display(materialen: list):
+def materialen_df_display(materialen):
     import pandas as pd
     return pd.DataFrame([{
         "Onderdeel": m["categorie"],
@@ -67,4 +153,4 @@ def materialen_df_display(materialen: list):
         "Prijs":     f"€ {m['prijs']:,.2f}",
         "CO₂":       f"{m['co2']:,.2f} kg",
         "Duurzaam":  "✓" if m["duurzaam"] else "✗",
-    } for m in materialen])
\ No newline at end of file
+    } for m in materialen])
@@ -0,0 +1,61 @@
+# tests/conftest.py
+#
+# Gedeelde fixtures: het meegeleverde gebouw + materialen uit data/, en een
+# brute-force berekening van alle scenario's om snelle paden tegen te toetsen.
+#
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.calculator     import bepaal_factor_vector, bereken_batch
+from engine.constraints    import RegelSet, load_constraints
+from engine.loader         import read_gebouw, read_jsonl
+from engine.materiaaltabel import MateriaalTabel
+from engine.scenarios      import ScenarioRuimte, load_onderdeel_map
+
+
+@pytest.fixture(scope="session")
+def gebouw():
+    return read_gebouw(ROOT / "data/gebouwdata/gebouwgegevens.json")
+
+
+@pytest.fixture(scope="session")
+def materials():
+    return list(read_jsonl(ROOT / "data/brondata/materials.jsonl"))
+
+
+@pytest.fixture(scope="session")
+def tabel(materials):
+    return MateriaalTabel.van_records(materials)
+
+
+@pytest.fixture(scope="session")
+def ruimte(gebouw, materials):
+    """Scenarioruimte met NONE-optie (~230k scenario's), C01 is dan actief."""
+    oid_map = load_onderdeel_map(read_jsonl(ROOT / "data/brondata/onderdelen.jsonl"))
+    return ScenarioRuimte.van_gebouw(gebouw, materials, oid_map, add_none=True)
+
+
+@pytest.fixture(scope="session")
+def regels(ruimte):
+    return RegelSet(load_constraints(ROOT / "data/brondata/constraints.jsonl"), ruimte)
+
+
+def bereken_alles(ruimte, gebouw, tabel, scenario_ids=None):
+    """Brute force: prijs + CO2 voor scenario_ids (default: de hele ruimte)."""
+    if scenario_ids is None:
+        scenario_ids = np.arange(1, ruimte.totaal + 1, dtype=np.int64)
+    materiaal_index, prijzen, co2s = tabel.arrays()
+    matrix     = ruimte.vertaal(ruimte.index_ids(scenario_ids), materiaal_index)
+    prijs, co2 = bereken_batch(matrix, bepaal_factor_vector(ruimte.onderdeel_ids, gebouw), prijzen, co2s)
+    return {"scenario_id": scenario_ids, "cost_total": prijs, "co2_total": co2}
+
+
+@pytest.fixture(scope="session")
+def alle_results(ruimte, gebouw, tabel):
+    return bereken_alles(ruimte, gebouw, tabel)
@@ -0,0 +1,67 @@
+# tests/test_constraints.py
+import numpy as np
+import pytest
+
+from conftest import bereken_alles
+from engine.constraints import voldoet_aan_constraints
+from engine.ranking     import filter_binnen_grenzen, zoek_binnen_grenzen
+
+
+def geldige_ids(regels):
+    return np.concatenate([np.arange(a, b, dtype=np.int64) for a, b in regels.geldige_bereiken()])
+
+
+def test_regelset_gelijk_aan_brute_force(ruimte, regels):
+    """Gesnoeide id-bereiken == alle scenario's zonder geschonden regel."""
+    alle = np.arange(1, ruimte.totaal + 1, dtype=np.int64)
+    geldig = alle[regels.eerste_schending(ruimte.index_ids(alle)) < 0]
+    assert regels.actief, "verwacht minstens één actieve regel (C01 met --add-none)"
+    assert len(geldig) < ruimte.totaal
+    assert np.array_equal(geldige_ids(regels), geldig)
+    assert regels.aantal_geldig() == len(geldig)
+
+
+@pytest.mark.parametrize("max_scenarios", [1, 50_000, 10**12])
+def test_max_scenarios_telt_geldige(regels, max_scenarios):
+    ids = np.concatenate(list(regels.id_blokken(65_536, max_scenarios)))
+    assert len(ids) == min(max_scenarios, regels.aantal_geldig())
+    assert np.array_equal(ids, geldige_ids(regels)[:len(ids)])
+    delen = [np.concatenate(list(regels.id_blokken(65_536, bereik=b))) for b in regels.shards(3, max_scenarios)]
+    assert np.array_equal(np.concatenate(delen), ids)
+
+
+@pytest.mark.parametrize("kwantielen, key, reverse", [
+    ((0.20, 0.60), "co2_total",  False),
+    ((0.05, 0.30), "cost_total", True),
+    ((0.50, 0.51), "co2_total",  True),
+])
+def test_zoek_binnen_grenzen_gelijk_aan_filter(ruimte, regels, gebouw, tabel, alle_results, kwantielen, key, reverse):
+    """Branch-and-bound met haalbare grenzen == brute-force filter over de geldige scenario's."""
+    prijs   = alle_results["cost_total"]
+    grenzen = {
+        "cost_total": tuple(float(np.quantile(prijs, q)) for q in kwantielen),
+        "co2_total":  (None, float(np.quantile(alle_results["co2_total"], 0.9))),
+    }
+    geldig  = bereken_alles(ruimte, gebouw, tabel, geldige_ids(regels))
+
+    verwacht, binnen = filter_binnen_grenzen(geldig, grenzen, key, reverse, top_n=25)
+    records, stat    = zoek_binnen_grenzen(ruimte, ruimte.bijdragen(tabel, gebouw), grenzen, key, reverse, 25, regels)
+
+    assert binnen > 25
+    assert [r["scenario_id"] for r in records] == [r["scenario_id"] for r in verwacht]
+    assert [(r["cost_total"], r["co2_total"]) for r in records] == [(r["cost_total"], r["co2_total"]) for r in verwacht]
+    assert stat["doorgerekend"] < ruimte.totaal
+
+
+def test_voldoet_aan_constraints(ruimte, regels):
+    """Grenzen op een record zoals voorheen; met een RegelSet per keuzes-dict gelijk aan eerste_schending."""
+    grenzen = {"totaal_prijs": {"min": 10, "max": 20}, "totaal_mg_co2": {"max": 5}}
+    assert voldoet_aan_constraints({"totaal_prijs": 15, "totaal_mg_co2": 5}, grenzen)
+    assert not voldoet_aan_constraints({"totaal_prijs": 21, "totaal_mg_co2": 5}, grenzen)
+    assert not voldoet_aan_constraints({"totaal_prijs": 15}, grenzen)
+
+    ids    = np.random.default_rng(2).integers(1, ruimte.totaal + 1, 2000)
+    geldig = regels.eerste_schending(ruimte.index_ids(ids)) < 0
+    assert 0 < geldig.sum() < len(ids)
+    for record, verwacht in zip(ruimte.records(ids), geldig.tolist()):
+        assert voldoet_aan_constraints(record, regels) == verwacht
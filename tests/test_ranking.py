@@ -0,0 +1,102 @@
+# tests/test_ranking.py
+import numpy as np
+import pytest
+
+from conftest           import ROOT
+from engine.constraints import RegelSet, load_constraints
+from engine.pareto      import ParetoFront, pareto_front_punten, pareto_front_ruimte
+from engine.ranking     import extremen_ruimte, k_beste_combinaties, rank_ruimte, top_n_indices
+
+
+def naief_gesorteerd(results, key, reverse, top_n):
+    """Alle results volledig sorteren; gelijke waarden op scenario_id."""
+    waarden = results[key]
+    rijen   = sorted(range(len(waarden)), key=lambda i: (-waarden[i] if reverse else waarden[i], results["scenario_id"][i]))
+    return [int(results["scenario_id"][i]) for i in rijen[:top_n]]
+
+
+def naieve_front(cost, co2, ids):
+    """O(n²): punten die door geen enkel ander punt gedomineerd worden; bij gelijke punten het laagste id."""
+    front = []
+    for i in range(len(cost)):
+        beter = (cost <= cost[i]) & (co2 <= co2[i]) & ((cost < cost[i]) | (co2 < co2[i]))
+        gelijk = (cost == cost[i]) & (co2 == co2[i]) & (ids < ids[i])
+        if not beter.any() and not gelijk.any():
+            front.append((float(cost[i]), float(co2[i]), int(ids[i])))
+    return sorted(front)
+
+
+def als_tuples(punten):
+    return sorted((p["cost_total"], p["co2_total"], p["scenario_id"]) for p in punten)
+
+
+@pytest.mark.parametrize("key, reverse", [
+    ("cost_total", False), ("cost_total", True), ("co2_total", False), ("co2_total", True),
+])
+def test_rank_ruimte_gelijk_aan_naief_sorteren(ruimte, gebouw, tabel, alle_results, key, reverse):
+    records = rank_ruimte(ruimte, ruimte.bijdragen(tabel, gebouw), key, reverse, top_n=50)
+    assert [r["scenario_id"] for r in records] == naief_gesorteerd(alle_results, key, reverse, 50)
+    rijen = np.asarray([r["scenario_id"] for r in records]) - 1
+    assert [r[key] for r in records] == alle_results[key][rijen].tolist()
+
+
+@pytest.mark.parametrize("key, reverse", [("cost_total", False), ("co2_total", True)])
+def test_rank_ruimte_met_regels_gelijk_aan_geldige_results(ruimte, gebouw, tabel, alle_results, key, reverse):
+    """--direct met constraints: alleen geldige scenario's, zoals de results van gen_results."""
+    kolommen = ruimte.bijdragen(tabel, gebouw)
+    # Naast C01 een regel die de beste optie van de eerste as verbiedt, zodat de top zeker verandert
+    oid, ids = ruimte.assen[0]
+    beste    = np.asarray(kolommen[key][0])
+    verboden = ids[int(beste.argmax() if reverse else beste.argmin())]
+    extra    = {"constraint_id": "T01", "type": "requires", "if": [],
+                "then": [{"onderdeel_id": oid, "op": "!=", "value": verboden}]}
+    regels   = RegelSet([*load_constraints(ROOT / "data/brondata/constraints.jsonl"), extra], ruimte)
+
+    geldig   = regels.eerste_schending(ruimte.index_ids(alle_results["scenario_id"])) < 0
+    results  = {k: v[geldig] for k, v in alle_results.items()}
+    records  = rank_ruimte(ruimte, kolommen, key, reverse, top_n=50, regels=regels)
+    assert [r["scenario_id"] for r in records] == naief_gesorteerd(results, key, reverse, 50)
+    assert records != rank_ruimte(ruimte, kolommen, key, reverse, top_n=50)
+
+    extremen = extremen_ruimte(kolommen, ruimte, regels)
+    for k in ("cost_total", "co2_total"):
+        assert extremen[k] == (results[k].min(), results[k].max())
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_k_beste_combinaties_gelijk_aan_product(reverse):
+    rng       = np.random.default_rng(11)
+    bijdragen = [rng.integers(0, 20, n).astype(float).tolist() for n in (4, 1, 6, 3, 5)]
+    product   = np.array(np.meshgrid(*bijdragen, indexing="ij")).reshape(len(bijdragen), -1).sum(axis=0)
+    beste     = k_beste_combinaties(bijdragen, 40, reverse)
+    sommen    = [sum(b[i] for b, i in zip(bijdragen, c)) for c in beste]
+    assert sommen == sorted(product.tolist(), reverse=reverse)[:40]
+    assert len({tuple(c) for c in beste}) == len(beste)
+    assert len(k_beste_combinaties(bijdragen, 10**6, reverse)) == len(product)
+
+
+def test_top_n_indices_gelijk_aan_sorted():
+    waarden = np.random.default_rng(5).integers(0, 30, 2000).astype(float)
+    for reverse in (False, True):
+        verwacht = sorted(range(len(waarden)), key=lambda i: -waarden[i] if reverse else waarden[i])[:100]
+        assert top_n_indices(waarden, 100, reverse).tolist() == verwacht
+
+
+def test_pareto_gelijk_aan_naieve_front(ruimte, gebouw, tabel, alle_results):
+    cost, co2, ids = alle_results["cost_total"], alle_results["co2_total"], alle_results["scenario_id"]
+    # Naïef (O(n²)) op een steekproef
+    rng  = np.random.default_rng(1)
+    keus = np.unique(rng.choice(len(ids), 3000, replace=False))
+    assert als_tuples(pareto_front_punten(cost[keus], co2[keus], ids[keus])) == naieve_front(cost[keus], co2[keus], ids[keus])
+
+    # Volledig: elk punt wordt door (of door een gelijk) frontpunt gedekt, en de front zelf is naïef een front
+    volledig = als_tuples(pareto_front_punten(cost, co2, ids))
+    f_cost, f_co2, f_ids = (np.asarray(k) for k in zip(*volledig))
+    laagste = np.minimum.accumulate(f_co2)[np.searchsorted(f_cost, cost, side="right") - 1]
+    assert (laagste <= co2).all()
+    assert naieve_front(f_cost, f_co2, f_ids) == volledig
+    assert als_tuples(pareto_front_ruimte(ruimte, ruimte.bijdragen(tabel, gebouw))) == volledig
+
+    records = ({"scenario_id": s, "cost_total": c, "co2_total": e}
+               for s, c, e in zip(ids.tolist(), cost.tolist(), co2.tolist()))
+    assert als_tuples(ParetoFront().verwerk(records).punten()) == volledig
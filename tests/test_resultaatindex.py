@@ -0,0 +1,96 @@
+# tests/test_resultaatindex.py
+import numpy as np
+import pytest
+
+from engine.loader         import find_results
+from engine.resultaatindex import CO2, OPTIMAAL, PRIJS, ResultaatIndex, index_pad, optimaal_kolom, read_resultaat_index
+from engine.writer         import JsonlWriter
+
+
+def brute_top(kolommen, sleutel, aflopend, max_prijs, max_co2, n):
+    """Filteren + volledig sorteren; gelijke waarden op rijvolgorde (zoals sorted())."""
+    rijen   = np.flatnonzero((kolommen[PRIJS] <= max_prijs) & (kolommen[CO2] <= max_co2))
+    waarden = kolommen[sleutel][rijen]
+    return rijen[np.lexsort((rijen, -waarden if aflopend else waarden))][:n]
+
+
+def met_optimaal(kolommen):
+    return {**kolommen, OPTIMAAL: optimaal_kolom(kolommen[PRIJS], kolommen[CO2])}
+
+
+@pytest.fixture(scope="module")
+def echte_kolommen(alle_results):
+    return met_optimaal(alle_results)
+
+
+@pytest.fixture(scope="module")
+def ruwe_kolommen():
+    """Willekeurige volgorde met veel gelijke waarden (hele getallen)."""
+    rng = np.random.default_rng(7)
+    n   = 50_000
+    return met_optimaal({
+        "scenario_id": rng.permutation(np.arange(1, 3 * n, 3, dtype=np.int64)),
+        PRIJS:         rng.integers(0, 500, n).astype(np.float64),
+        CO2:           rng.integers(0, 200, n).astype(np.float64),
+    })
+
+
+def grenzen(kolommen):
+    """Van (bijna) alles tot heel streng, zodat zowel scannen als prefix-filteren gebruikt wordt."""
+    p, c = kolommen[PRIJS], kolommen[CO2]
+    paren = [(1.0, 1.0), (0.5, 0.9), (0.9, 0.05), (0.02, 1.0), (0.1, 0.1), (0.001, 0.001)]
+    return [(float(np.quantile(p, a)), float(np.quantile(c, b))) for a, b in paren] + [(-1.0, np.inf)]
+
+
+@pytest.mark.parametrize("bron", ["echte_kolommen", "ruwe_kolommen"])
+def test_top_en_aantal_gelijk_aan_brute_force(request, bron):
+    kolommen = request.getfixturevalue(bron)
+    index    = ResultaatIndex.bouw(kolommen, blok=4096)
+    for max_prijs, max_co2 in grenzen(kolommen):
+        binnen = (kolommen[PRIJS] <= max_prijs) & (kolommen[CO2] <= max_co2)
+        assert index.aantal(max_prijs, max_co2) == int(binnen.sum())
+        assert np.array_equal(np.sort(index.rijen_binnen(max_prijs, max_co2)), np.flatnonzero(binnen))
+        for sleutel in (PRIJS, CO2, OPTIMAAL):
+            for aflopend in (False, True):
+                for n in (1, 10, 1000):
+                    verwacht = brute_top(kolommen, sleutel, aflopend, max_prijs, max_co2, n)
+                    assert np.array_equal(index.top(sleutel, aflopend, max_prijs, max_co2, n), verwacht), \
+                        (sleutel, aflopend, max_prijs, max_co2, n)
+
+
+def test_samenvatting_en_positie(ruwe_kolommen):
+    index = ResultaatIndex.bouw(ruwe_kolommen)
+    s     = index.samenvatting()
+    assert s["aantal"] == len(ruwe_kolommen[PRIJS])
+    assert (s["prijs_min"], s["prijs_max"]) == (ruwe_kolommen[PRIJS].min(), ruwe_kolommen[PRIJS].max())
+    assert (s["co2_min"], s["co2_max"]) == (ruwe_kolommen[CO2].min(), ruwe_kolommen[CO2].max())
+    for rij in (0, 17, len(ruwe_kolommen[PRIJS]) - 1):
+        assert index.positie(int(ruwe_kolommen["scenario_id"][rij])) == rij
+    assert index.positie(2) is None
+
+
+def test_geschreven_index_zelfde_als_in_geheugen(tmp_path, echte_kolommen):
+    index = ResultaatIndex.bouw(echte_kolommen, blok=4096)
+    index.schrijf(tmp_path / "results_test.kolommen.index", {"test": 1}, [*echte_kolommen])
+    geladen = ResultaatIndex.laad(tmp_path / "results_test.kolommen.index")
+    for max_prijs, max_co2 in grenzen(echte_kolommen):
+        assert geladen.aantal(max_prijs, max_co2) == index.aantal(max_prijs, max_co2)
+        assert np.array_equal(geladen.top(OPTIMAAL, False, max_prijs, max_co2, 25),
+                              index.top(OPTIMAAL, False, max_prijs, max_co2, 25))
+    assert geladen.samenvatting() == index.samenvatting()
+
+
+def test_eigen_index_per_formaat(tmp_path, ruwe_kolommen):
+    """results_<g>.jsonl en .jsonl.gz naast elkaar: elk een eigen index, en de index is geen results-bestand."""
+    records = [{"scenario_id": int(s), "cost_total": float(p), "co2_total": float(c)}
+               for s, p, c in zip(*(ruwe_kolommen[k][:1000] for k in ("scenario_id", PRIJS, CO2)))]
+    paden = [tmp_path / "results_gebouw_001.jsonl", tmp_path / "results_gebouw_001.jsonl.gz"]
+    for pad, deel in zip(paden, (records, records[:500])):
+        with JsonlWriter(pad) as w:
+            w.schrijf_veel(deel)
+
+    assert len({index_pad(p) for p in paden}) == 2
+    for _ in range(2):  # tweede keer uit de geschreven index
+        assert [read_resultaat_index(p).n for p in paden] == [1000, 500]
+    assert all(index_pad(p).is_dir() for p in paden)
+    assert find_results(tmp_path) in paden
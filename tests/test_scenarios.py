@@ -0,0 +1,49 @@
+# tests/test_scenarios.py
+import numpy as np
+import pytest
+
+from engine.loader import is_compact, read_scenario_ids, read_scenarios, scenarios_gebouw_id, zoek_scenarios
+from engine.writer import JsonlWriter, ScenarioWriter
+
+MAX_SCENARIOS = 40_000
+
+
+@pytest.fixture(scope="module")
+def bestanden(tmp_path_factory, ruimte, regels):
+    """Dezelfde scenario's (met constraints, dus niet aaneengesloten) als .scen en als scenarios.jsonl."""
+    map_ = tmp_path_factory.mktemp("scenarios")
+    scen, jsonl = map_ / "scenarios.scen", map_ / "scenarios.jsonl"
+    with ScenarioWriter(scen, ruimte.assen, ruimte.gebouw_id) as w:
+        for ids in regels.id_blokken(4096, MAX_SCENARIOS):
+            w.schrijf(ids)
+    with JsonlWriter(jsonl) as w:
+        w.schrijf_veel(ruimte.iter_scenarios(MAX_SCENARIOS, regels))
+    return scen, jsonl
+
+
+def test_scen_round_trip_gelijk_aan_jsonl(bestanden, ruimte):
+    scen, jsonl = bestanden
+    assert is_compact(scen) and not is_compact(jsonl)
+    assert scenarios_gebouw_id(scen) == scenarios_gebouw_id(jsonl) == str(ruimte.gebouw_id) != "None"
+    compact, regels_jsonl = list(read_scenarios(scen)), list(read_scenarios(jsonl))
+    assert len(compact) == MAX_SCENARIOS
+    assert compact == regels_jsonl
+    assert np.array_equal(np.concatenate(list(read_scenario_ids(scen, 1000))),
+                          [s["scenario_id"] for s in regels_jsonl])
+
+
+def test_zoek_scenarios_gelijk_voor_beide_formaten(bestanden, ruimte):
+    scen, jsonl = bestanden
+    ids    = [s["scenario_id"] for s in read_scenarios(scen)]
+    rng    = np.random.default_rng(3)
+    vraag  = [*rng.choice(ids, 50, replace=False).tolist(), ids[0], ids[-1]]
+    # Ontbrekend: buiten de ruimte, en een id dat door een constraint is weggesnoeid
+    weg    = sorted(set(range(ids[0], ids[-1] + 1)) - set(ids))[:1]
+    assert weg
+    vraag += [0, ruimte.totaal + 1, *weg]
+
+    compact, regels_jsonl = zoek_scenarios(scen, vraag), zoek_scenarios(jsonl, vraag)
+    assert compact == regels_jsonl
+    assert set(compact) == set(vraag) & set(ids)
+    for sid, s in compact.items():
+        assert s["keuzes"] == ruimte.keuzes(sid)
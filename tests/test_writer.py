@@ -0,0 +1,54 @@
+# tests/test_writer.py
+import numpy as np
+import pytest
+
+import engine.writer
+from engine.loader import read_jsonl, read_kolommen
+from engine.writer import JsonlWriter, KolomWriter, voeg_jsonl_samen, voeg_kolommen_samen
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz", ".jsonl.zst"])
+def test_samengevoegde_shards_lezen_als_een_stroom(tmp_path, suffix):
+    """--workers N: N deelbestanden (members/frames) achter elkaar == alle records."""
+    if suffix == ".jsonl.zst":
+        pytest.importorskip("zstandard")
+    records = [{"scenario_id": i, "cost_total": i * 1.5, "co2_total": i / 4} for i in range(1, 3001)]
+    delen   = []
+    for n, a in enumerate(range(0, len(records), 1000)):
+        deel = tmp_path / f"deel_{n}{suffix}"
+        with JsonlWriter(deel) as w:
+            w.schrijf_veel(records[a:a + 1000])
+        delen.append(deel)
+
+    path = tmp_path / f"results_gebouw_001{suffix}"
+    voeg_jsonl_samen(delen, path)
+    assert list(read_jsonl(path)) == records
+
+
+def schrijf_kolommen(path, ids):
+    with KolomWriter(path, {"scenario_id": "int64"}) as w:
+        w.schrijf(scenario_id=np.asarray(ids, dtype=np.int64))
+
+
+def test_kolommen_overschrijven_laat_oude_map_pas_los_als_de_nieuwe_staat(tmp_path, monkeypatch):
+    path = tmp_path / "results_gebouw_001.kolommen"
+    schrijf_kolommen(path, [1, 2, 3])
+    schrijf_kolommen(path, [4, 5])
+    assert read_kolommen(path)[0]["scenario_id"].tolist() == [4, 5]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
+
+    # Proces valt weg tussen opzij zetten en de nieuwe map plaatsen: oude results nog compleet
+    echte_replace = engine.writer.os.replace
+    def replace(bron, doel):
+        if str(bron).endswith(".tmp"):
+            raise KeyboardInterrupt
+        echte_replace(bron, doel)
+    monkeypatch.setattr(engine.writer.os, "replace", replace)
+    with pytest.raises(KeyboardInterrupt):
+        voeg_kolommen_samen([path], path)
+    monkeypatch.undo()
+    assert read_kolommen(tmp_path / (path.name + ".oud"))[0]["scenario_id"].tolist() == [4, 5]
+
+    schrijf_kolommen(path, [6])
+    assert read_kolommen(path)[0]["scenario_id"].tolist() == [6]
+    assert not (tmp_path / (path.name + ".oud")).exists()